@@ -17,6 +17,54 @@ def match_rules(rules, app, action):
     return False
 
 
+class Permissions(object):
+    """
+    The rules of a list of groups, compiled so each check is a few set
+    lookups.
+
+    allows() answers exactly like match_rules over each group's rules.  If
+    any rule can't be parsed we keep the rules as they are and fall back to
+    match_rules, so the same checks still raise.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.pairs, self.apps = set(), set()
+        try:
+            for group_rules in rules:
+                for rule in group_rules.split(','):
+                    rule_app, rule_action = rule.split(':')
+                    self.pairs.add((rule_app, rule_action))
+                    self.apps.add(rule_app)
+        except ValueError:
+            self.pairs = self.apps = None
+
+    def allows(self, app, action):
+        if self.pairs is None:
+            return any(match_rules(rules, app, action) for rules in self.rules)
+        if action == '%':
+            return '*' in self.apps or app in self.apps
+        pairs = self.pairs
+        return ((app, '*') in pairs or ('*', '*') in pairs or
+                (app, action) in pairs or ('*', action) in pairs)
+
+
+# Most users share a handful of group combinations.
+_permissions = {}
+
+
+def permissions(groups):
+    """The compiled Permissions for `groups`."""
+    rules = tuple(group.rules for group in groups)
+    try:
+        return _permissions[rules]
+    except KeyError:
+        if len(_permissions) >= 1000:
+            _permissions.clear()
+        rv = _permissions[rules] = Permissions(rules)
+        return rv
+
+
 def action_allowed(request, app, action):
     """
     Determines if the request user has permission to do a certain action
@@ -24,15 +72,17 @@ def action_allowed(request, app, action):
     'Admin:%' is true if the user has any of:
     ('Admin:*', 'Admin:%s'%whatever, '*:*',) as rules.
     """
-
-    return any(match_rules(group.rules, app, action)
-        for group in getattr(request, 'groups', ()))
+    groups = getattr(request, 'groups', ())
+    # Compile the groups once per request, and again if they're replaced.
+    cached = vars(request).get('_permissions')
+    if cached is None or cached[0] is not groups:
+        cached = request._permissions = groups, permissions(groups)
+    return cached[1].allows(app, action)
 
 
 def action_allowed_user(user, app, action):
     """Similar to action_allowed, but takes user instead of request."""
-    return any(match_rules(group.rules, app, action)
-        for group in user.groups.all())
+    return permissions(user.groups.all()).allows(app, action)
 
 
 def check_ownership(request, obj, require_owner=False):
@@ -0,0 +1,46 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.http import HttpRequest
+
+from access import acl
+from access.models import Group
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--requests', action='store', type='int', default=1000,
+                    help='How many requests to simulate.'),
+        make_option('--checks', action='store', type='int', default=1000,
+                    help='How many checks to make per request.'),
+    )
+    help = ('Compare matching every group rule on each action_allowed call '
+            'against the compiled permissions.')
+
+    def handle(self, *args, **options):
+        groups = list(Group.objects.all())
+        apps = sorted(set(rule.split(':')[0] for group in groups
+                          for rule in group.rules.split(',')))
+        checks = [(app, action) for app in apps or ['Admin']
+                  for action in ('%', 'EditAnyAddon', 'Foo')]
+        checks = (checks * options['checks'])[:options['checks']]
+        print '%s requests of %s checks over %s groups.' % (
+            options['requests'], len(checks), len(groups))
+
+        def rules(request):
+            for app, action in checks:
+                any(acl.match_rules(group.rules, app, action)
+                    for group in request.groups)
+
+        def compiled(request):
+            for app, action in checks:
+                acl.action_allowed(request, app, action)
+
+        for name, func in (('rules', rules), ('compiled', compiled)):
+            start = time.time()
+            for _ in xrange(options['requests']):
+                request = HttpRequest()
+                request.groups = groups
+                func(request)
+            print '%-10s %8.2fs' % (name, time.time() - start)
@@ -1,7 +1,9 @@
+import itertools
+
 from django.http import HttpRequest
 
 import mock
-from nose.tools import assert_false, eq_
+from nose.tools import assert_false, assert_raises, eq_
 
 import amo
 from amo.tests import TestCase
@@ -10,7 +12,8 @@ from addons.models import Addon, AddonUser
 from cake.models import Session
 from users.models import UserProfile
 
-from .acl import match_rules, action_allowed, check_addon_ownership
+from .acl import (match_rules, action_allowed, check_addon_ownership,
+                  Permissions)
 
 
 def test_match_rules():
@@ -46,6 +49,39 @@ def test_match_rules():
             "%s == Admin:%% and shouldn't" % rule
 
 
+def test_permissions_match_rules():
+    """Permissions must agree with match_rules on every combination."""
+    atoms = ['*:*', 'Admin:*', 'Admin:EditAnyAddon', '*:Foo', 'Admin:%',
+             'Editors:%', 'Other:Foo', '*:%']
+    groups = atoms + map(','.join, itertools.permutations(atoms, 2))
+    apps = ['Admin', 'Editors', 'Other', '*', '%']
+    actions = ['%', '*', 'EditAnyAddon', 'Foo', 'Bar']
+    for size in range(3):
+        for rules in itertools.combinations(groups, size):
+            perms = Permissions(rules)
+            for app, action in itertools.product(apps, actions):
+                expected = any(match_rules(r, app, action) for r in rules)
+                eq_(perms.allows(app, action), expected,
+                    '%s on %s:%s' % (rules, app, action))
+
+
+def test_permissions_bad_rule():
+    # A malformed rule only raises once we get to it, like match_rules.
+    perms = Permissions(('Admin:*', 'oops'))
+    assert perms.allows('Admin', 'Foo')
+    assert_raises(ValueError, perms.allows, 'Editors', 'Foo')
+
+
+def test_action_allowed_regroups():
+    request = HttpRequest()
+    request.groups = [mock.Mock(rules='Editors:*')]
+    assert action_allowed(request, 'Editors', 'Foo')
+    assert not action_allowed(request, 'Admin', '%')
+    request.groups = [mock.Mock(rules='Admin:Foo')]
+    assert not action_allowed(request, 'Editors', 'Foo')
+    assert action_allowed(request, 'Admin', '%')
+
+
 def test_anonymous_user():
     # Fake request must not have .groups, just like an anonymous user.
     fake_request = HttpRequest()
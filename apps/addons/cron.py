@@ -11,7 +11,6 @@ from django.conf import settings
 from django.db import connections, transaction
 from django.db.models import Q, F, Avg
 
-import multidb
 import path
 import recommend
 from celery.task.sets import TaskSet
@@ -19,6 +18,7 @@ from celeryutils import task
 
 import amo
 import cronjobs
+from amo.routers import get_slave
 from amo.utils import chunked
 from addons import search
 from addons.models import Addon, FrozenAddon, AppSupport
@@ -31,21 +31,26 @@ log = logging.getLogger('z.cron')
 task_log = logging.getLogger('z.task')
 recs_log = logging.getLogger('z.recs')
 
+LAST_UPDATED_WATERMARK = 'addons_last_updated_watermark'
+WATERMARK_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 
 @cronjobs.register
 def build_reverse_name_lookup():
     """Builds a Reverse Name lookup table in REDIS."""
-    ReverseNameLookup().clear()
-    ReverseNameLookup(webapp=True).clear()
+    for webapp, types in ((False, [amo.ADDON_EXTENSION, amo.ADDON_THEME]),
+                          (True, [amo.ADDON_WEBAPP])):
+        ReverseNameLookup(webapp).rebuild(_reverse_names(types))
 
-    # Get all add-on name ids
-    names = list(Addon.objects.filter(
-        name__isnull=False, type__in=[amo.ADDON_EXTENSION, amo.ADDON_THEME,
-                                      amo.ADDON_WEBAPP])
-        .values('name_id', 'id', 'type'))
 
-    for chunk in chunked(names, 100):
-        _build_reverse_name_lookup.delay(chunk)
+def _reverse_names(types):
+    """Yields (name, id) for every add-on of `types`, oldest add-ons first."""
+    names = (Addon.objects.no_cache()
+             .filter(type__in=types, name__isnull=False)
+             .values_list('name__localized_string', 'id').order_by('id'))
+    for name, id in names.iterator():
+        if name:
+            yield name, id
 
 
 @task
@@ -121,7 +126,7 @@ def update_addon_average_daily_users():
     if settings.IGNORE_NON_CRITICAL_CRONS:
         return
 
-    cursor = connections[multidb.get_slave()].cursor()
+    cursor = connections[get_slave()].cursor()
     q = """SELECT
                addon_id, AVG(`count`)
            FROM update_counts
@@ -159,7 +164,7 @@ def update_addon_download_totals():
     if settings.IGNORE_NON_CRITICAL_CRONS:
         return
 
-    cursor = connections[multidb.get_slave()].cursor()
+    cursor = connections[get_slave()].cursor()
     # We need to use SQL for this until
     # http://code.djangoproject.com/ticket/11003 is resolved
     q = """SELECT
@@ -187,15 +192,32 @@ def _update_addon_download_totals(data, **kw):
                                            total_downloads=sum)
 
 
+def _last_updated(ids=None):
+    """
+    Run the last_updated queries and return {addon_id: last_updated}.
+
+    If ``ids`` is given only those add-ons are recomputed.
+    """
+    next = {}
+    for q in Addon._last_updated_queries().values():
+        if ids is not None:
+            q = q.filter(id__in=ids)
+        for addon, last_updated in q.values_list('id', 'last_updated'):
+            next[addon] = last_updated
+    return next
+
+
 def _change_last_updated(next):
     # We jump through some hoops here to make sure we only change the add-ons
     # that really need it, and to invalidate properly.
-    current = dict(Addon.objects.values_list('id', 'last_updated'))
     changes = {}
 
-    for addon, last_updated in next.items():
-        if current[addon] != last_updated:
-            changes[addon] = last_updated
+    for chunk in chunked(next.keys(), 1000):
+        current = dict(Addon.uncached.filter(id__in=chunk)
+                       .values_list('id', 'last_updated'))
+        for addon in chunk:
+            if current.get(addon) != next[addon]:
+                changes[addon] = next[addon]
 
     if not changes:
         return
@@ -207,14 +229,36 @@ def _change_last_updated(next):
         addon.save()
 
 
+def update_last_updated(ids):
+    """Recompute last_updated for `ids`, falling back to created."""
+    _change_last_updated(_last_updated(ids))
+    other = (Addon.uncached.filter(id__in=ids, last_updated__isnull=True)
+             .values_list('id', 'created'))
+    _change_last_updated(dict(other))
+
+
+def _last_updated_changed_since(since):
+    """Ids of add-ons whose status, versions or files changed since `since`."""
+    from versions.models import Version
+    ids = set(Addon.uncached.filter(modified__gte=since)
+              .values_list('id', flat=True))
+    ids.update(Version.uncached.filter(modified__gte=since)
+               .values_list('addon', flat=True))
+    ids.update(File.uncached.filter(Q(modified__gte=since) |
+                                    Q(datestatuschanged__gte=since))
+               .values_list('version__addon', flat=True))
+    ids.discard(None)
+    return ids
+
+
 @cronjobs.register
 def addon_last_updated():
-    next = {}
-    for q in Addon._last_updated_queries().values():
-        for addon, last_updated in q.values_list('id', 'last_updated'):
-            next[addon] = last_updated
+    """Recompute last_updated for every add-on.
 
-    _change_last_updated(next)
+    This is the nightly consistency check; the hourly job is
+    addon_last_updated_incremental.
+    """
+    _change_last_updated(_last_updated())
 
     # Get anything that didn't match above.
     other = (Addon.uncached.filter(last_updated__isnull=True)
@@ -222,6 +266,29 @@ def addon_last_updated():
     _change_last_updated(dict(other))
 
 
+@cronjobs.register
+def addon_last_updated_incremental():
+    """
+    Recompute last_updated only for add-ons that changed since the last run.
+
+    The watermark is stored in the config table. Without a watermark we fall
+    back to the full recompute.
+    """
+    from zadmin.models import get_config, set_config
+    now = datetime.now()
+    since = get_config(LAST_UPDATED_WATERMARK)
+    if not since:
+        log.info('No last_updated watermark, doing a full recompute.')
+        addon_last_updated()
+    else:
+        since = datetime.strptime(since, WATERMARK_FORMAT)
+        ids = _last_updated_changed_since(since)
+        log.info('Updating last_updated for %s changed add-ons.' % len(ids))
+        for chunk in chunked(sorted(ids), 300):
+            update_last_updated(chunk)
+    set_config(LAST_UPDATED_WATERMARK, now.strftime(WATERMARK_FORMAT))
+
+
 @cronjobs.register
 def update_addon_appsupport():
     # Find all the add-ons that need their app support details updated.
@@ -353,7 +420,7 @@ def deliver_hotness():
 @cronjobs.register
 def recs():
     start = time.time()
-    cursor = connections[multidb.get_slave()].cursor()
+    cursor = connections[get_slave()].cursor()
     cursor.execute("""
         SELECT addon_id, collection_id
         FROM synced_addons_collections ac
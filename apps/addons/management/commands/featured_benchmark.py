@@ -0,0 +1,42 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+import amo
+from addons.cron import reset_featured_addons
+from addons.models import Addon
+from addons.utils import FeaturedManager
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--repeat', action='store', type='int', default=10000,
+                    help='How many lookups to time.'),
+        make_option('--lang', action='store', default='en-US',
+                    help='The locale to look up.'),
+    )
+    help = ("Time the home page's featured extensions lookup, with and "
+            "without the in-process copy of the list.")
+
+    def handle(self, *args, **options):
+        reset_featured_addons()
+        app, lang = amo.FIREFOX, options['lang']
+        lookup = lambda: FeaturedManager.featured_ids(app, lang,
+                                                      amo.ADDON_EXTENSION)
+        print '%s featured extensions for %s.' % (len(lookup()), lang)
+        for name, clear in (('from redis', True), ('in-process', False)):
+            start = time.time()
+            for i in xrange(options['repeat']):
+                if clear:
+                    FeaturedManager.clear_cache()
+                lookup()
+            total = time.time() - start
+            print '%-12s %8.1fus per lookup' % (
+                name, total / options['repeat'] * 1e6)
+
+        start = time.time()
+        for i in xrange(100):
+            list(Addon.objects.featured(app, lang, amo.ADDON_EXTENSION))
+        print '%-12s %8.1fms per call' % (
+            'featured()', (time.time() - start) * 10)
@@ -0,0 +1,50 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from addons.utils import ReverseNameLookup
+
+
+class ScratchLookup(ReverseNameLookup):
+    """A lookup table that stays out of the way of the real one."""
+
+    def __init__(self):
+        super(ScratchLookup, self).__init__()
+        self.prefix = 'amo:benchmark:name'
+        self.names = self.prefix + ':names'
+        self.addons = self.prefix + ':addons'
+        self.keys = self.prefix + ':keys'
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--names', action='store', type='int', default=100000,
+                    help='How many synthetic names to load.'),
+    )
+    help = ('Compare filling the reverse name lookup one add() at a time '
+            'against a pipelined rebuild().')
+
+    def handle(self, *args, **options):
+        pairs = [(u'Benchmark add-on %s' % i, i)
+                 for i in xrange(1, options['names'] + 1)]
+        rn = ScratchLookup()
+        try:
+            for name, func in (('add() each', self.each),
+                               ('rebuild()', self.rebuild)):
+                # An empty rebuild drops the names and every per-addon set.
+                rn.rebuild([])
+                start = time.time()
+                func(rn, pairs)
+                total = time.time() - start
+                print '%-12s %8.2fs %10.0f names/s' % (
+                    name, total, len(pairs) / total)
+        finally:
+            rn.rebuild([])
+
+    def each(self, rn, pairs):
+        for name, addon_id in pairs:
+            rn.add(name, addon_id)
+
+    def rebuild(self, rn, pairs):
+        rn.rebuild(pairs)
@@ -23,6 +23,7 @@ from tower import ugettext_lazy as _
 from addons.utils import ReverseNameLookup, FeaturedManager, CreaturedManager
 import amo.models
 from amo.decorators import use_master
+from amo.feeds import invalidate_feed
 from amo.fields import DecimalCharField
 from amo.helpers import absolutify, shared_url
 from amo.utils import (chunked, JSONEncoder, send_mail, slugify,
@@ -662,14 +663,7 @@ class Addon(amo.models.OnChangeMixin, amo.models.ModelBase):
                 addon._backup_version = version
             version.addon = addon
 
-        # Attach listed authors.
-        q = (UserProfile.objects.no_cache()
-             .filter(addons__in=addons, addonuser__listed=True)
-             .extra(select={'addon_id': 'addons_users.addon_id',
-                            'position': 'addons_users.position'}))
-        q = sorted(q, key=lambda u: (u.addon_id, u.position))
-        for addon_id, users in itertools.groupby(q, key=lambda u: u.addon_id):
-            addon_dict[addon_id].listed_authors = list(users)
+        Addon.attach_listed_authors(addons)
 
         for persona in Persona.objects.no_cache().filter(addon__in=personas):
             addon = addon_dict[persona.addon_id]
@@ -683,11 +677,7 @@ class Addon(amo.models.OnChangeMixin, amo.models.ModelBase):
         # Attach sharing stats.
         sharing.attach_share_counts(AddonShareCountTotal, 'addon', addon_dict)
 
-        # Attach previews.
-        qs = Preview.objects.filter(addon__in=addons).order_by()
-        qs = sorted(qs, key=lambda x: (x.addon_id, x.position, x.created))
-        for addon, previews in itertools.groupby(qs, lambda x: x.addon_id):
-            addon_dict[addon].all_previews = list(previews)
+        Addon.attach_previews(addons)
 
         # Attach _first_category for Firefox.
         cats = dict(AddonCategory.objects.values_list('addon', 'category')
@@ -711,6 +701,31 @@ class Addon(amo.models.OnChangeMixin, amo.models.ModelBase):
                     addon_p.price = price
                     addon_dict[addon_p.addon_id]._premium = addon_p
 
+    @staticmethod
+    def attach_listed_authors(addons):
+        """Set listed_authors on each of `addons` from one query."""
+        addon_dict = dict((a.id, a) for a in addons)
+        q = (UserProfile.objects.no_cache()
+             .filter(addons__in=addons, addonuser__listed=True)
+             .extra(select={'addon_id': 'addons_users.addon_id',
+                            'position': 'addons_users.position'}))
+        q = sorted(q, key=lambda u: (u.addon_id, u.position))
+        for addon in addons:
+            addon.listed_authors = []
+        for addon_id, users in itertools.groupby(q, key=lambda u: u.addon_id):
+            addon_dict[addon_id].listed_authors = list(users)
+
+    @staticmethod
+    def attach_previews(addons):
+        """Set all_previews on each of `addons` from one query."""
+        addon_dict = dict((a.id, a) for a in addons)
+        qs = Preview.objects.filter(addon__in=addons).order_by()
+        qs = sorted(qs, key=lambda x: (x.addon_id, x.position, x.created))
+        for addon in addons:
+            addon.all_previews = []
+        for addon_id, previews in itertools.groupby(qs, lambda x: x.addon_id):
+            addon_dict[addon_id].all_previews = list(previews)
+
     @property
     def show_beta(self):
         return self.status == amo.STATUS_PUBLIC and self.current_beta_version
@@ -998,15 +1013,14 @@ class Addon(amo.models.OnChangeMixin, amo.models.ModelBase):
         **result**
             Actual result object
         """
+        from perf.models import Performance
         res = collections.defaultdict(list)
-        baselines = {}
+        baselines = Performance.get_baselines()
         for result in (self.performance
                        .select_related('osversion', 'appversion')
                        .order_by('-created')[:20]):
             k = (result.appversion.id, result.osversion.id, result.test)
-            if k not in baselines:
-                baselines[k] = result.get_baseline()
-            baseline = baselines[k]
+            baseline = baselines.get(k, result.average)
             appver = result.appversion
             slow = result.startup_is_too_slow(baseline=baseline)
             res[appver].append({'baseline': baseline,
@@ -1144,6 +1158,20 @@ def version_changed(sender, **kw):
     tasks.version_changed.delay(sender.id)
 
 
+@File.on_change
+def watch_file_status(old_attr={}, new_attr={}, instance=None, sender=None,
+                      **kw):
+    """A file status change can move the add-on's last_updated."""
+    if old_attr.get('status') == new_attr.get('status'):
+        return
+    try:
+        addon_id = instance.version.addon_id
+    except models.ObjectDoesNotExist:
+        return
+    from . import tasks
+    tasks.file_status_changed.delay(addon_id)
+
+
 @receiver(dbsignals.post_save, sender=Addon,
           dispatch_uid='addons.search.index')
 def update_search_index(sender, instance, **kw):
@@ -1153,6 +1181,14 @@ def update_search_index(sender, instance, **kw):
         tasks.index_addons.delay([instance.id])
 
 
+@receiver(dbsignals.post_save, sender=Addon,
+          dispatch_uid='addons.feed.invalidate')
+def invalidate_versions_feed(sender, instance, **kw):
+    if kw.get('raw'):
+        return
+    invalidate_feed('addon', instance.id)
+
+
 @receiver(dbsignals.post_delete, sender=Addon,
           dispatch_uid='addons.search.unindex')
 def delete_search_index(sender, instance, **kw):
@@ -1483,6 +1519,35 @@ class Feature(amo.models.ModelBase):
         return '%s (%s: %s)' % (self.addon.name, app, self.locale)
 
 
+@receiver(dbsignals.pre_save, sender=AddonCategory,
+          dispatch_uid='addons.category.feature.pre_save')
+def remember_featured(sender, instance, **kw):
+    """Note whether the row was featured before this save."""
+    if kw.get('raw') or not instance.pk:
+        instance._was_featured = False
+        return
+    instance._was_featured = (AddonCategory.objects.no_cache()
+                              .filter(pk=instance.pk, feature=True).exists())
+
+
+@receiver(dbsignals.post_save, sender=Feature,
+          dispatch_uid='addons.feature.save')
+@receiver(dbsignals.post_delete, sender=Feature,
+          dispatch_uid='addons.feature.delete')
+@receiver(dbsignals.post_save, sender=AddonCategory,
+          dispatch_uid='addons.category.feature.save')
+@receiver(dbsignals.post_delete, sender=AddonCategory,
+          dispatch_uid='addons.category.feature.delete')
+def update_featured(sender, instance, **kw):
+    from . import tasks
+    if kw.get('raw'):
+        return
+    # Un-featuring a category add-on has to rebuild the lists too.
+    if (sender is Feature or instance.feature or
+        getattr(instance, '_was_featured', False)):
+        tasks.update_featured.delay()
+
+
 class Preview(amo.models.ModelBase):
     addon = models.ForeignKey(Addon, related_name='previews')
     filetype = models.CharField(max_length=25)
@@ -27,27 +27,23 @@ log = logging.getLogger('z.task')
 @task
 @write
 def version_changed(addon_id, **kw):
-    update_last_updated(addon_id)
+    log.info('[1@None] Updating last updated for %s.' % addon_id)
+    cron.update_last_updated([addon_id])
     update_appsupport([addon_id])
 
 
-def update_last_updated(addon_id):
-    log.info('[1@None] Updating last updated for %s.' % addon_id)
-    queries = Addon._last_updated_queries()
-    addon = Addon.objects.get(pk=addon_id)
-    if addon.is_persona():
-        q = 'personas'
-    elif addon.status == amo.STATUS_PUBLIC:
-        q = 'public'
-    elif addon.status == amo.STATUS_LISTED:
-        q = 'listed'
-    else:
-        q = 'exp'
-    qs = queries[q].filter(pk=addon_id).using('default')
-    res = qs.values_list('id', 'last_updated')
-    if res:
-        pk, t = res[0]
-        Addon.objects.filter(pk=pk).update(last_updated=t)
+@task
+@write
+def file_status_changed(addon_id, **kw):
+    log.info('[1@None] File status changed for %s.' % addon_id)
+    cron.update_last_updated([addon_id])
+
+
+@task
+def update_featured(**kw):
+    """Precompute the featured lists again after a feature changed."""
+    log.info('[1@None] Rebuilding the featured lists.')
+    cron.reset_featured_addons()
 
 
 @transaction.commit_on_success
@@ -1,8 +1,9 @@
+import mock
 from nose.tools import eq_
 
 import amo.tests
 from addons.models import Addon
-from addons.utils import ReverseNameLookup
+from addons.utils import ReverseNameLookup, safe_key
 from addons import cron
 
 
@@ -51,4 +52,39 @@ class TestReverseNameLookup(amo.tests.TestCase):
         eq_(ReverseNameLookup(webapp=False).get(name), 3615)
         eq_(ReverseNameLookup(webapp=True).get(name), app.id)
 
+    def test_get_many(self):
+        eq_(ReverseNameLookup().get_many(['delicious bookmarks ', 'nope']),
+            {'delicious bookmarks ': 3615, 'nope': None})
+        eq_(ReverseNameLookup().get_many([]), {})
 
+
+class TestRebuild(amo.tests.TestCase):
+
+    def setUp(self):
+        super(TestRebuild, self).setUp()
+        self.rn = ReverseNameLookup()
+        self.rn.redis = mock.Mock()
+        self.rn.redis.smembers.return_value = set(['1', '7'])
+        self.pipe = self.rn.redis.pipeline.return_value
+
+    def test_round_trips(self):
+        self.rn.rebuild(('name %s' % i, i) for i in range(2500))
+        # Three chunks and the final swap.
+        eq_(self.pipe.execute.call_count, 4)
+        eq_(self.pipe.hmset.call_count, 3)
+
+    def test_swap(self):
+        self.rn.rebuild([('a', 1), ('b', 2)])
+        self.pipe.rename.assert_any_call(self.rn.names + ':tmp', self.rn.names)
+        self.pipe.rename.assert_any_call(self.rn.keys + ':tmp', self.rn.keys)
+        # Add-on 7 lost its name, so its set of names goes too.
+        self.pipe.delete.assert_any_call('%s:7' % self.rn.addons)
+
+    def test_first_name_wins(self):
+        self.rn.rebuild([('Name', 1), ('name ', 2)])
+        eq_(self.pipe.hmset.call_args[0][1], {safe_key('Name'): 1})
+
+    def test_empty(self):
+        self.rn.rebuild([])
+        assert not self.pipe.rename.called
+        self.pipe.delete.assert_any_call(self.rn.names, self.rn.keys)
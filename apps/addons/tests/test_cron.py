@@ -1,13 +1,16 @@
+from datetime import datetime, timedelta
+
 from nose.tools import eq_
 import mock
 
 import amo
 import amo.tests
-from addons import cron
+from addons import cron, tasks
 from addons.models import Addon, AppSupport
 from addons.utils import ReverseNameLookup
 from files.models import File, Platform
 from versions.models import Version
+from zadmin.models import get_config, set_config
 
 
 class TestBuildReverseNameLookup(amo.tests.TestCase):
@@ -88,6 +91,59 @@ class TestLastUpdated(amo.tests.TestCase):
         eq_(addon.last_updated, addon.created)
         assert addon.last_updated
 
+    def test_incremental_no_watermark(self):
+        Addon.objects.update(type=amo.ADDON_PERSONA, status=amo.STATUS_PUBLIC,
+                             last_updated=None)
+        cron.addon_last_updated_incremental()
+        for addon in Addon.objects.all():
+            eq_(addon.last_updated, addon.created)
+        assert get_config(cron.LAST_UPDATED_WATERMARK)
+
+    def test_incremental_only_changed(self):
+        expected = cron._last_updated([3615, 3723])
+        stale = (datetime.now() - timedelta(days=10)).replace(microsecond=0)
+        assert stale not in (expected[3615], expected[3723])
+        old = datetime.now() - timedelta(days=1)
+        Addon.objects.update(last_updated=stale, modified=old)
+        Version.objects.update(modified=old)
+        File.objects.update(modified=old)
+        set_config(cron.LAST_UPDATED_WATERMARK,
+                   (datetime.now() - timedelta(minutes=1))
+                   .strftime(cron.WATERMARK_FORMAT))
+        Addon.objects.filter(id=3615).update(modified=datetime.now())
+        cron.addon_last_updated_incremental()
+        eq_(Addon.objects.get(id=3615).last_updated, expected[3615])
+        # 3723 is out of date too, but it didn't change so it's left for the
+        # nightly run.
+        eq_(Addon.objects.get(id=3723).last_updated, stale)
+
+        Version.objects.filter(addon=3723).update(modified=datetime.now())
+        set_config(cron.LAST_UPDATED_WATERMARK,
+                   (datetime.now() - timedelta(minutes=1))
+                   .strftime(cron.WATERMARK_FORMAT))
+        cron.addon_last_updated_incremental()
+        eq_(Addon.objects.get(id=3723).last_updated, expected[3723])
+
+    @mock.patch('addons.tasks.file_status_changed.delay')
+    def test_file_status_change(self, delay):
+        f = File.objects.filter(version__addon=3615)[0]
+        f.update(status=amo.STATUS_DISABLED)
+        delay.assert_called_with(3615)
+
+    @mock.patch('addons.tasks.file_status_changed.delay')
+    def test_file_no_status_change(self, delay):
+        f = File.objects.filter(version__addon=3615)[0]
+        f.update(size=12)
+        assert not delay.called
+
+    def test_tasks_share_the_cron_path(self):
+        expected = cron._last_updated([3615, 3723])
+        Addon.objects.update(last_updated=None)
+        tasks.version_changed(3615)
+        tasks.file_status_changed(3723)
+        eq_(Addon.objects.get(id=3615).last_updated, expected[3615])
+        eq_(Addon.objects.get(id=3723).last_updated, expected[3723])
+
     def test_appsupport(self):
         ids = Addon.objects.values_list('id', flat=True)
         cron._update_appsupport(ids)
@@ -26,8 +26,8 @@ from amo.helpers import absolutify
 from amo.signals import _connect, _disconnect
 from addons.models import (Addon, AddonCategory, AddonDependency,
                            AddonRecommendation, AddonType, AddonUpsell,
-                           BlacklistedGuid, Category, Charity, CompatOverride,
-                           CompatOverrideRange, FrozenAddon,
+                           AddonUser, BlacklistedGuid, Category, Charity,
+                           CompatOverride, CompatOverrideRange, FrozenAddon,
                            IncompatibleVersions, Preview)
 from applications.models import Application, AppVersion
 from devhub.models import ActivityLog
@@ -232,6 +232,18 @@ class TestAddonModels(amo.tests.TestCase):
     def tearDown(self):
         amo.FIREFOX.latest_version = self.old_version
 
+    def test_attach_listed_authors_and_previews(self):
+        addons = list(Addon.objects.no_cache().no_transforms()
+                      .filter(pk__in=[3615, 5299]))
+        Addon.attach_listed_authors(addons)
+        Addon.attach_previews(addons)
+        for addon in addons:
+            eq_([u.id for u in addon.listed_authors],
+                list(AddonUser.objects.filter(addon=addon, listed=True)
+                     .order_by('position').values_list('user', flat=True)))
+            eq_(sorted(p.id for p in addon.all_previews),
+                sorted(addon.previews.values_list('id', flat=True)))
+
     def test_current_version(self):
         """
         Tests that we get the current (latest public) version of an addon.
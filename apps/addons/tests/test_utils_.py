@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
 import mock
 from nose.tools import eq_
 
+from addons.models import Addon, AddonCategory, Category, Feature
 from addons.utils import FeaturedManager, CreaturedManager
+from bandwagon.models import Collection, CollectionAddon, FeaturedCollection
 
 import amo.tests
 
@@ -30,7 +36,37 @@ class TestFeaturedManager(amo.tests.TestCase):
         self.fm.build()
 
     def test_build(self):
-        eq_(self.fm.redis().smembers(self.fm.by_id), set([1, 2, 3, 4, 5, 6]))
+        eq_(set(self.fm.featured_ids(amo.FIREFOX)), set([1, 2, 3, 4, 5]))
+        eq_(set(self.fm.featured_ids(amo.THUNDERBIRD)), set([6]))
+        eq_(self.fm.featured_ids(amo.SEAMONKEY), [])
+
+    def test_one_get(self):
+        self.fm.featured_ids(amo.FIREFOX, 'ja')
+        redis = mock.Mock(wraps=self.fm.redis())
+        patch = mock.Mock(return_value=redis)
+        with mock.patch.object(self.fm, 'redis', patch):
+            eq_(set(self.fm.featured_ids(amo.FIREFOX, 'ja')),
+                set([1, 2, 3, 4, 5]))
+        # Only the version is fetched, the list is the in-process copy.
+        eq_(redis.get.call_count, 1)
+        assert not redis.hmget.called
+
+    def test_cached_copy(self):
+        ids = self.fm.featured_ids(amo.FIREFOX, 'ja')
+        eq_(self.fm.featured_ids(amo.FIREFOX, 'ja'), ids)
+        ids.append(7)
+        assert 7 not in self.fm.featured_ids(amo.FIREFOX, 'ja')
+
+    def test_version_bump(self):
+        eq_(set(self.fm.featured_ids(amo.FIREFOX, 'xx')), set([1, 2, 3]))
+        self.objects_mock.return_value = [dict(zip(self.fields, v))
+                                          for v in self.values[1:]]
+        version = self.fm.redis().get(self.fm.version_key())
+        self.fm.build()
+        assert self.fm.redis().get(self.fm.version_key()) != version
+        # Another process still holding the old copy sees the new version.
+        self.fm._cache.update({None: version})
+        eq_(set(self.fm.featured_ids(amo.FIREFOX, 'xx')), set([2, 3]))
 
     def test_by_app(self):
         eq_(set(self.fm.featured_ids(amo.FIREFOX)), set([1, 2, 3, 4, 5]))
@@ -98,3 +134,59 @@ class TestCreaturedManager(amo.tests.TestCase):
                                           for v in self.values]
         self.cm.build()
         eq_(set(self.cm.creatured_ids(self.category, 'xx')), set([2]))
+
+
+class TestFeaturedInvalidation(amo.tests.TestCase):
+    fixtures = ['base/apps', 'base/addon_3615']
+
+    def setUp(self):
+        self.addon = Addon.objects.get(id=3615)
+
+    def feature(self, **kw):
+        return Feature.objects.create(addon=self.addon, start=datetime.now(),
+                                      end=datetime.now() + timedelta(days=1),
+                                      application_id=amo.FIREFOX.id, **kw)
+
+    def test_add(self):
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX), [])
+        self.feature()
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX), [3615])
+
+    def test_remove(self):
+        feature = self.feature(locale='ja')
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX, 'ja'), [3615])
+        feature.delete()
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX, 'ja'), [])
+
+    def test_category(self):
+        category = Category.objects.create(application_id=amo.FIREFOX.id,
+                                           type=amo.ADDON_EXTENSION)
+        eq_(CreaturedManager.creatured_ids(category, 'en-US'), [])
+        ac = AddonCategory.objects.create(addon=self.addon, category=category,
+                                          feature=True)
+        eq_(CreaturedManager.creatured_ids(category, 'en-US'), [3615])
+        ac.delete()
+        eq_(CreaturedManager.creatured_ids(category, 'en-US'), [])
+
+    def test_category_unfeature(self):
+        category = Category.objects.create(application_id=amo.FIREFOX.id,
+                                           type=amo.ADDON_EXTENSION)
+        ac = AddonCategory.objects.create(addon=self.addon, category=category,
+                                          feature=True)
+        eq_(CreaturedManager.creatured_ids(category, 'en-US'), [3615])
+        ac = AddonCategory.objects.no_cache().get(pk=ac.pk)
+        ac.feature = False
+        ac.save()
+        eq_(CreaturedManager.creatured_ids(category, 'en-US'), [])
+
+    @mock.patch.object(settings, 'NEW_FEATURES', True)
+    def test_collection(self):
+        collection = Collection.objects.create()
+        FeaturedCollection.objects.create(application_id=amo.FIREFOX.id,
+                                          collection=collection)
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX), [])
+        c = CollectionAddon.objects.create(addon=self.addon,
+                                           collection=collection)
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX), [3615])
+        c.delete()
+        eq_(FeaturedManager.featured_ids(amo.FIREFOX), [])
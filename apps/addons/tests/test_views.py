@@ -22,6 +22,7 @@ from amo.helpers import absolutify, numberfmt, urlparams, shared_url
 from amo.tests import addon_factory
 from amo.urlresolvers import reverse
 from abuse.models import AbuseReport
+from addons import views
 from addons.models import (Addon, AddonDependency, AddonUpsell, AddonUser,
                            Charity)
 from files.models import File
@@ -66,6 +67,11 @@ class TestHomepage(amo.tests.TestCase):
     def setUp(self):
         self.base_url = reverse('home')
 
+    def test_query_budget(self):
+        with self.assertQueryBudget(views.home._query_budget):
+            r = self.client.get('/en-US/firefox/')
+        eq_(r.status_code, 200)
+
     def test_thunderbird(self):
         """Thunderbird homepage should have the Thunderbird title."""
         r = self.client.get('/en-US/thunderbird/')
@@ -826,6 +832,11 @@ class TestDetailPage(amo.tests.TestCase):
         self.addon = Addon.objects.get(id=3615)
         self.url = self.addon.get_url_path()
 
+    def test_query_budget(self):
+        with self.assertQueryBudget(views.addon_detail._query_budget):
+            r = self.client.get(self.url)
+        eq_(r.status_code, 200)
+
     def test_site_title(self):
         r = self.client.get(self.url)
         eq_(pq(r.content)('h1.site-title').text(), 'Add-ons')
@@ -1,4 +1,6 @@
+import collections
 import hashlib
+import json
 import logging
 import random
 from operator import itemgetter
@@ -7,10 +9,9 @@ from django.conf import settings
 from django.utils.encoding import smart_str
 
 import commonware.log
-import lru_cache
 import redisutils
 
-from amo.utils import sorted_groupby, memoize
+from amo.utils import chunked, sorted_groupby
 from translations.models import Translation
 
 safe_key = lambda x: hashlib.md5(smart_str(x).lower().strip()).hexdigest()
@@ -43,6 +44,63 @@ class ReverseNameLookup(object):
         val = self.redis.hget(self.names, safe_key(key))
         return int(val) if val else None
 
+    def get_many(self, keys):
+        """Looks up all of `keys` in one go, returns {key: id or None}."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        vals = self.redis.hmget(self.names, [safe_key(k) for k in keys])
+        return dict((k, int(v) if v else None) for k, v in zip(keys, vals))
+
+    def rebuild(self, pairs, size=1000):
+        """
+        Replaces the whole table with the (name, addon_id) `pairs`; the first
+        add-on to claim a name keeps it. The names are written to a temporary
+        hash with one pipelined round trip per `size` pairs, then renamed over
+        the live one, so lookups never see a half built table.
+        """
+        tmp_names, tmp_keys = self.names + ':tmp', self.keys + ':tmp'
+        old_ids = set(self.redis.smembers(self.keys))
+        self.redis.delete(tmp_names, tmp_keys)
+        seen, ids = set(), set()
+
+        for chunk in chunked(pairs, size):
+            names, hashes = {}, collections.defaultdict(set)
+            for name, addon_id in chunk:
+                hash = safe_key(name)
+                if hash in seen:
+                    rnlog.warning('Duplicate %s name: %s (%s).' % (
+                        self.type, name, addon_id))
+                    continue
+                seen.add(hash)
+                names[hash] = addon_id
+                hashes[addon_id].add(hash)
+
+            pipe = self.redis.pipeline()
+            if names:
+                pipe.hmset(tmp_names, names)
+            for addon_id, addon_hashes in hashes.items():
+                key = '%s:%s' % (self.addons, addon_id)
+                if addon_id not in ids:
+                    pipe.delete(key)
+                for hash in addon_hashes:
+                    pipe.sadd(key, hash)
+                pipe.sadd(tmp_keys, addon_id)
+            pipe.execute()
+            ids.update(hashes)
+
+        pipe = self.redis.pipeline()
+        if ids:
+            pipe.rename(tmp_names, self.names)
+            pipe.rename(tmp_keys, self.keys)
+        else:
+            pipe.delete(self.names, self.keys)
+        for addon_id in old_ids - set(map(str, ids)):
+            pipe.delete('%s:%s' % (self.addons, addon_id))
+        pipe.execute()
+        rnlog.info('Rebuilt the %s ReverseName table: %s names.' % (
+            self.type, len(seen)))
+
     def update(self, addon):
         self.delete(addon.id)
         translations = (Translation.objects.filter(id=addon.name_id)
@@ -103,18 +161,85 @@ class MigrationTracker(object):
         return self.redis.set(self.key, value)
 
 
-class FeaturedManager(object):
-    prefix = 'addons:featured:'
-    by_id = prefix + 'byid'
-    by_app = classmethod(lambda cls, x: '%s:%s' % (cls.prefix + 'byapp', x))
-    by_type = classmethod(lambda cls, x: '%s:%s' % (cls.prefix + 'bytype', x))
-    by_locale = classmethod(lambda cls, x: '%s:%s' %
-                            (cls.prefix + 'bylocale', x and x.lower()))
+class FeaturedLists(object):
+    """
+    Featured add-on ids, precomputed by build() for every combination a page
+    can ask for.
+
+    All of the lists from one build() live in a single redis hash named after
+    a version number; the current version sits in its own key. Readers GET the
+    version and reuse their in-process copy of a list while it hasn't moved,
+    so invalidating everything is one INCR.
+    """
+    # Fields for locales without any lists of their own.
+    ANY = '*'
 
     @classmethod
     def redis(cls):
         return redisutils.connections['master']
 
+    @classmethod
+    def version_key(cls):
+        return cls.prefix + ':version'
+
+    @classmethod
+    def lists_key(cls, version):
+        return '%s:lists:%s' % (cls.prefix, version)
+
+    @classmethod
+    def field(cls, *parts):
+        return ':'.join(map(unicode, parts))
+
+    @classmethod
+    def materialize(cls, lists):
+        """
+        Store `lists`, a {field: (per_locale, others)} dict, as a new version.
+        """
+        redis = cls.redis()
+        old = redis.get(cls.version_key())
+        version = redis.incr(cls.version_key() + ':counter')
+        pipe = redis.pipeline(transaction=False)
+        if lists:
+            pipe.hmset(cls.lists_key(version),
+                       dict((k, json.dumps([sorted(per), sorted(others)]))
+                            for k, (per, others) in lists.items()))
+        pipe.set(cls.version_key(), version)
+        if old:
+            # Give readers that just fetched the old version time to finish.
+            pipe.expire(cls.lists_key(old), 60)
+        pipe.execute()
+        cls.clear_cache()
+
+    @classmethod
+    def lookup(cls, *fields):
+        """The ids stored under the first of `fields` that has a list."""
+        redis = cls.redis()
+        version = redis.get(cls.version_key())
+        if version != cls._cache.get(None):
+            cls.clear_cache()
+            cls._cache[None] = version
+        if fields not in cls._cache:
+            ids = []
+            if version:
+                for val in redis.hmget(cls.lists_key(version), fields):
+                    if val:
+                        per_locale, others = json.loads(val)
+                        random.shuffle(per_locale)
+                        random.shuffle(others)
+                        ids = map(int, filter(None, per_locale + others))
+                        break
+            cls._cache[fields] = ids
+        return list(cls._cache[fields])
+
+    @classmethod
+    def clear_cache(cls):
+        cls._cache.clear()
+
+
+class FeaturedManager(FeaturedLists):
+    prefix = 'addons:featured'
+    _cache = {}
+
     @classmethod
     def _get_objects(cls):
         fields = ['addon', 'type', 'locale', 'application']
@@ -142,67 +267,45 @@ class FeaturedManager(object):
 
     @classmethod
     def build(cls):
-        qs = list(cls.get_objects())
+        qs = [row for row in cls.get_objects() if row['addon']]
         # Normalize empty values.
         for row in qs:
             if not row['locale']:
                 row['locale'] = None
 
-        by_type = sorted_groupby(qs, itemgetter('type'))
-        by_locale = sorted_groupby(qs, itemgetter('locale'))
-        by_app = sorted_groupby(qs, itemgetter('application'))
-
-        pipe = cls.redis().pipeline(transaction=False)
-        pipe.delete(cls.by_id)
-        for row in qs:
-            pipe.sadd(cls.by_id, row['addon'])
-
-        groups = zip((cls.by_type, cls.by_locale, cls.by_app),
-                     (by_type, by_locale, by_app))
-        for prefixer, group in groups:
-            for key, rows in group:
-                name = prefixer(key)
-                pipe.delete(name)
-                for row in rows:
-                    if row['addon']:
-                        pipe.sadd(name, row['addon'])
-        pipe.execute()
+        lists = {}
+        for app, rows in sorted_groupby(qs, itemgetter('application')):
+            rows = list(rows)
+            types = set(row['type'] for row in rows)
+            for type in [None] + sorted(types):
+                if type is not None:
+                    rows_ = [row for row in rows if row['type'] == type]
+                else:
+                    rows_ = rows
+                all_ = set(row['addon'] for row in rows_)
+                unrestricted = set(row['addon'] for row in rows_
+                                   if row['locale'] is None)
+                # No language: everything, locale restrictions or not.
+                lists[cls.field(app, type, '')] = [], all_
+                lists[cls.field(app, type, cls.ANY)] = [], unrestricted
+                for locale, rs in sorted_groupby(rows_, itemgetter('locale')):
+                    if locale:
+                        per_locale = set(row['addon'] for row in rs)
+                        lists[cls.field(app, type, locale)] = (
+                            per_locale, unrestricted - per_locale)
+        cls.materialize(lists)
 
     @classmethod
-    @lru_cache.lru_cache(maxsize=100)
-    @memoize(prefix, time=60 * 10)
     def featured_ids(cls, app, lang=None, type=None):
-        redis = cls.redis()
-        base = (cls.by_id, cls.by_app(app.id))
-        if type is not None:
-            base += (cls.by_type(type),)
-        if lang:
-            all_ = redis.sinter(base + (cls.by_locale(None),))
-            per_locale = redis.sinter(base + (cls.by_locale(lang),))
-        else:
-            all_ = redis.sinter(base)
-            per_locale = set()
-        others = list(all_ - per_locale)
-        per_locale = list(per_locale)
-        random.shuffle(per_locale)
-        random.shuffle(others)
-        return map(int, filter(None, per_locale + others))
+        if not lang:
+            return cls.lookup(cls.field(app.id, type, ''))
+        return cls.lookup(cls.field(app.id, type, lang.lower()),
+                          cls.field(app.id, type, cls.ANY))
 
 
-class CreaturedManager(object):
+class CreaturedManager(FeaturedLists):
     prefix = 'addons:creatured'
-
-    @classmethod
-    def by_cat(cls, cat, app):
-        return '%s:%s:%s' % (cls.prefix, cat, app)
-
-    @classmethod
-    def by_locale(cls, cat, app, locale):
-        return '%s:%s:%s:%s' % (cls.prefix, cat, app, locale.lower())
-
-    @classmethod
-    def redis(cls):
-        return redisutils.connections['master']
+    _cache = {}
 
     @classmethod
     def _get_objects(cls):
@@ -231,7 +334,7 @@ class CreaturedManager(object):
 
     @classmethod
     def build(cls):
-        qs = list(cls.get_objects())
+        qs = [row for row in cls.get_objects() if row['addon']]
         # Expand any comma-separated lists of locales.
         for row in list(qs):
             # Normalize empty strings to None.
@@ -244,31 +347,23 @@ class CreaturedManager(object):
                     d['locales'] = locale.strip()
                     qs.append(d)
 
-        pipe = cls.redis().pipeline(transaction=False)
+        lists = {}
         catapp = itemgetter('category', 'app')
         for (category, app), rows in sorted_groupby(qs, catapp):
+            rows = list(rows)
+            unrestricted = set(row['addon'] for row in rows
+                               if not row['locales'])
+            lists[cls.field(category, app, cls.ANY)] = [], unrestricted
             locale_getter = itemgetter('locales')
             for locale, rs in sorted_groupby(rows, locale_getter):
                 if locale:
-                    name = cls.by_locale(category, app, locale)
-                else:
-                    name = cls.by_cat(category, app)
-                pipe.delete(name)
-                for row in rs:
-                    if row['addon']:
-                        pipe.sadd(name, row['addon'])
-        pipe.execute()
+                    per_locale = set(row['addon'] for row in rs)
+                    lists[cls.field(category, app, locale)] = (
+                        per_locale, unrestricted - per_locale)
+        cls.materialize(lists)
 
     @classmethod
-    @lru_cache.lru_cache(maxsize=100)
-    @memoize(prefix, time=60 * 10)
     def creatured_ids(cls, category, lang):
-        redis = cls.redis()
-        all_ = redis.smembers(cls.by_cat(category.id, category.application_id))
-        locale_key = cls.by_locale(category.id, category.application_id, lang)
-        per_locale = redis.smembers(locale_key)
-        others = list(all_ - per_locale)
-        per_locale = list(per_locale)
-        random.shuffle(others)
-        random.shuffle(per_locale)
-        return map(int, filter(None, per_locale + others))
+        parts = category.id, category.application_id
+        return cls.lookup(cls.field(*(parts + ((lang or '').lower(),))),
+                          cls.field(*(parts + (cls.ANY,))))
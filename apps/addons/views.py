@@ -25,7 +25,7 @@ from mobility.decorators import mobilized, mobile_template
 
 import amo
 from amo import messages
-from amo.decorators import login_required, write
+from amo.decorators import login_required, query_budget, write
 from amo.forms import AbuseForm
 from amo.helpers import shared_url
 from amo.utils import sorted_groupby, randslice
@@ -70,6 +70,7 @@ def author_addon_clicked(f):
     return decorated
 
 
+@query_budget(60)
 @addon_disabled_view
 def addon_detail(request, addon):
     """Add-ons details page dispatcher."""
@@ -365,6 +366,7 @@ def home(request):
                          'src': 'homepage', 'collections': collections})
 
 
+@query_budget(50)
 @mobilized(home)
 def home(request):
     # Shuffle the list and get 3 items.
@@ -8,6 +8,7 @@ from django.conf import settings
 from django.utils.http import urlquote
 
 from . import models as context
+from . import routers
 from .urlresolvers import reverse
 
 
@@ -103,6 +104,17 @@ def use_master(f):
     return wrapper
 
 
+def max_staleness(seconds):
+    """Read from replicas at most `seconds` behind the master."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kw):
+            with routers.max_staleness(seconds):
+                return f(*args, **kw)
+        return wrapper
+    return decorator
+
+
 def write(f):
     return use_master(skip_cache(f))
 
@@ -137,3 +149,14 @@ def no_login_required(f):
     """
     f._no_login_required = True
     return f
+
+
+def query_budget(budget):
+    """
+    The most queries this view should run.  QueryBudgetMiddleware reports
+    requests that go over.
+    """
+    def decorator(f):
+        f._query_budget = budget
+        return f
+    return decorator
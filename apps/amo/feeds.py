@@ -0,0 +1,114 @@
+import hashlib
+from datetime import datetime
+
+from django import http
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import translation
+from django.utils.encoding import smart_str
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+
+from amo.utils import epoch
+
+# Generations outlive the documents; if one is evicted we start from 0 again
+# and the modified stamp still has to match.
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+FEED_TIMEOUT = 60 * 60 * 24
+
+
+def _generation_key(kind, id):
+    return '%s:feed-generation:%s:%s' % (settings.CACHE_PREFIX, kind, id)
+
+
+def _invalidated_key(kind, id):
+    return '%s:feed-invalidated:%s:%s' % (settings.CACHE_PREFIX, kind, id)
+
+
+def feed_state(kind, id):
+    """(generation, time of the last invalidate_feed) for (kind, id)."""
+    keys = _generation_key(kind, id), _invalidated_key(kind, id)
+    state = cache.get_many(keys)
+    return state.get(keys[0]) or 0, state.get(keys[1])
+
+
+def invalidate_feed(kind, id):
+    """Stop serving the cached feeds for (kind, id), e.g. ('addon', 3615)."""
+    key = _generation_key(kind, id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, GENERATION_TIMEOUT)
+    # Deletes and update()s don't move the items' modified times, so
+    # Last-Modified has to come from here too.
+    cache.set(_invalidated_key(kind, id), datetime.now(), GENERATION_TIMEOUT)
+
+
+class CachedFeed(Feed):
+    """
+    A Feed that answers conditional GETs and caches the rendered document.
+
+    Subclasses set `feed_kind` and implement feed_stamp(obj), which returns
+    the latest modified time of the feed's items from a single query,
+    followed by anything else that changes with them (like a count).  The
+    ETag covers the stamp and a generation bumped by invalidate_feed from
+    the model signals, since not every change touches modified;
+    Last-Modified is the later of the stamp and the last invalidation.
+    """
+    feed_kind = None
+
+    def feed_stamp(self, obj):
+        raise NotImplementedError
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise http.Http404('Feed object does not exist.')
+
+        stamp = self.feed_stamp(obj)
+        generation, invalidated = feed_state(self.feed_kind, obj.pk)
+        if generation and not invalidated:
+            # We lost track of when it changed, so don't answer by date.
+            modified = None
+        else:
+            # Either can be missing: no items, or nothing invalidated since
+            # the cache was last cleared.
+            dates = filter(None, (stamp[0], invalidated))
+            modified = max(dates) if dates else None
+        parts = (self.__class__.__name__, request.get_full_path(),
+                 translation.get_language(), generation) + tuple(stamp)
+        etag = hashlib.md5(':'.join(map(smart_str, parts))).hexdigest()
+
+        if self.not_modified(request, etag, modified):
+            response = http.HttpResponseNotModified()
+        else:
+            key = '%s:feed:%s' % (settings.CACHE_PREFIX, etag)
+            cached = cache.get(key)
+            if cached is None:
+                feedgen = self.get_feed(obj, request)
+                response = http.HttpResponse(mimetype=feedgen.mime_type)
+                feedgen.write(response, 'utf-8')
+                cache.set(key, (response.content, feedgen.mime_type),
+                          FEED_TIMEOUT)
+            else:
+                content, mimetype = cached
+                response = http.HttpResponse(content, mimetype=mimetype)
+
+        response['ETag'] = quote_etag(etag)
+        if modified:
+            response['Last-Modified'] = http_date(epoch(modified))
+        return response
+
+    def not_modified(self, request, etag, modified):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return etag in etags or '*' in etags
+        since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'))
+        return bool(since and modified and epoch(modified) <= since)
@@ -0,0 +1,46 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.test.client import RequestFactory
+
+from amo import urlresolvers
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--pages', action='store', type='int', default=1000,
+                    help='How many search result pages to build links for.'),
+    )
+    help = ('Compare uncached and cached URL reversal for the links on a '
+            '20 item search results page, with different add-ons on every '
+            'page.')
+
+    def handle(self, *args, **options):
+        names = ('addons.detail', 'addons.reviews.list', 'addons.reviews.add',
+                 'addons.versions', 'addons.detail_more')
+        pages = [[(name, ['addon-%s-%s' % (page, i)])
+                  for i in range(20) for name in names]
+                 for page in xrange(options['pages'])]
+        request = RequestFactory().get('/en-US/firefox/search/')
+        prefixer = urlresolvers.Prefixer(request)
+        urlresolvers.set_url_prefix(prefixer)
+        print '%s pages of %s links.' % (len(pages), len(pages[0]))
+
+        def uncached(links):
+            for name, args in links:
+                prefixer.fix(urlresolvers.django_reverse(name, args=args,
+                                                         prefix='/'))
+
+        def cached(links):
+            for name, args in links:
+                urlresolvers.reverse(name, args=args)
+
+        try:
+            for name, func in (('uncached', uncached), ('cached', cached)):
+                start = time.time()
+                for links in pages:
+                    func(links)
+                print '%-10s %8.2fs' % (name, time.time() - start)
+        finally:
+            urlresolvers.clean_url_prefixes()
@@ -0,0 +1,49 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from multidb import PinningMasterSlaveRouter
+
+from amo import routers
+from addons.models import Addon
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--queries', action='store', type='int', default=100000,
+                    help='How many reads to route.'),
+        make_option('--slaves', action='store', type='int', default=4,
+                    help='How many fake slaves to pick from.'),
+    )
+    help = ('Compare the time multidb and the lag-aware router take to pick '
+            'a database for each read.')
+
+    def handle(self, *args, **options):
+        n = options['queries']
+        aliases = ['slave-%s' % i for i in range(options['slaves'])]
+        lags = dict((alias, i * 10) for i, alias in enumerate(aliases))
+        latencies = dict((alias, .001 * (i + 1))
+                         for i, alias in enumerate(aliases))
+        probe = routers.FakeProbe(lags, latencies)
+        # It samples from its own thread, so reads never wait on the probe.
+        monitor = routers.ReplicaMonitor(aliases, probe, 30, 1)
+        print '%s reads, %s slaves.' % (n, len(aliases))
+
+        def timeit(name, router):
+            start = time.time()
+            for _ in xrange(n):
+                router.db_for_read(Addon)
+            elapsed = time.time() - start
+            print '%-10s %8.2fs %8.2fus/query' % (name, elapsed,
+                                                  elapsed / n * 1e6)
+
+        timeit('multidb', PinningMasterSlaveRouter())
+        old = routers._monitor
+        try:
+            routers._monitor = monitor
+            timeit('lag-aware', routers.LagAwareRouter())
+            with routers.max_staleness(15):
+                timeit('staleness', routers.LagAwareRouter())
+        finally:
+            routers._monitor = old
@@ -25,6 +25,7 @@ from statsd import statsd
 import amo
 from . import urlresolvers
 from .helpers import urlparams
+from .queries import QueryLog
 
 
 class LocaleAndAppURLMiddleware(object):
@@ -163,6 +164,7 @@ class ReadOnlyMiddleware(object):
 
 
 pjax_log = commonware.log.getLogger('z.timer')
+query_log = commonware.log.getLogger('z.queries')
 
 
 class LazyPjaxMiddleware(object):
@@ -247,3 +249,33 @@ class NoAddonsMiddleware(ViewMiddleware):
         name = self.get_name(view_func)
         if name.startswith(settings.NO_ADDONS_MODULES):
             raise Http404
+
+
+class QueryBudgetMiddleware(ViewMiddleware):
+    """
+    Record the queries of every request and report the views that go over
+    the budget they declare with amo.decorators.query_budget.  This keeps
+    the SQL of each query around, so it's opt-in.
+    """
+
+    def process_request(self, request):
+        request._query_log = QueryLog().start()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, '_query_budget', None)
+        request._query_view = self.get_name(view_func)
+
+    def process_response(self, request, response):
+        log = getattr(request, '_query_log', None)
+        if log is None:
+            return response
+        log.stop()
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and log.count > budget:
+            view = request._query_view
+            statsd.incr('queries.over_budget.%s' % view)
+            query_log.warning(u'%s ran %s queries (budget %s) in %.0fms on '
+                              u'%s. Repeated: %s' % (
+                                  view, log.count, budget, log.time * 1000,
+                                  request.path, log.summary()))
+        return response
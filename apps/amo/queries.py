@@ -0,0 +1,80 @@
+import collections
+import re
+
+from django.db import connections
+
+# Literals that change between otherwise identical queries.
+_fingerprint_res = [
+    (re.compile(r"'(?:[^'\\]|\\.)*'"), '?'),
+    (re.compile(r'"(?:[^"\\]|\\.)*"'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    """Normalize `sql` so the same query with other values looks the same."""
+    for regex, replacement in _fingerprint_res:
+        sql = regex.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryLog(object):
+    """
+    Records the queries run on every connection while it's active.
+
+    This turns on Django's debug cursor, which keeps the SQL and the time of
+    each query in connection.queries, and takes the new ones off the end.
+
+        with QueryLog() as log:
+            ...
+        log.count, log.time, log.duplicates()
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._state = None
+
+    def start(self):
+        self._state = []
+        for connection in connections.all():
+            self._state.append((connection, connection.use_debug_cursor,
+                                len(connection.queries)))
+            connection.use_debug_cursor = True
+        return self
+
+    def stop(self):
+        if self._state is None:
+            return
+        for connection, debug, start in self._state:
+            self.queries.extend(connection.queries[start:])
+            connection.use_debug_cursor = debug
+        self._state = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time(self):
+        """Total time spent in queries, in seconds."""
+        return sum(float(q['time']) for q in self.queries)
+
+    def duplicates(self):
+        """[(count, fingerprint)] of the repeated queries, most first."""
+        counts = collections.defaultdict(int)
+        for q in self.queries:
+            counts[fingerprint(q['sql'])] += 1
+        return sorted(((n, sql) for sql, n in counts.items() if n > 1),
+                      reverse=True)
+
+    def summary(self, limit=5):
+        return '; '.join('%sx %s' % dupe
+                         for dupe in self.duplicates()[:limit])
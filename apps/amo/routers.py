@@ -0,0 +1,267 @@
+"""
+A database router that keeps reads off lagging replicas.
+
+The ReplicaMonitor asks a LagProbe how far behind each alias in
+settings.SLAVE_DATABASES is every REPLICA_LAG_INTERVAL seconds, from a
+background thread in each process so requests never wait on a probe.  Until
+the first sample is in we route like multidb does.  Replicas more than
+REPLICA_MAX_LAG seconds behind are left out, the rest are picked at random
+weighted by how quickly they answered the probe, and if none are left reads
+go to the master.
+
+Code that can only stand so much stale data says so with max_staleness:
+
+    with max_staleness(0):
+        ...  # Reads go to the master.
+
+    cursor = connections[get_slave(max_staleness=60)].cursor()
+"""
+import bisect
+import contextlib
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.importlib import import_module
+
+import commonware.log
+import multidb.pinning
+import MySQLdb as mysql
+from multidb import PinningMasterSlaveRouter
+
+log = commonware.log.getLogger('z.db')
+
+# Weight for a replica we haven't timed yet, and the floor for the ones we
+# have so one fast answer can't take all of the traffic.
+DEFAULT_LATENCY = .01
+MIN_LATENCY = .001
+# How much each new probe moves the latency average.
+LATENCY_DECAY = .3
+
+_locals = threading.local()
+
+
+class LagProbe(object):
+    """Finds out how far behind a replica is."""
+
+    def lag(self, alias):
+        """
+        Seconds `alias` is behind the master.  None means we can't tell and
+        float('inf') means replication isn't running.
+        """
+        raise NotImplementedError
+
+    def __call__(self, alias):
+        """(lag, seconds the probe took) for `alias`."""
+        start = time.time()
+        lag = self.lag(alias)
+        return lag, time.time() - start
+
+
+class SlaveStatusProbe(LagProbe):
+    """
+    Reads Seconds_Behind_Master from SHOW SLAVE STATUS.  The probe keeps its
+    own connections, opened with REPLICA_PROBE_TIMEOUT so a replica that's
+    down can't hold up the sampling for long.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or settings.REPLICA_PROBE_TIMEOUT
+        self.connections = {}
+
+    def connect(self, alias):
+        db = settings.DATABASES[alias]
+        kw = dict(host=db['HOST'], user=db['USER'], passwd=db['PASSWORD'],
+                  db=db['NAME'], connect_timeout=self.timeout)
+        if db.get('PORT'):
+            kw['port'] = int(db['PORT'])
+        return mysql.connect(**kw)
+
+    def lag(self, alias):
+        if alias not in self.connections:
+            self.connections[alias] = self.connect(alias)
+        try:
+            cursor = self.connections[alias].cursor()
+            cursor.execute('SHOW SLAVE STATUS')
+            row = cursor.fetchone()
+        except Exception:
+            # Connect again next time.
+            del self.connections[alias]
+            raise
+        if row is None:
+            # Not a replica, or the user can't see its status.
+            return None
+        columns = [c[0] for c in cursor.description]
+        lag = dict(zip(columns, row)).get('Seconds_Behind_Master')
+        return float('inf') if lag is None else lag
+
+
+class FakeProbe(LagProbe):
+    """
+    Answers from dicts of {alias: lag} and {alias: latency} for the tests.
+    A lag that's an exception gets raised.
+    """
+
+    def __init__(self, lags, latencies=None):
+        self.lags = lags
+        self.latencies = latencies or {}
+        self.calls = 0
+
+    def __call__(self, alias):
+        self.calls += 1
+        lag = self.lags.get(alias)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag, self.latencies.get(alias, DEFAULT_LATENCY)
+
+
+class ReplicaMonitor(object):
+
+    def __init__(self, aliases, probe, max_lag, interval):
+        self.aliases = list(aliases)
+        self.probe = probe
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lags = {}
+        self.latencies = {}
+        self.sampled = None
+        # {max_staleness: (aliases, cumulative weights)}
+        self._choices = {}
+        self._lock = threading.Lock()
+        # The process the sampling thread is running in.  Threads don't
+        # survive a fork, so the children start their own.
+        self._pid = None
+
+    def sample(self):
+        lags = {}
+        for alias in self.aliases:
+            try:
+                lag, latency = self.probe(alias)
+            except Exception, e:
+                log.warning('Could not check lag on %s: %s' % (alias, e))
+                lags[alias] = None
+                continue
+            lags[alias] = lag
+            old = self.latencies.get(alias, latency)
+            self.latencies[alias] = (LATENCY_DECAY * latency +
+                                     (1 - LATENCY_DECAY) * old)
+            if lag is not None and lag > self.max_lag:
+                log.info('Skipping %s, %ss behind.' % (alias, lag))
+        self.lags = lags
+        self._choices = {}
+        self.sampled = time.time()
+
+    def start(self):
+        """Start sampling in the background, once per process."""
+        pid = os.getpid()
+        if self._pid == pid or not self.aliases:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            thread = threading.Thread(target=self.run, name='replica-monitor')
+            thread.daemon = True
+            thread.start()
+            self._pid = pid
+
+    def run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception, e:
+                log.error('Could not sample replica lag: %s' % e)
+            time.sleep(self.interval)
+
+    def healthy(self, max_staleness=None):
+        """
+        The replicas that are close enough to the master.  We keep the ones
+        whose lag we couldn't find out, like the plain router would, unless
+        the caller asked for a specific max_staleness.
+        """
+        limit = self.max_lag
+        if max_staleness is not None:
+            limit = min(limit, max_staleness)
+        rv = []
+        for alias in self.aliases:
+            lag = self.lags.get(alias)
+            if lag is None:
+                if max_staleness is None:
+                    rv.append(alias)
+            elif lag <= limit:
+                rv.append(alias)
+        return rv
+
+    def choose(self, max_staleness=None):
+        self.start()
+        # sample() swaps in a new dict, so hold on to the one we looked in.
+        choices = self._choices
+        try:
+            aliases, totals = choices[max_staleness]
+        except KeyError:
+            aliases, totals = choices[max_staleness] = (
+                self._weigh(self.healthy(max_staleness)))
+        if not aliases:
+            return DEFAULT_DB_ALIAS
+        return aliases[bisect.bisect(totals, random.random() * totals[-1])]
+
+    def _weigh(self, aliases):
+        totals, total = [], 0
+        for alias in aliases:
+            latency = self.latencies.get(alias, DEFAULT_LATENCY)
+            total += 1.0 / max(latency, MIN_LATENCY)
+            totals.append(total)
+        return aliases, totals
+
+
+_monitor = None
+
+
+def get_monitor():
+    global _monitor
+    if _monitor is None:
+        module, name = settings.REPLICA_LAG_PROBE.rsplit('.', 1)
+        probe = getattr(import_module(module), name)()
+        _monitor = ReplicaMonitor(settings.SLAVE_DATABASES, probe,
+                                  settings.REPLICA_MAX_LAG,
+                                  settings.REPLICA_LAG_INTERVAL)
+    return _monitor
+
+
+def current_staleness():
+    return getattr(_locals, 'max_staleness', None)
+
+
+@contextlib.contextmanager
+def max_staleness(seconds):
+    """Within this context, reads only go to replicas at most `seconds`
+    behind, or to the master if there aren't any."""
+    old = current_staleness()
+    if old is not None:
+        seconds = min(old, seconds)
+    _locals.max_staleness = seconds
+    try:
+        yield
+    finally:
+        _locals.max_staleness = old
+
+
+def get_slave(max_staleness=None):
+    """A replica alias for raw cursors, like multidb.get_slave()."""
+    if max_staleness is None:
+        max_staleness = current_staleness()
+    elif current_staleness() is not None:
+        max_staleness = min(max_staleness, current_staleness())
+    if max_staleness == 0:
+        return DEFAULT_DB_ALIAS
+    return get_monitor().choose(max_staleness)
+
+
+class LagAwareRouter(PinningMasterSlaveRouter):
+
+    def db_for_read(self, model, **hints):
+        if multidb.pinning.this_thread_is_pinned():
+            return DEFAULT_DB_ALIAS
+        return get_slave()
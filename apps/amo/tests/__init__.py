@@ -21,6 +21,7 @@ from redisutils import mock_redis, reset_redis
 import test_utils
 
 import amo
+from amo.queries import QueryLog
 from amo.urlresolvers import Prefixer, get_url_prefix, set_url_prefix
 import addons.search
 from addons.models import Addon, Persona
@@ -173,8 +174,8 @@ class TestCase(RedisTest, test_utils.TestCase):
         from addons.utils import FeaturedManager, CreaturedManager
         reset_featured_addons()
         # Clear the in-process caches.
-        FeaturedManager.featured_ids.clear()
-        CreaturedManager.creatured_ids.clear()
+        FeaturedManager.clear_cache()
+        CreaturedManager.clear_cache()
 
     @contextmanager
     def activate(self, locale):
@@ -187,6 +188,19 @@ class TestCase(RedisTest, test_utils.TestCase):
         set_url_prefix(old_prefix)
         translation.activate(old_locale)
 
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """
+        Fail if the block runs more than `budget` queries, listing the
+        queries that were repeated.
+        """
+        with QueryLog() as log:
+            yield log
+        if log.count > budget:
+            repeated = ['%sx %s' % dupe for dupe in log.duplicates()]
+            self.fail('%s queries, budget is %s. Repeated:\n%s' % (
+                log.count, budget, '\n'.join(repeated) or 'nothing'))
+
     def assertNoFormErrors(self, response):
         """Asserts that no form in the context has errors.
 
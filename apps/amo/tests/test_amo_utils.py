@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 import os
+import shutil
 import tempfile
 
 from django.conf import settings
 from django.core.validators import ValidationError
 
+import mock
 from nose.tools import eq_, assert_raises
+from PIL import Image
 
-from amo.utils import slug_validator, slugify, resize_image, to_language
+from amo.utils import (pool_imap, slug_validator, slugify, resize_image,
+                       resize_images, to_language)
 from product_details import product_details
 
 u = u'Ελληνικά'
@@ -65,6 +69,41 @@ def test_resize_transparency():
             os.remove(dest)
 
 
+def test_resize_images():
+    src = os.path.join(settings.ROOT, 'apps', 'amo', 'tests',
+                       'images', 'mozilla.png')
+    dest = tempfile.mkdtemp(dir=settings.TMP_PATH)
+    outputs = [(os.path.join(dest, '%s.png' % s), (s, s))
+               for s in (32, 64, 100)]
+    try:
+        sizes = resize_images(src, outputs)
+        eq_([sizes[d] for d, s in outputs], [(32, 12), (64, 24), (82, 31)])
+        for dst, size in outputs:
+            eq_(Image.open(dst).size, sizes[dst])
+            # Each one matches resizing straight from the original.
+            single = os.path.join(dest, 'single.png')
+            eq_(resize_image(src, single, size, remove_src=False),
+                sizes[dst])
+        eq_(sorted(os.listdir(dest)),
+            ['100.png', '32.png', '64.png', 'single.png'])
+    finally:
+        shutil.rmtree(dest)
+
+
+@mock.patch('amo.utils.connections')
+@mock.patch('amo.utils.multiprocessing.Pool')
+def test_pool_imap(Pool, connections):
+    conn = mock.Mock()
+    connections.all.return_value = [conn]
+    pool = Pool.return_value
+    pool.imap_unordered = lambda func, args, chunksize: map(func, args)
+    eq_(sorted(pool_imap(abs, [-2, 1], 3, maxtasksperchild=5)), [1, 2])
+    # Nothing forked shares a connection with us.
+    assert conn.close.called
+    Pool.assert_called_with(3, maxtasksperchild=5)
+    assert pool.close.called and pool.join.called
+
+
 def test_to_language():
     tests = (('en-us', 'en-US'),
              ('en_US', 'en-US'),
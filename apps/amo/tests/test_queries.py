@@ -0,0 +1,76 @@
+from django import http
+
+import mock
+from nose.tools import eq_
+import test_utils
+
+import amo.tests
+from amo.decorators import query_budget
+from amo.middleware import QueryBudgetMiddleware
+from amo.queries import fingerprint
+from addons.models import Addon
+from versions.models import Version
+
+
+def test_fingerprint():
+    eq_(fingerprint("SELECT * FROM `addons` WHERE `id` = 3 AND "
+                    "`slug` = 'a3615'"),
+        'SELECT * FROM `addons` WHERE `id` = ? AND `slug` = ?')
+    eq_(fingerprint('SELECT 1 FROM t1_name WHERE id IN (1, 2,\n 3)'),
+        'SELECT ? FROM t1_name WHERE id IN (?+)')
+    eq_(fingerprint('x IN (1)'), fingerprint('x IN (1, 2, 3)'))
+
+
+class TestQueryBudget(amo.tests.TestCase):
+    fixtures = ['base/addon_3615', 'base/addon_5299_gcal']
+
+    def setUp(self):
+        self.addons = list(Addon.objects.no_cache().no_transforms()
+                           .filter(id__in=[3615, 5299]))
+
+    def versions_each(self):
+        # A seeded N+1: one version query per add-on.
+        for addon in self.addons:
+            list(Version.objects.no_cache().no_transforms()
+                 .filter(addon=addon))
+
+    def test_n_plus_one(self):
+        try:
+            with self.assertQueryBudget(1):
+                self.versions_each()
+        except AssertionError, e:
+            msg = str(e)
+        else:
+            self.fail('The N+1 went over budget without failing.')
+        assert msg.startswith('2 queries, budget is 1.'), msg
+        assert '2x SELECT' in msg and '`versions`' in msg, msg
+
+    def test_within_budget(self):
+        with self.assertQueryBudget(1) as log:
+            list(Version.objects.no_cache().no_transforms()
+                 .filter(addon__in=self.addons))
+        eq_(log.count, 1)
+        eq_(log.duplicates(), [])
+
+    @mock.patch('amo.middleware.statsd')
+    def test_middleware(self, statsd):
+        @query_budget(1)
+        def view(request):
+            self.versions_each()
+            return http.HttpResponse()
+
+        middleware = QueryBudgetMiddleware()
+        request = test_utils.RequestFactory().get('/')
+        middleware.process_request(request)
+        middleware.process_view(request, view, (), {})
+        middleware.process_response(request, view(request))
+        name = '%s.%s' % (__name__, 'view')
+        statsd.incr.assert_called_with('queries.over_budget.%s' % name)
+
+        # Within budget, nothing is reported.
+        statsd.reset_mock()
+        view._query_budget = 2
+        middleware.process_request(request)
+        middleware.process_view(request, view, (), {})
+        middleware.process_response(request, view(request))
+        assert not statsd.incr.called
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+import mock
+import multidb.pinning
+import MySQLdb as mysql
+from nose.tools import eq_
+
+import amo.tests
+from amo import routers
+from amo.decorators import max_staleness
+from amo.routers import FakeProbe, ReplicaMonitor
+
+
+def monitor(lags, latencies=None, max_lag=30, interval=10):
+    probe = FakeProbe(lags, latencies)
+    return ReplicaMonitor(sorted(lags), probe, max_lag, interval)
+
+
+class TestReplicaMonitor(amo.tests.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('amo.routers.threading.Thread')
+        self.thread = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_skips_lagging(self):
+        m = monitor({'a': 5, 'b': 31, 'c': 30})
+        m.sample()
+        eq_(m.healthy(), ['a', 'c'])
+        eq_(set(m.choose() for _ in range(50)), set(['a', 'c']))
+
+    def test_stopped(self):
+        m = monitor({'a': float('inf'), 'b': 0})
+        m.sample()
+        eq_(m.healthy(), ['b'])
+
+    def test_master_when_none_healthy(self):
+        m = monitor({'a': 100, 'b': float('inf')})
+        m.sample()
+        eq_(m.choose(), DEFAULT_DB_ALIAS)
+
+    def test_no_slaves(self):
+        eq_(monitor({}).choose(), DEFAULT_DB_ALIAS)
+
+    @mock.patch('amo.routers.log')
+    def test_unknown_lag(self, log):
+        m = monitor({'a': None, 'b': Exception('nope'), 'c': 1})
+        m.sample()
+        assert log.warning.called
+        # Like the plain router, unless we were asked for fresh data.
+        eq_(m.healthy(), ['a', 'b', 'c'])
+        eq_(m.healthy(max_staleness=60), ['c'])
+
+    def test_max_staleness(self):
+        m = monitor({'a': 5, 'b': 20})
+        m.sample()
+        eq_(m.healthy(max_staleness=10), ['a'])
+        eq_(m.healthy(max_staleness=60), ['a', 'b'])
+        eq_(m.choose(max_staleness=1), DEFAULT_DB_ALIAS)
+
+    @mock.patch('amo.routers.random.random')
+    def test_weighted_by_latency(self, random):
+        m = monitor({'a': 0, 'b': 0}, {'a': .001, 'b': .01})
+        # Weights are 1000 and 100.
+        random.return_value = .5
+        eq_(m.choose(), 'a')
+        random.return_value = .95
+        eq_(m.choose(), 'b')
+
+    def test_latency_average(self):
+        m = monitor({'a': 0}, {'a': 1.0})
+        m.sample()
+        eq_(m.latencies['a'], 1.0)
+        m.probe.latencies['a'] = 2.0
+        m.sample()
+        eq_(round(m.latencies['a'], 6), 1.3)
+
+    def test_samples_in_background(self):
+        m = monitor({'a': 0, 'b': 100})
+        # Nothing sampled yet, so any of them will do.
+        assert m.choose() in ('a', 'b')
+        eq_(m.probe.calls, 0)
+        self.thread.assert_called_with(target=m.run, name='replica-monitor')
+        assert self.thread.return_value.start.called
+        m.choose()
+        eq_(self.thread.call_count, 1)
+
+        # A forked child starts its own thread.
+        with mock.patch('amo.routers.os.getpid') as getpid:
+            getpid.return_value = -1
+            m.choose()
+        eq_(self.thread.call_count, 2)
+
+    def test_no_thread_without_slaves(self):
+        monitor({}).choose()
+        assert not self.thread.called
+
+    @mock.patch('amo.routers.time.sleep')
+    def test_run(self, sleep):
+        class Stop(Exception):
+            pass
+
+        def stop(seconds):
+            raise Stop
+        sleep.side_effect = stop
+        m = monitor({'a': 0, 'b': 100}, interval=5)
+        self.assertRaises(Stop, m.run)
+        sleep.assert_called_with(5)
+        eq_(m.healthy(), ['a'])
+
+
+class TestRouting(amo.tests.TestCase):
+
+    def setUp(self):
+        self.monitor = monitor({'a': 5, 'b': 20})
+        self.monitor.sample()
+        patcher = mock.patch('amo.routers.get_monitor')
+        patcher.start().return_value = self.monitor
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('amo.routers.threading.Thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_slave(self):
+        eq_(routers.get_slave(max_staleness=10), 'a')
+        eq_(routers.get_slave(max_staleness=0), DEFAULT_DB_ALIAS)
+        assert routers.get_slave() in ('a', 'b')
+
+    def test_context(self):
+        with routers.max_staleness(10):
+            eq_(routers.get_slave(), 'a')
+            eq_(routers.get_slave(max_staleness=60), 'a')
+            with routers.max_staleness(60):
+                eq_(routers.get_slave(), 'a')
+            with routers.max_staleness(0):
+                eq_(routers.get_slave(), DEFAULT_DB_ALIAS)
+        eq_(routers.current_staleness(), None)
+
+    def test_decorator(self):
+        @max_staleness(10)
+        def view():
+            return routers.get_slave()
+        eq_(view(), 'a')
+        eq_(routers.current_staleness(), None)
+
+    def test_router(self):
+        router = routers.LagAwareRouter()
+        with routers.max_staleness(10):
+            eq_(router.db_for_read(None), 'a')
+            multidb.pinning.pin_this_thread()
+            try:
+                eq_(router.db_for_read(None), DEFAULT_DB_ALIAS)
+            finally:
+                multidb.pinning.unpin_this_thread()
+        eq_(router.db_for_write(None), DEFAULT_DB_ALIAS)
+
+
+@mock.patch('amo.routers.mysql.connect')
+def test_slave_status_probe(connect):
+    cursor = mock.Mock()
+    cursor.description = [('Slave_IO_State',), ('Seconds_Behind_Master',)]
+    connect.return_value.cursor.return_value = cursor
+    probe = routers.SlaveStatusProbe(timeout=3)
+
+    cursor.fetchone.return_value = ('Waiting for master', 12)
+    eq_(probe.lag('default'), 12)
+    cursor.execute.assert_called_with('SHOW SLAVE STATUS')
+    db = settings.DATABASES['default']
+    eq_(connect.call_args[1]['connect_timeout'], 3)
+    eq_(connect.call_args[1]['db'], db['NAME'])
+
+    cursor.fetchone.return_value = ('', None)
+    eq_(probe.lag('default'), float('inf'))
+
+    cursor.fetchone.return_value = None
+    eq_(probe.lag('default'), None)
+    lag, latency = probe('default')
+    eq_(lag, None)
+    assert latency >= 0
+    # The connection is kept between probes.
+    eq_(connect.call_count, 1)
+
+
+@mock.patch('amo.routers.mysql.connect')
+def test_slave_status_probe_reconnects(connect):
+    def fail(sql):
+        raise mysql.OperationalError(2013, 'Lost connection')
+    connect.return_value.cursor.return_value.execute.side_effect = fail
+    probe = routers.SlaveStatusProbe()
+    for _ in range(2):
+        try:
+            probe.lag('default')
+        except mysql.OperationalError:
+            pass
+        else:
+            assert False, 'Expected the error to get out.'
+    eq_(connect.call_count, 2)
@@ -1,6 +1,7 @@
 from django import test, shortcuts
 from django.conf import settings
-from django.core.urlresolvers import set_script_prefix
+from django.core.urlresolvers import (get_resolver, set_script_prefix,
+                                      NoReverseMatch)
 
 from mock import patch
 from nose.tools import eq_, assert_not_equal
@@ -176,6 +177,63 @@ class TestPrefixer:
         eq_(urlresolvers.reverse('home'), '/en-US/apps/')
 
 
+class TestCachedReverse(test.TestCase):
+
+    def setUp(self):
+        urlresolvers._reverse_patterns.clear()
+
+    def tearDown(self):
+        urlresolvers.clean_url_prefixes()
+
+    def uncached(self, prefixer, *args, **kw):
+        try:
+            url = urlresolvers.django_reverse(*args, **kw)
+        except NoReverseMatch:
+            return NoReverseMatch
+        return prefixer.fix(url) if prefixer else url
+
+    def cached(self, *args, **kw):
+        try:
+            return urlresolvers.reverse(*args, **kw)
+        except NoReverseMatch:
+            return NoReverseMatch
+
+    def test_every_url(self):
+        resolver = get_resolver(None)
+        calls = []
+        for name in resolver.reverse_dict:
+            if not isinstance(name, basestring):
+                continue
+            for possibilities, _, _ in resolver.reverse_dict.getlist(name):
+                for _, params in possibilities:
+                    for value in ('1', 'a-slug', u'\u0ba4'):
+                        calls.append((name, [value] * len(params), {}))
+                        calls.append((name, [], dict.fromkeys(params,
+                                                              value)))
+        assert calls
+
+        rf = test_utils.RequestFactory()
+        for path in ('', '/en-US/firefox/', '/fr/thunderbird/', '/de/'):
+            prefixer = urlresolvers.Prefixer(rf.get(path)) if path else None
+            urlresolvers.set_url_prefix(prefixer)
+            prefix = '/' if prefixer else None
+            for name, args, kwargs in calls:
+                expected = self.uncached(prefixer, name, args=args,
+                                         kwargs=kwargs, prefix=prefix)
+                # Once to fill the cache and once to read from it.
+                for _ in range(2):
+                    eq_(self.cached(name, args=args, kwargs=kwargs),
+                        expected, (path, name, args, kwargs))
+
+    def test_script_prefix(self):
+        eq_(urlresolvers.reverse('home'), '/')
+        set_script_prefix('/oremj/')
+        try:
+            eq_(urlresolvers.reverse('home'), '/oremj/')
+        finally:
+            set_script_prefix('/')
+
+
 def test_redirect():
     """Make sure django.shortcuts.redirect uses our reverse."""
     test.Client().get('/')
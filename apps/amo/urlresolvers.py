@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import hashlib
+import re
 import urllib
 from threading import local
 from urlparse import urlparse, urlsplit, urlunsplit
@@ -49,6 +50,12 @@ def get_app_redirect(app):
     return new_url
 
 
+# Django finds the patterns for a view and compiles their regexes on every
+# reverse, and the re module's cache is too small to hold all of ours.  We
+# keep both per view, so reversing a new add-on's URL is cheap too.
+_reverse_patterns = {}
+
+
 def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None,
             current_app=None, add_prefix=True):
     """Wraps django's reverse to prepend the correct locale and app."""
@@ -56,12 +63,83 @@ def reverse(viewname, urlconf=None, args=None, kwargs=None, prefix=None,
     # Blank out the script prefix since we add that in prefixer.fix().
     if prefixer:
         prefix = prefix or '/'
-    url = django_reverse(viewname, urlconf, args, kwargs, prefix, current_app)
+    url = cached_reverse(viewname, urlconf, args, kwargs, prefix, current_app)
     if prefixer and add_prefix:
         return prefixer.fix(url)
     else:
         return url
 
+
+def reverse_patterns(viewname, urlconf):
+    """
+    [(possibility, compiled pattern, defaults)] for `viewname`, like the
+    resolver's reverse_dict, or None if Django has to do it.
+    """
+    key = viewname, urlconf
+    try:
+        return _reverse_patterns[key]
+    except KeyError:
+        pass
+    patterns = None
+    # Namespaced views go through more resolvers than we want to copy.
+    if not (isinstance(viewname, basestring) and ':' in viewname):
+        try:
+            view = urlresolvers.get_callable(viewname, True)
+        except (ImportError, AttributeError):
+            view = None
+        if view is not None:
+            resolver = urlresolvers.get_resolver(urlconf)
+            patterns = [(possibility, re.compile(u'^%s' % pattern, re.UNICODE),
+                         defaults)
+                        for possibility, pattern, defaults
+                        in resolver.reverse_dict.getlist(view)]
+    _reverse_patterns[key] = patterns
+    return patterns
+
+
+def cached_reverse(viewname, urlconf=None, args=None, kwargs=None,
+                   prefix=None, current_app=None):
+    """
+    Django's reverse, with the patterns for each view kept compiled.
+
+    This walks the possibilities the same way the resolver does, and when
+    none of them match, Django gets to raise NoReverseMatch itself.
+    """
+    args, kwargs = args or [], kwargs or {}
+    patterns = None
+    if not (args and kwargs):
+        patterns = reverse_patterns(viewname, urlconf or
+                                    urlresolvers.get_urlconf() or
+                                    settings.ROOT_URLCONF)
+    if patterns is None:
+        return django_reverse(viewname, urlconf, args, kwargs, prefix,
+                              current_app)
+
+    if args:
+        unicode_args = [encoding.force_unicode(v) for v in args]
+    else:
+        unicode_kwargs = dict((k, encoding.force_unicode(v))
+                              for k, v in kwargs.items())
+    for possibility, pattern, defaults in patterns:
+        for result, params in possibility:
+            if args:
+                if len(args) != len(params):
+                    continue
+                candidate = result % dict(zip(params, unicode_args))
+            else:
+                if (set(kwargs.keys() + defaults.keys()) !=
+                    set(params + defaults.keys())):
+                    continue
+                if any(kwargs.get(k, v) != v for k, v in defaults.items()):
+                    continue
+                candidate = result % unicode_kwargs
+            if pattern.search(candidate):
+                if prefix is None:
+                    prefix = urlresolvers.get_script_prefix()
+                return encoding.iri_to_uri(u'%s%s' % (prefix, candidate))
+    return django_reverse(viewname, urlconf, args, kwargs, prefix,
+                          current_app)
+
 # Replace Django's reverse with our own.
 urlresolvers.reverse = reverse
 
@@ -2,10 +2,12 @@ import contextlib
 import functools
 import hashlib
 import itertools
+import multiprocessing
 import operator
 import os
 import random
 import re
+import tempfile
 import time
 import unicodedata
 import urllib
@@ -20,6 +22,7 @@ from django.core import paginator
 from django.core.cache import cache
 from django.core.serializers import json
 from django.core.validators import ValidationError, validate_slug
+from django.db import connection, connections, transaction
 from django.core.mail import EmailMessage
 from django.forms.fields import Field
 from django.http import HttpRequest
@@ -242,6 +245,59 @@ def chunked(seq, n):
         yield rv
 
 
+def bulk_update(model, values, size=500):
+    """
+    Write {pk: {field: value}} `values` to `model` with one UPDATE per `size`
+    rows, using a CASE on the primary key for each field.
+
+    This skips save() and the signals, so callers are responsible for
+    invalidating anything cached.
+    """
+    meta, qn = model._meta, connection.ops.quote_name
+    pk = qn(meta.pk.column)
+    cursor = connection.cursor()
+    for chunk in chunked(sorted(values.items()), size):
+        sets, params = [], []
+        fields = sorted(set(f for _, row in chunk for f in row))
+        if not fields:
+            continue
+        for name in fields:
+            field = meta.get_field(name)
+            column = qn(field.column)
+            cases = []
+            for id, row in chunk:
+                if name in row:
+                    cases.append('WHEN %s THEN %s')
+                    params.extend([id, field.get_db_prep_save(
+                        row[name], connection=connection)])
+            sets.append('%s = CASE %s %s ELSE %s END' % (
+                column, pk, ' '.join(cases), column))
+        ids = [id for id, _ in chunk]
+        params.extend(ids)
+        cursor.execute('UPDATE %s SET %s WHERE %s IN (%s)' % (
+            qn(meta.db_table), ', '.join(sets), pk,
+            ', '.join(['%s'] * len(ids))), params)
+    transaction.commit_unless_managed()
+
+
+def pool_imap(func, args, processes=None, maxtasksperchild=None, chunksize=1):
+    """
+    Yield func(arg) for each of `args`, in the order they finish, from a local
+    pool of forked processes.  `func` has to be a module-level function so
+    the workers can unpickle it.
+    """
+    # The workers are forked, so don't let them share our connections.
+    for conn in connections.all():
+        conn.close()
+    pool = multiprocessing.Pool(processes, maxtasksperchild=maxtasksperchild)
+    try:
+        for rv in pool.imap_unordered(func, args, chunksize):
+            yield rv
+    finally:
+        pool.close()
+        pool.join()
+
+
 def urlencode(items):
     """A Unicode-safe URLencoder."""
     try:
@@ -398,22 +454,57 @@ Image.Image.load = patched_load
 
 def resize_image(src, dst, size, remove_src=True):
     """Resizes and image from src, to dst. Returns width and height."""
-    if src == dst:
-        raise Exception("src and dst can't be the same: %s" % src)
+    return resize_images(src, [(dst, size)], remove_src=remove_src)[dst]
 
-    dirname = os.path.dirname(dst)
-    if not os.path.exists(dirname):
-        os.makedirs(dirname)
+
+def _fit(size, box):
+    """The size scale_and_crop gives an image of `size` made to fit `box`."""
+    scale = min(float(box[0]) / size[0], float(box[1]) / size[1])
+    if scale >= 1:
+        return size
+    return int(round(size[0] * scale)), int(round(size[1] * scale))
+
+
+def resize_images(src, outputs, remove_src=False):
+    """
+    Resizes the image at src to every (dst, size) in outputs, decoding it
+    only once. The largest output is scaled from the original and every
+    smaller one from the output before it. Each dst is written to a temporary
+    file and renamed into place. Returns {dst: (width, height)}.
+    """
+    for dst, size in outputs:
+        if src == dst:
+            raise Exception("src and dst can't be the same: %s" % src)
 
     im = Image.open(src)
     im = im.convert('RGBA')
-    im = processors.scale_and_crop(im, size)
-    im.save(dst, 'png')
+    original = im.size
+    result = {}
+    for dst, size in sorted(outputs, key=lambda o: _fit(original, o[1]),
+                            reverse=True):
+        if im.size == original:
+            im = processors.scale_and_crop(im, size)
+        elif im.size != _fit(original, size):
+            im = im.resize(_fit(original, size), Image.ANTIALIAS)
+
+        dirname = os.path.dirname(dst)
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                im.save(fp, 'png')
+            os.chmod(tmp, 0644)
+            os.rename(tmp, dst)
+        except:
+            os.remove(tmp)
+            raise
+        result[dst] = im.size
 
     if remove_src:
         os.remove(src)
 
-    return im.size
+    return result
 
 
 def remove_icons(destination):
@@ -0,0 +1,43 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+import amo
+from addons.models import Addon
+from api.utils import addon_to_dict, addons_to_dicts
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--pages', action='store', type='int', default=50,
+                    help='How many pages to serialize.'),
+        make_option('--size', action='store', type='int', default=20,
+                    help='How many add-ons per page.'),
+    )
+    help = ('Compare serializing API listings one add-on at a time against '
+            'addons_to_dicts.')
+
+    def handle(self, *args, **options):
+        size = options['size']
+        ids = list(Addon.objects.filter(status=amo.STATUS_PUBLIC)
+                   .exclude(type=amo.ADDON_PERSONA)
+                   .values_list('id', flat=True)
+                   .order_by('-average_daily_users')
+                   [:options['pages'] * size])
+        pages = [ids[i:i + size] for i in range(0, len(ids), size)]
+        print '%s pages of %s add-ons.' % (len(pages), size)
+
+        def page(ids):
+            return list(Addon.objects.no_cache().filter(id__in=ids)
+                        .only_translations())
+
+        for name, func in (('per add-on', lambda a: map(addon_to_dict, a)),
+                           ('bulk', addons_to_dicts)):
+            took = 0
+            for ids in pages:
+                addons = page(ids)
+                start = time.time()
+                func(addons)
+                took += time.time() - start
+            print '%-12s %8.2fs' % (name, took)
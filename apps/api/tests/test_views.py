@@ -6,6 +6,7 @@ import os
 from textwrap import dedent
 
 from django.conf import settings
+from django.db import connection
 from django.test.client import Client
 
 import jingo
@@ -74,6 +75,54 @@ class UtilsTest(TestCase):
         eq_(d['description'], 'i &lt;3 amo!')
 
 
+class BulkUtilsTest(TestCase):
+    fixtures = ['base/apps', 'base/addon_3615', 'base/addon_5299_gcal']
+
+    def addons(self, *ids):
+        return list(Addon.objects.filter(id__in=ids).only_translations()
+                    .order_by('id'))
+
+    def test_same_as_addon_to_dict(self):
+        for disco in (False, True):
+            expected = [api.utils.addon_to_dict(a, disco=disco)
+                        for a in self.addons(3615, 5299)]
+            eq_(api.utils.addons_to_dicts(self.addons(3615, 5299),
+                                          disco=disco), expected)
+
+    def test_webapp_same_as_addon_to_dict(self):
+        Addon.objects.filter(id=5299).update(type=amo.ADDON_WEBAPP,
+                                             wants_contributions=True,
+                                             paypal_id='dev@example.com')
+        expected = [api.utils.addon_to_dict(a) for a in self.addons(5299)]
+        assert 'contribution' in expected[0]
+        eq_(api.utils.addons_to_dicts(self.addons(5299)), expected)
+
+    def count_queries(self, ids):
+        addons = self.addons(*ids)
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+        try:
+            api.utils.addons_to_dicts(addons)
+        finally:
+            connection.use_debug_cursor = False
+        return len(connection.queries) - start
+
+    def test_queries(self):
+        for id in (3615, 5299):
+            Preview.objects.create(addon_id=id, caption='x')
+        self.count_queries([3615])
+        eq_(self.count_queries([3615]), self.count_queries([3615, 5299]))
+
+    def test_strip_translation(self):
+        a = Addon.objects.get(id=3615)
+        a.summary = 'i <3 <a href="">amo</a>!'
+        a.save()
+        eq_(api.utils.strip_translation(a.summary), 'i &lt;3 amo!')
+        a.summary = 'changed <b>again</b>'
+        a.save()
+        eq_(api.utils.strip_translation(a.summary), 'changed again')
+
+
 class No500ErrorsTest(TestCase):
     """
     A series of unfortunate urls that have caused 500 errors in the past.
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.utils.encoding import iri_to_uri
 from django.utils.html import strip_tags
 
 import amo
@@ -10,15 +11,137 @@ def addon_to_dict(addon, disco=False, src='api'):
     """
     Renders an addon in JSON for the API.
     """
+    return _addon_to_dict(addon, disco, src, AddonUrls(), strip_tags)
+
+
+def addons_to_dicts(addons, disco=False, src='api'):
+    """
+    Renders a page of addons in JSON for the API, like addon_to_dict.
+
+    The versions, authors and previews for the whole page are fetched in a
+    fixed number of queries, URLs are reversed once per view, and stripped
+    summaries and descriptions are remembered between calls.
+    """
+    addons = list(addons)
+    attach_related(addons)
+    urls = AddonUrls()
+    return [_addon_to_dict(addon, disco, src, urls, strip_translation)
+            for addon in addons]
+
+
+class AddonUrls(object):
+    """
+    Builds the add-on URLs the API needs.
+
+    Each view is reversed once with a placeholder slug, so the rest of the
+    page is string concatenation.  Webapps have their own views and fall
+    back to the add-on's methods.
+    """
+    placeholder = 'addon-slug-placeholder'
+
+    def __init__(self):
+        self.templates = {}
+
+    def reverse(self, viewname, slug):
+        try:
+            prefix, suffix = self.templates[viewname]
+        except KeyError:
+            url = reverse(viewname, args=[self.placeholder])
+            prefix, _, suffix = url.partition(self.placeholder)
+            self.templates[viewname] = prefix, suffix
+        return prefix + iri_to_uri(slug) + suffix
+
+    def detail(self, addon):
+        if addon.is_webapp():
+            return addon.get_url_path()
+        return self.reverse('addons.detail', addon.slug)
+
+    def disco_detail(self, addon):
+        return self.reverse('discovery.addons.detail', addon.slug)
+
+    def reviews(self, addon):
+        if addon.is_webapp():
+            return addon.reviews_url
+        return self.reverse('addons.reviews.list', addon.slug)
+
+    def contribute(self, addon):
+        if addon.is_webapp():
+            return addon.contribution_url
+        return self.reverse('addons.contribute', addon.slug)
+
+    def meet(self, addon):
+        if addon.is_webapp():
+            return addon.meet_the_dev_url()
+        return self.reverse('addons.meet', addon.slug)
+
+
+def attach_related(addons):
+    """
+    Make sure each add-on has its current version (with files and apps),
+    listed authors and previews, querying once for everything missing.
+    """
+    from addons.models import Addon
+    from versions.models import Version
+
+    cache_name = Addon._meta.get_field('_current_version').get_cache_name()
+    missing = [a for a in addons if a._current_version_id and
+               cache_name not in a.__dict__]
+    if missing:
+        qs = Version.objects.no_cache().filter(
+            id__in=[a._current_version_id for a in missing])
+        versions = dict((v.id, v) for v in qs)
+        for addon in missing:
+            version = versions.get(addon._current_version_id)
+            if version:
+                addon._current_version = version
+                version.addon = addon
+
+    versions = [a.__dict__[cache_name] for a in addons
+                if a.__dict__.get(cache_name)]
+    Version.transformer([v for v in versions
+                         if 'all_files' not in v.__dict__ or
+                            'compatible_apps' not in v.__dict__])
+
+    missing = [a for a in addons if 'listed_authors' not in a.__dict__]
+    if missing:
+        Addon.attach_listed_authors(missing)
+
+    missing = [a for a in addons if 'all_previews' not in a.__dict__]
+    if missing:
+        Addon.attach_previews(missing)
+
+
+# {(translation id, locale): (string, stripped string)}
+_stripped = {}
+
+
+def strip_translation(trans):
+    """strip_tags for a translation, remembered by translation id."""
+    if not hasattr(trans, 'locale'):
+        return strip_tags(trans)
+    key, source = (trans.id, trans.locale), unicode(trans)
+    try:
+        cached_source, stripped = _stripped[key]
+        if cached_source == source:
+            return stripped
+    except KeyError:
+        pass
+    if len(_stripped) >= 10000:
+        _stripped.clear()
+    stripped = strip_tags(source)
+    _stripped[key] = source, stripped
+    return stripped
+
+
+def _addon_to_dict(addon, disco, src, urls, strip):
     v = addon.current_version
     url = lambda u, **kwargs: settings.SITE_URL + urlparams(u, **kwargs)
 
     if disco:
-        learnmore = settings.SERVICES_URL + reverse('discovery.addons.detail',
-                                                    args=[addon.slug])
+        learnmore = settings.SERVICES_URL + urls.disco_detail(addon)
         learnmore = urlparams(learnmore, src='discovery-personalrec')
     else:
-        learnmore = url(addon.get_url_path(), src=src)
+        learnmore = url(urls.detail(addon), src=src)
 
     d = {
          'id': addon.id,
@@ -28,11 +151,11 @@ def addon_to_dict(addon, disco=False, src='api'):
          'type': amo.ADDON_SLUGS_UPDATE[addon.type],
          'author': (addon.listed_authors[0].name if
                     addon.listed_authors else ''),
-         'summary': strip_tags(addon.summary),
-         'description': strip_tags(addon.description),
+         'summary': strip(addon.summary),
+         'description': strip(addon.description),
          'icon': addon.icon_url,
          'learnmore': learnmore,
-         'reviews': url(addon.reviews_url),
+         'reviews': url(urls.reviews(addon)),
          'total_dls': addon.total_downloads,
          'weekly_dls': addon.weekly_downloads,
          'adu': addon.average_daily_users,
@@ -55,8 +178,8 @@ def addon_to_dict(addon, disco=False, src='api'):
 
     if addon.wants_contributions:
         contribution = {
-                'link': url(addon.contribution_url, src=src),
-                'meet_developers': url(addon.meet_the_dev_url(), src=src),
+                'link': url(urls.contribute(addon), src=src),
+                'meet_developers': url(urls.meet(addon), src=src),
                 'suggested_amount': addon.suggested_amount,
                 }
         d['contribution'] = contribution
@@ -27,7 +27,7 @@ import api
 from amo.decorators import post_required
 from api.authentication import AMOOAuthAuthentication
 from api.forms import PerformanceForm
-from api.utils import addon_to_dict
+from api.utils import addons_to_dicts
 from amo.models import manual_order
 from amo.urlresolvers import get_url_prefix
 from amo.utils import JSONEncoder
@@ -381,7 +381,7 @@ class ListView(APIView):
                            {'addons': addon_filter(addons, *args)})
 
     def render_json(self, context):
-        return json.dumps([addon_to_dict(a) for a in context['addons']],
+        return json.dumps(addons_to_dicts(context['addons']),
                           cls=JSONEncoder)
 
 
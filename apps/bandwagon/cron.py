@@ -1,4 +1,4 @@
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
 import itertools
 
 from django.db import connection, transaction
@@ -16,6 +16,10 @@ import cronjobs
 
 task_log = commonware.log.getLogger('z.task')
 
+SUBSCRIBERS_WATERMARK = 'collection_subscribers_watermark'
+VOTES_WATERMARK = 'collection_votes_watermark'
+WATERMARK_FORMAT = '%Y-%m-%d %H:%M:%S'
+
 
 # TODO(davedash): remove when EB is fully in place.
 # Migration tasks
@@ -52,32 +56,24 @@ def migrate_collection_users():
 
 
 @cronjobs.register
-def update_collections_subscribers():
+def update_collections_subscribers(incremental=False):
     """Update collections subscribers totals."""
-
-    d = (CollectionWatcher.objects.values('collection_id')
-         .annotate(count=Count('collection'))
-         .extra(where=['DATE(created)=%s'], params=[date.today()]))
-
-    ts = [_update_collections_subscribers.subtask(args=[chunk])
-          for chunk in chunked(d, 1000)]
-    TaskSet(ts).apply_async()
+    _queue_collection_stats(CollectionWatcher, _update_collections_subscribers,
+                            SUBSCRIBERS_WATERMARK, incremental)
 
 
 @task(rate_limit='15/m')
-def _update_collections_subscribers(data, **kw):
+def _update_collections_subscribers(ids, day=None, **kw):
     task_log.info("[%s@%s] Updating collections' subscribers totals." %
-                   (len(data), _update_collections_subscribers.rate_limit))
-    cursor = connection.cursor()
-    today = date.today()
-    for var in data:
-        q = """REPLACE INTO
-                    stats_collections(`date`, `name`, `collection_id`, `count`)
-                VALUES
-                    (%s, %s, %s, %s)"""
-        p = [today, 'new_subscribers', var['collection_id'], var['count']]
-        cursor.execute(q, p)
-    transaction.commit_unless_managed()
+                   (len(ids), _update_collections_subscribers.rate_limit))
+    day = day or date.today()
+    counts = (CollectionWatcher.objects.no_cache()
+              .filter(collection__in=ids)
+              .extra(where=['DATE(created)=%s'], params=[day])
+              .values_list('collection').annotate(Count('collection'))
+              .order_by())
+    _save_collection_stats(day, [(collection, 'new_subscribers', count)
+                                 for collection, count in counts])
 
 
 # TODO(jbalogh): removed from cron on 6/27/11. If the site doesn't break,
@@ -92,39 +88,67 @@ def collection_meta():
 
 
 @cronjobs.register
-def update_collections_votes():
+def update_collections_votes(incremental=False):
     """Update collection's votes."""
-
-    up = (CollectionVote.objects.values('collection_id')
-          .annotate(count=Count('collection'))
-          .filter(vote=1)
-          .extra(where=['DATE(created)=%s'], params=[date.today()]))
-
-    down = (CollectionVote.objects.values('collection_id')
-            .annotate(count=Count('collection'))
-            .filter(vote=-1)
-            .extra(where=['DATE(created)=%s'], params=[date.today()]))
-
-    ts = [_update_collections_votes.subtask(args=[chunk, 'new_votes_up'])
-          for chunk in chunked(up, 1000)]
-    TaskSet(ts).apply_async()
-
-    ts = [_update_collections_votes.subtask(args=[chunk, 'new_votes_down'])
-          for chunk in chunked(down, 1000)]
-    TaskSet(ts).apply_async()
+    _queue_collection_stats(CollectionVote, _update_collections_votes,
+                            VOTES_WATERMARK, incremental)
 
 
 @task(rate_limit='15/m')
-def _update_collections_votes(data, stat, **kw):
+def _update_collections_votes(ids, day=None, **kw):
     task_log.info("[%s@%s] Updating collections' votes totals." %
-                   (len(data), _update_collections_votes.rate_limit))
+                   (len(ids), _update_collections_votes.rate_limit))
+    day = day or date.today()
+    stats = {1: 'new_votes_up', -1: 'new_votes_down'}
+    counts = (CollectionVote.objects.filter(collection__in=ids,
+                                            vote__in=stats.keys())
+              .extra(where=['DATE(created)=%s'], params=[day])
+              .values_list('collection', 'vote').annotate(Count('collection'))
+              .order_by())
+    _save_collection_stats(day, [(collection, stats[vote], count)
+                                 for collection, vote, count in counts])
+
+
+def _queue_collection_stats(model, task, watermark, incremental=False):
+    """
+    Queue `task` for chunks of the collections with new `model` rows today.
+
+    With `incremental`, only collections with rows created since the last run
+    are queued, for every day since then.
+    """
+    from zadmin.models import get_config, set_config
+    now = datetime.now()
+    since = incremental and get_config(watermark)
+    if since:
+        since = datetime.strptime(since, WATERMARK_FORMAT)
+    else:
+        since = datetime.combine(now.date(), time())
+
+    ts, day = [], since.date()
+    while day <= now.date():
+        next_day = day + timedelta(days=1)
+        ids = (model.objects.filter(
+                   created__gte=max(since, datetime.combine(day, time())),
+                   created__lt=datetime.combine(next_day, time()))
+               .values_list('collection', flat=True).distinct().order_by())
+        ts.extend(task.subtask(args=[chunk, day])
+                  for chunk in chunked(sorted(ids), 1000))
+        day = next_day
+    TaskSet(ts).apply_async()
+    set_config(watermark, now.strftime(WATERMARK_FORMAT))
+
+
+def _save_collection_stats(day, rows):
+    """Write the (collection_id, name, count) `rows` in one statement."""
+    if not rows:
+        return
+    q = ('REPLACE INTO stats_collections(`date`, `name`, `collection_id`, '
+         '`count`) VALUES %s' % ', '.join(['(%s, %s, %s, %s)'] * len(rows)))
+    p = []
+    for collection, name, count in rows:
+        p.extend([day, name, collection, count])
     cursor = connection.cursor()
-    for var in data:
-        q = ('REPLACE INTO stats_collections(`date`, `name`, '
-             '`collection_id`, `count`) VALUES (%s, %s, %s, %s)')
-        p = [date.today(), stat,
-             var['collection_id'], var['count']]
-        cursor.execute(q, p)
+    cursor.execute(q, p)
     transaction.commit_unless_managed()
 
 
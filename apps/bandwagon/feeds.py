@@ -1,8 +1,10 @@
 from django import http
 from django.contrib.syndication.views import Feed
+from django.db.models import Count, Max
 
 from tower import ugettext as _
 
+from amo.feeds import CachedFeed
 from amo.helpers import absolutify, page_name
 from amo.urlresolvers import reverse
 from access import acl
@@ -54,7 +56,9 @@ class CollectionFeed(CollectionFeedMixin, Feed):
         return views.get_filter(self.request).qs[:20]
 
 
-class CollectionDetailFeed(AddonFeedMixin, Feed):
+class CollectionDetailFeed(AddonFeedMixin, CachedFeed):
+
+    feed_kind = 'collection'
 
     def get_object(self, request, username, slug):
         self.request = request
@@ -64,6 +68,14 @@ class CollectionDetailFeed(AddonFeedMixin, Feed):
             raise http.Http404()
         return c
 
+    def feed_stamp(self, c):
+        d = (c.collectionaddon_set.aggregate(
+             modified=Max('modified'), addons=Max('addon__modified'),
+             count=Count('id')))
+        modified = max(filter(None, (c.modified, d['modified'],
+                                     d['addons'])))
+        return modified, d['count']
+
     def title(self, c):
         app = page_name(self.request.APP)
         # L10n: {0} is a collection name, {1} is 'Add-ons for <app>'.
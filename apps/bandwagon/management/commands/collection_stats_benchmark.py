@@ -0,0 +1,57 @@
+import random
+import time
+from datetime import date
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from amo.utils import chunked
+from bandwagon.cron import _save_collection_stats
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--collections', action='store', type='int',
+                    default=200000,
+                    help='How many synthetic collections to write stats for.'),
+    )
+    help = ('Compare writing daily collection stats with one REPLACE per '
+            'collection against chunked multi-row REPLACEs. Everything is '
+            'rolled back afterwards.')
+
+    def handle(self, *args, **options):
+        rows = [(id, 'new_votes_up', random.randint(1, 50))
+                for id in xrange(1, options['collections'] + 1)]
+        today = date.today()
+
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        cursor = connection.cursor()
+        # The collections are made up.
+        cursor.execute('SET foreign_key_checks = 0')
+        try:
+            for name, func in (('one per row', self.each),
+                               ('multi-row', self.chunks)):
+                start = time.time()
+                statements = func(cursor, today, rows)
+                print '%-12s %8.2fs %8s statements' % (
+                    name, time.time() - start, statements)
+        finally:
+            cursor.execute('SET foreign_key_checks = 1')
+            transaction.rollback()
+            transaction.leave_transaction_management()
+
+    def each(self, cursor, day, rows):
+        q = ('REPLACE INTO stats_collections(`date`, `name`, '
+             '`collection_id`, `count`) VALUES (%s, %s, %s, %s)')
+        for collection, name, count in rows:
+            cursor.execute(q, [day, name, collection, count])
+        return len(rows)
+
+    def chunks(self, cursor, day, rows):
+        statements = 0
+        for chunk in chunked(rows, 1000):
+            _save_collection_stats(day, chunk)
+            statements += 1
+        return statements
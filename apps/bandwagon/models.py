@@ -15,6 +15,7 @@ import caching.base as caching
 import amo
 import amo.models
 import sharing.utils as sharing
+from amo.feeds import invalidate_feed
 from amo.utils import sorted_groupby
 from amo.urlresolvers import reverse
 from addons.models import Addon, AddonRecommendation
@@ -353,11 +354,19 @@ class Collection(CollectionBase, amo.models.ModelBase):
             return
         tasks.unindex_collections.delay([instance.id])
 
+    @staticmethod
+    def invalidate_feed(sender, instance, **kwargs):
+        if kwargs.get('raw'):
+            return
+        invalidate_feed('collection', instance.id)
+
 
 models.signals.post_save.connect(Collection.post_save, sender=Collection,
                                  dispatch_uid='coll.post_save')
 models.signals.post_delete.connect(Collection.post_delete, sender=Collection,
                                    dispatch_uid='coll.post_delete')
+models.signals.post_save.connect(Collection.invalidate_feed, sender=Collection,
+                                 dispatch_uid='coll.feed.save')
 
 
 class CollectionAddon(amo.models.ModelBase):
@@ -376,6 +385,35 @@ class CollectionAddon(amo.models.ModelBase):
         db_table = 'addons_collections'
         unique_together = (('addon', 'collection'),)
 
+    @staticmethod
+    def update_featured(sender, instance, **kwargs):
+        from addons import tasks
+        if kwargs.get('raw'):
+            return
+        if FeaturedCollection.objects.filter(
+                collection=instance.collection_id).exists():
+            tasks.update_featured.delay()
+
+    @staticmethod
+    def invalidate_feed(sender, instance, **kwargs):
+        if kwargs.get('raw'):
+            return
+        invalidate_feed('collection', instance.collection_id)
+
+
+models.signals.post_save.connect(CollectionAddon.update_featured,
+                                 sender=CollectionAddon,
+                                 dispatch_uid='coll.addon.featured.save')
+models.signals.post_delete.connect(CollectionAddon.update_featured,
+                                   sender=CollectionAddon,
+                                   dispatch_uid='coll.addon.featured.delete')
+models.signals.post_save.connect(CollectionAddon.invalidate_feed,
+                                 sender=CollectionAddon,
+                                 dispatch_uid='coll.addon.feed.save')
+models.signals.post_delete.connect(CollectionAddon.invalidate_feed,
+                                   sender=CollectionAddon,
+                                   dispatch_uid='coll.addon.feed.delete')
+
 
 class CollectionAddonRecommendation(models.Model):
     collection = models.ForeignKey(Collection, null=True)
@@ -559,6 +597,21 @@ class FeaturedCollection(amo.models.ModelBase):
         return u'%s (%s: %s)' % (self.collection, self.application,
                                  self.locale)
 
+    @staticmethod
+    def update_featured(sender, instance, **kwargs):
+        from addons import tasks
+        if kwargs.get('raw'):
+            return
+        tasks.update_featured.delay()
+
+
+models.signals.post_save.connect(FeaturedCollection.update_featured,
+                                 sender=FeaturedCollection,
+                                 dispatch_uid='featured.coll.save')
+models.signals.post_delete.connect(FeaturedCollection.update_featured,
+                                   sender=FeaturedCollection,
+                                   dispatch_uid='featured.coll.delete')
+
 
 class MonthlyPick(amo.models.ModelBase):
     addon = models.ForeignKey(Addon)
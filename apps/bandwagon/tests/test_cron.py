@@ -0,0 +1,77 @@
+from datetime import date, datetime, timedelta
+
+import mock
+from nose.tools import eq_
+
+import amo.tests
+from bandwagon import cron
+from bandwagon.models import Collection, CollectionVote, CollectionWatcher
+from stats.models import CollectionStats
+from users.models import UserProfile
+from zadmin.models import set_config
+
+
+class TestCollectionStats(amo.tests.TestCase):
+    fixtures = ['base/users', 'base/collections']
+
+    def setUp(self):
+        self.collections = list(Collection.objects.all()[:3])
+        self.users = list(UserProfile.objects.all()[:2])
+        for c in self.collections:
+            for user in self.users:
+                CollectionWatcher.objects.create(collection=c, user=user)
+        c1, c2, c3 = self.collections
+        for c, user, vote in ((c1, 0, 1), (c1, 1, 1), (c2, 0, -1),
+                              (c3, 0, 1), (c3, 1, -1)):
+            CollectionVote.objects.create(collection=c, vote=vote,
+                                          user=self.users[user])
+        self.ids = [c.id for c in self.collections]
+
+    def stats(self, name):
+        qs = CollectionStats.objects.filter(name=name, date=date.today())
+        return dict(qs.values_list('collection', 'count'))
+
+    def test_subscribers(self):
+        cron.update_collections_subscribers()
+        eq_(self.stats('new_subscribers'), dict((id, 2) for id in self.ids))
+
+    def test_votes(self):
+        c1, c2, c3 = self.ids
+        cron.update_collections_votes()
+        eq_(self.stats('new_votes_up'), {c1: 2, c3: 1})
+        eq_(self.stats('new_votes_down'), {c2: 1, c3: 1})
+
+    def test_subscribers_statements(self):
+        # One aggregate query and one REPLACE for the whole chunk.
+        with self.assertNumQueries(2):
+            cron._update_collections_subscribers(self.ids)
+
+    def test_votes_statements(self):
+        with self.assertNumQueries(2):
+            cron._update_collections_votes(self.ids)
+
+    def test_votes_again(self):
+        cron.update_collections_votes()
+        CollectionVote.objects.filter(collection=self.ids[0]).delete()
+        CollectionVote.objects.create(collection_id=self.ids[0], vote=-1,
+                                      user=self.users[0])
+        cron.update_collections_votes()
+        eq_(self.stats('new_votes_down')[self.ids[0]], 1)
+
+    @mock.patch('bandwagon.cron.TaskSet')
+    def test_incremental(self, taskset):
+        since = datetime.now() + timedelta(seconds=1)
+        set_config(cron.VOTES_WATERMARK,
+                   since.strftime(cron.WATERMARK_FORMAT))
+        CollectionVote.objects.filter(collection=self.ids[1]).update(
+            created=since + timedelta(seconds=1))
+        cron.update_collections_votes(incremental=True)
+        eq_([t.args for t in taskset.call_args[0][0]],
+            [[[self.ids[1]], since.date()]])
+
+    @mock.patch('bandwagon.cron.TaskSet')
+    def test_full(self, taskset):
+        set_config(cron.VOTES_WATERMARK, '2011-01-01 00:00:00')
+        cron.update_collections_votes()
+        eq_([t.args for t in taskset.call_args[0][0]],
+            [[sorted(self.ids), date.today()]])
@@ -1,4 +1,6 @@
 import logging
+import resource
+import time
 from collections import defaultdict
 
 from django.conf import settings
@@ -10,81 +12,144 @@ import redisutils
 
 import amo
 import amo.utils
-from addons.models import Addon
+from addons.models import Addon, AppSupport
+from files.models import File
 from stats.models import UpdateCount
 from versions.compare import version_int as vint
+from versions.models import ApplicationsVersions
 
 from .models import AppCompat
 
 log = logging.getLogger('z.compat')
 
 
+class Timer(object):
+    """Log the time and peak memory of each step of the report."""
+
+    def __init__(self):
+        self.start = self.last = time.time()
+
+    def __call__(self, msg, *args):
+        now = time.time()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        log.info(u'%.2fs (%.2fs total, %skB max rss) : %s' %
+                 (now - self.last, now - self.start, rss, msg % args))
+        self.last = now
+
+
 @cronjobs.register
 def compatibility_report():
     redis = redisutils.connections['master']
-    docs = defaultdict(dict)
+    timer = Timer()
+
+    latest = UpdateCount.objects.aggregate(d=Max('date'))['d']
+    updates = dict(UpdateCount.objects
+                   .filter(addon__disabled_by_user=False,
+                           addon__status__in=amo.VALID_STATUSES,
+                           addon___current_version__isnull=False,
+                           date=latest)
+                   .values_list('addon', 'count'))
+    timer('usage: %s add-ons', len(updates))
 
-    # Gather all the data for the index.
+    docs = {}
+    for chunk in amo.utils.chunked(sorted(updates), 1000):
+        docs.update(_make_docs(chunk, updates))
+    timer('docs: %s add-ons', len(docs))
+
+    totals = _mark_top_95(docs.values())
     for app in amo.APP_USAGE:
-        log.info(u'Making compat report for %s.' % app.pretty)
-        latest = UpdateCount.objects.aggregate(d=Max('date'))['d']
-        qs = UpdateCount.objects.filter(addon__appsupport__app=app.id,
-                                        addon__disabled_by_user=False,
-                                        addon__status__in=amo.VALID_STATUSES,
-                                        addon___current_version__isnull=False,
-                                        date=latest)
-
-        updates = dict(qs.values_list('addon', 'count'))
-        for chunk in amo.utils.chunked(updates.items(), 50):
-            chunk = dict(chunk)
-            for addon in Addon.objects.filter(id__in=chunk):
-                doc = docs[addon.id]
-                doc.update(id=addon.id, slug=addon.slug, binary=addon.binary,
-                           name=unicode(addon.name), created=addon.created)
-                doc['count'] = chunk[addon.id]
-                doc.setdefault('top_95',
-                               defaultdict(lambda: defaultdict(dict)))
-                doc.setdefault('top_95_all', {})
-                doc.setdefault('usage', {})[app.id] = updates[addon.id]
-
-                if app not in addon.compatible_apps:
-                    continue
-                compat = addon.compatible_apps[app]
-                d = {'min': compat.min.version_int,
-                     'max': compat.max.version_int}
-                doc.setdefault('support', {})[app.id] = d
-                doc.setdefault('max_version', {})[app.id] = compat.max.version
-
-        total = sum(updates.values())
         # Remember the total so we can show % of usage later.
-        redis.hset('compat:%s' % app.id, 'total', total)
-
-        # Figure out which add-ons are in the top 95% for this app.
-        running_total = 0
-        for addon, count in sorted(updates.items(), key=lambda x: x[1],
-                                   reverse=True):
-            running_total += count
-            docs[addon]['top_95_all'][app.id] = running_total < (.95 * total)
-
-    # Mark the top 95% of add-ons compatible with the previous version for each
-    # app + version combo.
-    for compat in settings.COMPAT:
-        app, ver = compat['app'], vint(compat['previous'])
-        # Find all the docs that have a max_version compatible with ver.
-        supported = [doc for doc in docs.values()
-                     if app in doc.get('support', {})
-                        and doc['support'][app]['max'] >= ver]
-        # Sort by count so we can get the top 95% most-used add-ons.
-        supported = sorted(supported, key=lambda d: d['count'], reverse=True)
-        total = sum(doc['count'] for doc in supported)
-        # Figure out which add-ons are in the top 95% for this app + version.
-        running_total = 0
-        for doc in supported:
-            running_total += doc['count']
-            doc['top_95'][app][ver] = running_total < (.95 * total)
+        redis.hset('compat:%s' % app.id, 'total', totals.get(app.id, 0))
+    timer('top 95%%: %s apps, %s compat versions', len(amo.APP_USAGE),
+          len(settings.COMPAT))
 
     # Send it all to the index.
-    for chunk in amo.utils.chunked(docs.values(), 150):
+    es = elasticutils.get_es()
+    for chunk in amo.utils.chunked(docs.values(), 500):
         for doc in chunk:
             AppCompat.index(doc, id=doc['id'], bulk=True)
-        elasticutils.get_es().flush_bulk(forced=True)
+        es.flush_bulk(forced=True)
+    timer('indexed: %s docs', len(docs))
+
+
+def _make_docs(ids, updates):
+    """Build the compat docs for `ids` with a few flat queries."""
+    apps = [app.id for app in amo.APP_USAGE]
+    addons = (Addon.objects.filter(id__in=ids).no_cache()
+              .only_translations())
+    current = dict((a._current_version_id, a.id) for a in addons)
+
+    usage = defaultdict(list)
+    for addon, app in (AppSupport.objects.filter(addon__in=ids, app__in=apps)
+                       .values_list('addon', 'app')):
+        usage[addon].append(app)
+
+    support = defaultdict(dict)
+    for row in (ApplicationsVersions.objects.no_cache()
+                .filter(version__in=current, application__in=apps)
+                .values_list('version', 'application', 'min__version_int',
+                             'max__version_int', 'max__version')):
+        version, app, min_int, max_int, max_version = row
+        support[current[version]][app] = (min_int, max_int, max_version)
+
+    binary = set(File.objects.no_cache()
+                 .filter(version__in=current, binary=True)
+                 .values_list('version__addon', flat=True))
+
+    docs = {}
+    for addon in addons:
+        if not usage[addon.id]:
+            continue
+        count = updates[addon.id]
+        doc = docs[addon.id] = dict(
+            id=addon.id, slug=addon.slug, binary=addon.id in binary,
+            name=unicode(addon.name), created=addon.created, count=count,
+            top_95=defaultdict(dict), top_95_all={}, usage={})
+        for app in usage[addon.id]:
+            doc['usage'][app] = count
+            if app in support[addon.id]:
+                min_int, max_int, max_version = support[addon.id][app]
+                doc.setdefault('support', {})[app] = {'min': min_int,
+                                                      'max': max_int}
+                doc.setdefault('max_version', {})[app] = max_version
+    return docs
+
+
+def _mark_top_95(docs):
+    """
+    Set the top_95 flags on every doc.
+
+    The docs are sorted by usage once; each app and each (app, previous
+    version) pair from settings.COMPAT keeps its own running total, so all of
+    the cutoffs come out of a single walk over the sorted docs. Returns the
+    usage total for each app.
+    """
+    compat = [(c['app'], vint(c['previous'])) for c in settings.COMPAT]
+    docs = sorted(docs, key=lambda d: d['count'], reverse=True)
+
+    def keys(doc):
+        """Every (app, version) bucket this doc counts towards."""
+        ks = [(app, None) for app in doc['usage']]
+        support = doc.get('support', {})
+        ks.extend((app, ver) for app, ver in compat
+                  if app in support and support[app]['max'] >= ver)
+        return ks
+
+    totals = defaultdict(int)
+    for doc in docs:
+        for key in keys(doc):
+            totals[key] += doc['count']
+
+    running = defaultdict(int)
+    for doc in docs:
+        for key in keys(doc):
+            running[key] += doc['count']
+            app, ver = key
+            top = running[key] < (.95 * totals[key])
+            if ver is None:
+                doc['top_95_all'][app] = top
+            else:
+                doc['top_95'][app][ver] = top
+
+    return dict((app, total) for (app, ver), total in totals.items()
+                if ver is None)
@@ -1,12 +1,18 @@
 import json
+from collections import defaultdict
 
+from django.conf import settings
+
+import mock
 from nose.tools import eq_
 
 import amo
 import amo.tests
 from amo.urlresolvers import reverse
 from addons.models import Addon
+from compat.cron import _mark_top_95
 from compat.models import CompatReport
+from versions.compare import version_int as vint
 
 
 # This is the structure sent to /compatibility/incoming from the ACR.
@@ -82,3 +88,27 @@ class TestReporter(amo.tests.TestCase):
                                              expected)
         self.assertRedirects(
             self.client.get(url + '?guid=%s' % addon.guid[:5]), expected)
+
+
+class TestTop95(amo.tests.TestCase):
+
+    def doc(self, id, count, max=None):
+        d = dict(id=id, count=count, usage={amo.FIREFOX.id: count},
+                 top_95=defaultdict(dict), top_95_all={})
+        if max:
+            d['support'] = {amo.FIREFOX.id: {'min': 0, 'max': max}}
+        return d
+
+    @mock.patch.object(settings, 'COMPAT',
+                       [dict(app=amo.FIREFOX.id, previous='4.0')])
+    def test_cutoffs(self):
+        v3, v4, v5 = vint('3.0'), vint('4.0'), vint('5.0')
+        docs = [self.doc(1, 10, v5), self.doc(2, 80, v4), self.doc(3, 10, v3)]
+        totals = _mark_top_95(docs)
+        eq_(totals, {amo.FIREFOX.id: 100})
+        eq_([d['top_95_all'][amo.FIREFOX.id] for d in docs],
+            [True, True, False])
+        # Only the first two support 4.0: 80 of 90 is under 95%.
+        eq_(docs[1]['top_95'][amo.FIREFOX.id][v4], True)
+        eq_(docs[0]['top_95'][amo.FIREFOX.id][v4], False)
+        eq_(docs[2]['top_95'], {})
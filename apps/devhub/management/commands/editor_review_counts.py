@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly editor review counts from the activity log.'
+
+    def handle(self, *args, **options):
+        from devhub.models import EditorReviewCount
+        EditorReviewCount.recount()
@@ -0,0 +1,24 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from addons.models import Preview
+from devhub.tasks import resize_thumbnails
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--processes', action='store', type='int', default=None,
+                    help='Number of resizing processes, defaults to the '
+                         'number of CPUs.'),
+    )
+    args = '[<addon id> ...]'
+    help = ('Regenerate preview thumbnails from the full size images, for '
+            'the given add-ons or all of them.')
+
+    def handle(self, *args, **options):
+        previews = Preview.objects.no_cache()
+        if args:
+            previews = previews.filter(addon__in=args)
+        done = resize_thumbnails(previews, options['processes'])
+        print 'Regenerated %s thumbnails.' % done
@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import time
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+import amo
+from amo.utils import resize_image, resize_images
+
+IMAGES = ['mozilla.png', 'non-animated.png', 'transparent.png',
+          'persona-header.jpg', 'persona-footer.jpg']
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--repeat', action='store', type='int', default=20,
+                    help='How many times to resize each image.'),
+    )
+    args = '[<image> ...]'
+    help = ('Compare resizing icons and previews one size at a time, the '
+            'way the tasks used to, against decoding each image once.')
+
+    def handle(self, *args, **options):
+        images = args or [os.path.join(settings.ROOT, 'apps', 'amo', 'tests',
+                                       'images', name) for name in IMAGES]
+        tmp = tempfile.mkdtemp()
+        try:
+            for name, func in (('one size at a time', self.each),
+                               ('decode once', self.once)):
+                start = time.time()
+                for i in range(options['repeat']):
+                    for image in images:
+                        func(image, os.path.join(tmp, str(i)))
+                total = time.time() - start
+                count = options['repeat'] * len(images)
+                print '%-20s %8.1fms per image %8.1f images/s' % (
+                    name, total / count * 1000, count / total)
+        finally:
+            shutil.rmtree(tmp)
+
+    def outputs(self, dst):
+        icons = [('%s-%s.png' % (dst, s), (s, s))
+                 for s in amo.ADDON_ICON_SIZES]
+        previews = [('%s-%s.png' % (dst, name), size) for name, size in
+                    zip(['thumb', 'full'], amo.ADDON_PREVIEW_SIZES)]
+        return icons + previews
+
+    def each(self, src, dst):
+        for dst, size in self.outputs(dst):
+            resize_image(src, dst, size, remove_src=False)
+
+    def once(self, src, dst):
+        icons = self.outputs(dst)[:len(amo.ADDON_ICON_SIZES)]
+        resize_images(src, icons)
+        resize_images(src, self.outputs(dst)[len(icons):])
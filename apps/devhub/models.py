@@ -1,9 +1,9 @@
 from copy import copy
-from datetime import datetime
+from datetime import date, datetime
 import json
 import string
 
-from django.db import models
+from django.db import connection, models
 
 import commonware.log
 import jinja2
@@ -167,19 +167,18 @@ class ActivityLogManager(amo.models.ManagerBase):
 
     def total_reviews(self):
         """Return the top users, and their # of reviews."""
-        return (self.values('user', 'user__display_name')
-                    .filter(action__in=amo.LOG_REVIEW_QUEUE)
-                    .annotate(approval_count=models.Count('id'))
+        return (EditorReviewCount.objects
+                    .values('user', 'user__display_name')
+                    .annotate(approval_count=models.Sum('count'))
                     .order_by('-approval_count'))
 
     def monthly_reviews(self):
         """Return the top users for the month, and their # of reviews."""
         now = datetime.now()
-        created_date = datetime(now.year, now.month, 1)
-        return (self.values('user', 'user__display_name')
-                    .filter(created__gte=created_date,
-                            action__in=amo.LOG_REVIEW_QUEUE)
-                    .annotate(approval_count=models.Count('id'))
+        return (EditorReviewCount.objects
+                    .values('user', 'user__display_name')
+                    .filter(month=date(now.year, now.month, 1))
+                    .annotate(approval_count=models.Sum('count'))
                     .order_by('-approval_count'))
 
 
@@ -335,6 +334,111 @@ class ActivityLog(amo.models.ModelBase):
         ordering = ('-created',)
 
 
+class EditorReviewCount(models.Model):
+    """
+    Monthly totals of review queue ActivityLog entries per editor and action.
+
+    Kept up to date from ActivityLog saves; rebuild it with
+    ``./manage.py editor_review_counts``.
+    """
+    user = models.ForeignKey(UserProfile)
+    month = models.DateField()
+    action = models.SmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'log_activity_review_count'
+        unique_together = ('user', 'month', 'action')
+
+    @classmethod
+    def increment(cls, user_id, month, action):
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO log_activity_review_count
+                (user_id, month, action, count)
+            VALUES (%s, %s, %s, 1)
+            ON DUPLICATE KEY UPDATE count = count + 1""",
+            [user_id, month, action])
+
+    @classmethod
+    def recount(cls, user_id=None, month=None):
+        """Recount from log_activity, optionally for one user and month."""
+        counts = ['action IN %s']
+        logs = ['action IN %s', 'user_id IS NOT NULL']
+        args = [tuple(amo.LOG_REVIEW_QUEUE)]
+        if user_id:
+            counts.append('user_id = %s')
+            logs.append('user_id = %s')
+            args.append(user_id)
+        if month:
+            counts.append('month = %s')
+            logs.extend(['created >= %s', 'created < %s'])
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM log_activity_review_count WHERE ' +
+                       ' AND '.join(counts),
+                       args + ([month] if month else []))
+        cursor.execute("""
+            INSERT INTO log_activity_review_count
+                (user_id, month, action, count)
+            SELECT user_id, DATE_FORMAT(created, '%%Y-%%m-01'), action,
+                   COUNT(*)
+            FROM log_activity
+            WHERE """ + ' AND '.join(logs) + """
+            GROUP BY user_id, DATE_FORMAT(created, '%%Y-%%m-01'), action""",
+            args + ([month, next_month(month)] if month else []))
+
+
+def month_of(dt):
+    return date(dt.year, dt.month, 1)
+
+
+def next_month(month):
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def remember_review_month(sender, instance, **kw):
+    """Note the month the entry is stored under before it's saved."""
+    instance._review_month = None
+    if kw.get('raw') or not instance.pk:
+        return
+    created = list(ActivityLog.objects.no_cache().filter(pk=instance.pk)
+                   .values_list('created', flat=True))
+    if created:
+        instance._review_month = month_of(created[0])
+
+
+def update_review_counts(sender, instance, **kw):
+    if (kw.get('raw') or not instance.user_id
+        or instance.action not in amo.LOG_REVIEW_QUEUE):
+        return
+    month = month_of(instance.created)
+    old = getattr(instance, '_review_month', None)
+    if kw.get('created'):
+        EditorReviewCount.increment(instance.user_id, month, instance.action)
+    else:
+        # The entry may have been moved to another month (it gets backdated),
+        # so recount both ends.
+        for m in set([month, old or month]):
+            EditorReviewCount.recount(instance.user_id, m)
+
+
+def delete_review_counts(sender, instance, **kw):
+    if (kw.get('raw') or not instance.user_id
+        or instance.action not in amo.LOG_REVIEW_QUEUE):
+        return
+    EditorReviewCount.recount(instance.user_id, month_of(instance.created))
+
+
+models.signals.pre_save.connect(remember_review_month, sender=ActivityLog,
+                                dispatch_uid='log_review_month')
+models.signals.post_save.connect(update_review_counts, sender=ActivityLog,
+                                 dispatch_uid='log_review_counts')
+models.signals.post_delete.connect(delete_review_counts, sender=ActivityLog,
+                                   dispatch_uid='log_review_counts_delete')
+
+
 # TODO(davedash): Remove after we finish the import.
 class LegacyAddonLog(models.Model):
     TYPES = [(value, key) for key, value in amo.LOG.items()]
@@ -21,7 +21,8 @@ from tower import ugettext as _
 
 import amo
 from amo.decorators import write, set_modified_on
-from amo.utils import guard, resize_image, remove_icons
+from amo.utils import (guard, pool_imap, resize_image, resize_images,
+                       remove_icons)
 from addons.models import Addon
 from applications.management.commands import dump_apps
 from applications.models import Application, AppVersion
@@ -183,10 +184,8 @@ def resize_icon(src, dst, size, **kw):
     log.info('[1@None] Resizing icon: %s' % dst)
     try:
         if isinstance(size, list):
-            for s in size:
-                resize_image(src, '%s-%s.png' % (dst, s), (s, s),
-                             remove_src=False)
-            os.remove(src)
+            resize_images(src, [('%s-%s.png' % (dst, s), (s, s))
+                                for s in size], remove_src=True)
         else:
             resize_image(src, dst, (size, size), remove_src=True)
         return True
@@ -199,22 +198,48 @@ def resize_icon(src, dst, size, **kw):
 def resize_preview(src, instance, **kw):
     """Resizes preview images and stores the sizes on the preview."""
     thumb_dst, full_dst = instance.thumbnail_path, instance.image_path
-    sizes = {}
     log.info('[1@None] Resizing preview and storing size: %s' % thumb_dst)
     try:
-        sizes['thumbnail'] = resize_image(src, thumb_dst,
-                                          amo.ADDON_PREVIEW_SIZES[0],
-                                          remove_src=False)
-        sizes['image'] = resize_image(src, full_dst,
-                                      amo.ADDON_PREVIEW_SIZES[1],
-                                      remove_src=False)
-        instance.sizes = sizes
+        sizes = resize_images(src, [(thumb_dst, amo.ADDON_PREVIEW_SIZES[0]),
+                                    (full_dst, amo.ADDON_PREVIEW_SIZES[1])])
+        instance.sizes = {'thumbnail': sizes[thumb_dst],
+                          'image': sizes[full_dst]}
         instance.save()
         return True
     except Exception, e:
         log.error("Error saving preview: %s" % e)
 
 
+def _resize_thumbnail(args):
+    """Pool worker for resize_thumbnails, returns (pk, size, error)."""
+    pk, src, dst = args
+    try:
+        return pk, resize_image(src, dst, amo.ADDON_PREVIEW_SIZES[0],
+                                remove_src=False), None
+    except Exception, e:
+        return pk, None, str(e)
+
+
+def resize_thumbnails(previews, processes=None):
+    """
+    Regenerates the thumbnails of the `previews` queryset from their full
+    size images in a local pool of processes, and stores the new sizes.
+    Returns the number of thumbnails written.
+    """
+    previews = dict((p.pk, p) for p in previews)
+    args = [(p.pk, p.image_path, p.thumbnail_path) for p in previews.values()]
+    done = 0
+    for pk, size, error in pool_imap(_resize_thumbnail, args, processes,
+                                     maxtasksperchild=100, chunksize=10):
+        if error:
+            log.error('Error resizing preview %s: %s' % (pk, error))
+            continue
+        preview = previews[pk]
+        preview.update(sizes=dict(preview.sizes or {}, thumbnail=size))
+        done += 1
+    return done
+
+
 @task
 @write
 def get_preview_sizes(ids, **kw):
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import jingo
 from nose.tools import eq_
@@ -9,7 +9,8 @@ import amo
 import amo.tests
 from addons.models import Addon, AddonUser
 from bandwagon.models import Collection
-from devhub.models import ActivityLog, AddonLog, BlogPost
+from devhub.models import (ActivityLog, AddonLog, BlogPost,
+                           EditorReviewCount)
 from tags.models import Tag
 from files.models import File
 from reviews.models import Review
@@ -292,6 +293,55 @@ class TestActivityLogCount(amo.tests.TestCase):
         eq_(len(ActivityLog.objects.for_developer()), 1)
 
 
+class TestEditorReviewCount(amo.tests.TestCase):
+    fixtures = ['base/addon_3615']
+
+    def setUp(self):
+        self.user = UserProfile.objects.get()
+        amo.set_user(self.user)
+
+    def counts(self):
+        return sorted(EditorReviewCount.objects
+                      .values_list('month', 'action', 'count'))
+
+    def test_increment(self):
+        for x in range(3):
+            amo.log(amo.LOG.APPROVE_VERSION, Addon.objects.get())
+        amo.log(amo.LOG.EDIT_VERSION, Addon.objects.get())
+        now = datetime.now()
+        eq_(self.counts(),
+            [(date(now.year, now.month, 1), amo.LOG.APPROVE_VERSION.id, 3)])
+
+    def test_backdated(self):
+        amo.log(amo.LOG.APPROVE_VERSION, Addon.objects.get(),
+                created=datetime(2011, 1, 5))
+        eq_(self.counts(),
+            [(date(2011, 1, 1), amo.LOG.APPROVE_VERSION.id, 1)])
+
+    def test_backdated_from_db(self):
+        log = amo.log(amo.LOG.APPROVE_VERSION, Addon.objects.get(),
+                      created=datetime(2011, 1, 5))
+        log = ActivityLog.objects.no_cache().get(pk=log.pk)
+        log.created = datetime(2010, 12, 5)
+        log.save()
+        eq_(self.counts(),
+            [(date(2010, 12, 1), amo.LOG.APPROVE_VERSION.id, 1)])
+
+    def test_delete(self):
+        log = amo.log(amo.LOG.APPROVE_VERSION, Addon.objects.get())
+        log.delete()
+        eq_(self.counts(), [])
+
+    def test_recount_matches(self):
+        amo.log(amo.LOG.APPROVE_VERSION, Addon.objects.get())
+        amo.log(amo.LOG.REJECT_VERSION, Addon.objects.get(),
+                created=datetime(2011, 3, 1))
+        counts = self.counts()
+        EditorReviewCount.objects.all().delete()
+        EditorReviewCount.recount()
+        eq_(self.counts(), counts)
+
+
 class TestBlogPosts(amo.tests.TestCase):
 
     def test_blog_posts(self):
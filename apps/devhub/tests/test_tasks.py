@@ -14,7 +14,7 @@ from PIL import Image
 
 import amo
 import amo.tests
-from addons.models import Addon
+from addons.models import Addon, Preview
 from amo.tests.test_helpers import get_image_path
 from amo.urlresolvers import reverse
 from amo.utils import ImageCheck
@@ -92,6 +92,42 @@ def _uploader(resize_size, final_size):
     assert not os.path.exists(src.name)
 
 
+class TestResizePreview(amo.tests.TestCase):
+    fixtures = ['base/addon_3615']
+
+    def setUp(self):
+        self.preview = Preview.objects.create(addon_id=3615)
+        self.src = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+        shutil.copyfile(get_image_path('non-animated.png'), self.src.name)
+
+    def tearDown(self):
+        for name in (self.src.name, self.preview.thumbnail_path,
+                     self.preview.image_path):
+            if os.path.exists(name):
+                os.remove(name)
+
+    def test_resize_preview(self):
+        assert tasks.resize_preview(self.src.name, self.preview)
+        sizes = Preview.objects.get(pk=self.preview.pk).sizes
+        eq_(tuple(sizes['thumbnail']),
+            Image.open(self.preview.thumbnail_path).size)
+        eq_(tuple(sizes['image']), Image.open(self.preview.image_path).size)
+        # No temporary files left behind.
+        names = os.listdir(os.path.dirname(self.preview.thumbnail_path))
+        eq_([n for n in names if n.startswith('.tmp')], [])
+
+    # Run the "pool" in process.
+    @mock.patch('devhub.tasks.pool_imap',
+                lambda func, args, *a, **kw: map(func, args))
+    def test_resize_thumbnails(self):
+        tasks.resize_preview(self.src.name, self.preview)
+        os.remove(self.preview.thumbnail_path)
+        eq_(tasks.resize_thumbnails(Preview.objects.filter(addon=3615)), 1)
+        eq_(tuple(Preview.objects.get(pk=self.preview.pk)
+                                 .sizes['thumbnail']),
+            Image.open(self.preview.thumbnail_path).size)
+
+
 class TestValidator(amo.tests.TestCase):
 
     def setUp(self):
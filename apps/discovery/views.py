@@ -209,9 +209,9 @@ def _recommendations(request, version, platform, limit, token, ids, qs):
                                     platform, version, shuffle=False)
     addons = dict((a.id, a) for a in addons)
     data = {'token2': token,
-            'addons': [api.utils.addon_to_dict(addons[i], disco=True,
-                                               src='discovery-personalrec')
-                       for i in ids if i in addons]}
+            'addons': api.utils.addons_to_dicts(
+                [addons[i] for i in ids if i in addons], disco=True,
+                src='discovery-personalrec')}
     content = json.dumps(data, cls=amo.utils.JSONEncoder)
     return http.HttpResponse(content, content_type='application/json')
 
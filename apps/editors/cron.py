@@ -0,0 +1,32 @@
+from django.db.models import Q
+
+import commonware.log
+import cronjobs
+
+import amo
+from addons.models import Addon
+from amo.utils import chunked
+from .models import EditorQueue
+
+log = commonware.log.getLogger('z.cron')
+
+
+def queue_addons():
+    """
+    The ids of the add-ons that could be waiting for review, plus the ones in
+    editor_queue now so stale rows go away.
+    """
+    waiting = (Q(status__in=amo.STATUS_UNDER_REVIEW) |
+               Q(versions__files__status=amo.STATUS_UNREVIEWED))
+    pks = set(Addon.objects.filter(waiting).values_list('pk', flat=True))
+    pks.update(EditorQueue.objects.values_list('addon', flat=True))
+    return pks
+
+
+@cronjobs.register
+def rebuild_editor_queue():
+    """Catch up on any queue changes the signals missed."""
+    pks = queue_addons()
+    log.info('Rebuilding the editor queue for %s add-ons.' % len(pks))
+    for chunk in chunked(sorted(pks), 100):
+        EditorQueue.refresh(chunk)
@@ -15,8 +15,9 @@ from amo.urlresolvers import reverse
 from amo.utils import send_mail as amo_send_mail
 
 import commonware.log
-from editors.models import (ViewPendingQueue, ViewFullReviewQueue,
-                            ViewPreliminaryQueue, ViewFastTrackQueue)
+from editors.models import (EditorQueue, QUEUES, ViewPendingQueue,
+                            ViewFullReviewQueue, ViewPreliminaryQueue,
+                            ViewFastTrackQueue)
 from editors.sql_table import SQLTable
 from webapps.models import Webapp
 
@@ -363,14 +364,18 @@ def get_position(addon):
     if not q:
         return False
 
-    mins_query = q.objects.filter(id=addon.id)
-    if mins_query.count() > 0:
-        mins = mins_query[0].waiting_time_min
-        pos = q.objects.having('waiting_time_min >=', mins).count()
-        total = q.objects.count()
-        return dict(mins=mins, pos=pos, total=total)
+    queue = dict((v, k) for k, v in QUEUES.items())[q]
+    qs = EditorQueue.uncached.filter(queue=queue)
+    try:
+        row = qs.get(addon=addon)
+    except EditorQueue.DoesNotExist:
+        return False
 
-    return False
+    # Add-ons without a waiting date count as the oldest ones.
+    pos = qs.filter(waiting_since__isnull=True).count()
+    if row.waiting_since:
+        pos += qs.filter(waiting_since__lte=row.waiting_since).count()
+    return dict(mins=row.waiting_time_min, pos=pos, total=qs.count())
 
 
 class ReviewHelper:
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from amo.utils import chunked
+from editors.cron import queue_addons
+from editors.tasks import update_editor_queue
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized editor_queue table'
+
+    def handle(self, *args, **options):
+        for chunk in chunked(sorted(queue_addons()), 100):
+            update_editor_queue.delay(chunk)
@@ -1,4 +1,5 @@
 import copy
+from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.db import models
@@ -12,9 +13,10 @@ from amo.urlresolvers import reverse
 from amo.utils import send_mail
 from addons.models import Addon
 from editors.sql_model import RawSQLModel
+from files.models import File
 from translations.fields import TranslatedField
 from users.models import UserProfile
-from versions.models import version_uploaded
+from versions.models import Version, version_uploaded
 
 import commonware.log
 
@@ -86,6 +88,7 @@ class ViewQueue(RawSQLModel):
     waiting_time_days = models.IntegerField()
     waiting_time_hours = models.IntegerField()
     waiting_time_min = models.IntegerField()
+    waiting_since = models.DateTimeField()
     is_version_specific = False
     _latest_version_id = None
 
@@ -207,6 +210,7 @@ class ViewFullReviewQueue(ViewQueue):
                 'TIMESTAMPDIFF(HOUR, MAX(versions.nomination), NOW())',
             'waiting_time_min':
                 'TIMESTAMPDIFF(MINUTE, MAX(versions.nomination), NOW())',
+            'waiting_since': 'MAX(versions.nomination)',
         })
         q['where'].extend(['files.status <> %s' % amo.STATUS_BETA,
                            'addons.status IN (%s, %s)' % (
@@ -227,6 +231,7 @@ class VersionSpecificQueue(ViewQueue):
                 'TIMESTAMPDIFF(HOUR, MAX(files.created), NOW())',
             'waiting_time_min':
                 'TIMESTAMPDIFF(MINUTE, MAX(files.created), NOW())',
+            'waiting_since': 'MAX(files.created)',
         })
         return q
 
@@ -268,30 +273,109 @@ class ViewFastTrackQueue(VersionSpecificQueue):
         return q
 
 
-class PerformanceGraph(ViewQueue):
-    id = models.IntegerField()
-    yearmonth = models.CharField(max_length=7)
-    approval_created = models.DateTimeField()
-    user_id = models.IntegerField()
-    total = models.IntegerField()
+QUEUES = SortedDict([('nominated', ViewFullReviewQueue),
+                     ('pending', ViewPendingQueue),
+                     ('prelim', ViewPreliminaryQueue),
+                     ('fast_track', ViewFastTrackQueue)])
 
-    def base_query(self):
-        request_ver = amo.LOG.REQUEST_VERSION.id
-        review_ids = [str(r) for r in amo.LOG_REVIEW_QUEUE if r != request_ver]
 
-        return {
-            'select': SortedDict([
-                ('yearmonth',
-                 "DATE_FORMAT(`log_activity`.`created`, '%%Y-%%m')"),
-                ('approval_created', '`log_activity`.`created`'),
-                ('user_id', '`users`.`id`'),
-                ('total', 'COUNT(*)')]),
-            'from': [
-                'log_activity',
-                'LEFT JOIN `users` ON (`users`.`id`=`log_activity`.`user_id`)'],
-            'where': ['log_activity.action in (%s)' % ','.join(review_ids)],
-            'group_by': 'yearmonth, user_id'
-            }
+class EditorQueue(amo.models.ModelBase):
+    """
+    A materialized copy of the ViewQueue results, one row per add-on per
+    queue.
+
+    Rows are refreshed from add-on, version and file changes so queue counts
+    and positions are indexed reads instead of the grouped ViewQueue queries.
+    """
+    addon = models.ForeignKey(Addon)
+    queue = models.CharField(max_length=20)
+    waiting_since = models.DateTimeField(null=True)
+    admin_review = models.BooleanField(default=False)
+    binary = models.BooleanField(default=False)
+    is_jetpack = models.BooleanField(default=False)
+    is_restartless = models.BooleanField(default=False)
+    is_premium = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = 'editor_queue'
+        unique_together = ('addon', 'queue')
+
+    @classmethod
+    def refresh(cls, addon_ids):
+        """Recompute the queue rows for `addon_ids` from the ViewQueues."""
+        addon_ids = list(addon_ids)
+        if not addon_ids:
+            return
+        rows = []
+        for name, view in QUEUES.items():
+            for row in view.objects.filter_raw('addons.id IN', addon_ids):
+                rows.append(cls(addon_id=row.id, queue=name,
+                                waiting_since=row.waiting_since,
+                                admin_review=row.admin_review,
+                                binary=row.binary, is_jetpack=row.is_jetpack,
+                                is_restartless=row.is_restartless,
+                                is_premium=row.is_premium))
+        cls.objects.filter(addon__in=addon_ids).delete()
+        for row in rows:
+            row.save()
+
+    @classmethod
+    def waiting(cls, queue, days_min=None, days_max=None):
+        """
+        The add-ons in `queue`, optionally limited by days spent waiting.
+
+        The day boundaries match TIMESTAMPDIFF(DAY, ...) in the ViewQueues.
+        """
+        qs = cls.uncached.filter(queue=queue)
+        now = datetime.now()
+        if days_min:
+            qs = qs.filter(waiting_since__lte=now - timedelta(days=days_min))
+        if days_max:
+            qs = qs.filter(
+                waiting_since__gt=now - timedelta(days=days_max + 1))
+        return qs
+
+    @property
+    def waiting_time_min(self):
+        if not self.waiting_since:
+            return 0
+        delta = datetime.now() - self.waiting_since
+        return int(delta.total_seconds() // 60)
+
+
+def queue_changed(addon_id):
+    from editors import tasks
+    tasks.update_editor_queue.delay([addon_id])
+
+
+@Addon.on_change
+def watch_addon_queue(old_attr={}, new_attr={}, instance=None, sender=None,
+                      **kw):
+    fields = ('status', 'disabled_by_user', 'admin_review', 'premium_type')
+    if any(old_attr.get(f) != new_attr.get(f) for f in fields):
+        queue_changed(instance.id)
+
+
+def update_queue(sender, instance, **kw):
+    if kw.get('raw'):
+        return
+    try:
+        if sender is File:
+            queue_changed(instance.version.addon_id)
+        else:
+            queue_changed(instance.addon_id)
+    except models.ObjectDoesNotExist:
+        pass
+
+
+models.signals.post_save.connect(update_queue, sender=File,
+                                 dispatch_uid='editor_queue_file_save')
+models.signals.post_delete.connect(update_queue, sender=File,
+                                   dispatch_uid='editor_queue_file_delete')
+models.signals.post_save.connect(update_queue, sender=Version,
+                                 dispatch_uid='editor_queue_version_save')
+models.signals.post_delete.connect(update_queue, sender=Version,
+                                   dispatch_uid='editor_queue_version_delete')
 
 
 class EditorSubscription(amo.models.ModelBase):
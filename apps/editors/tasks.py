@@ -6,6 +6,7 @@ from celeryutils import task
 from hera.contrib.django_utils import flush_urls
 
 from devhub.models import ActivityLog, CommentLog, VersionLog
+from editors.models import EditorQueue
 from versions.models import Version
 
 log = commonware.log.getLogger('z.task')
@@ -47,3 +48,9 @@ def add_versionlog(items, **kw):
                 vl.created = al.created
                 vl.save()
 
+
+@task
+def update_editor_queue(ids, **kw):
+    log.info('[%s@%s] Updating editor queue for: %s' %
+             (len(ids), update_editor_queue.rate_limit, ids))
+    EditorQueue.refresh(ids)
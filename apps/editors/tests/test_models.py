@@ -1,5 +1,5 @@
 # -*- coding: utf8 -*-
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.core import mail
 
@@ -11,9 +11,12 @@ from addons.models import Addon
 from versions.models import Version, version_uploaded, ApplicationsVersions
 from files.models import Platform, File
 from applications.models import Application, AppVersion
-from editors.models import (EditorSubscription, send_notifications,
-                            ViewPendingQueue, ViewFullReviewQueue,
-                            ViewPreliminaryQueue, ViewFastTrackQueue)
+from editors import cron
+from editors.helpers import get_position
+from editors.models import (EditorQueue, EditorSubscription,
+                            send_notifications, ViewPendingQueue,
+                            ViewFullReviewQueue, ViewPreliminaryQueue,
+                            ViewFastTrackQueue)
 from users.models import UserProfile
 
 
@@ -117,6 +120,77 @@ class TestQueue(amo.tests.TestCase):
         eq_(self.Queue.objects.all().count(), 2)
 
 
+class TestEditorQueue(amo.tests.TestCase):
+
+    def queues(self, addon):
+        return sorted(EditorQueue.objects.filter(addon=addon)
+                      .values_list('queue', flat=True))
+
+    def test_follows_status(self):
+        f = create_addon_file('Nominated', '0.1',
+                              amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        eq_(self.queues(f['addon']), ['nominated'])
+        f['addon'].update(status=amo.STATUS_PUBLIC)
+        eq_(self.queues(f['addon']), ['pending'])
+        f['file'].update(status=amo.STATUS_PUBLIC)
+        eq_(self.queues(f['addon']), [])
+
+    def test_disabled_by_user(self):
+        f = create_addon_file('Prelim', '0.1',
+                              amo.STATUS_LITE, amo.STATUS_UNREVIEWED)
+        eq_(self.queues(f['addon']), ['prelim'])
+        f['addon'].update(disabled_by_user=True)
+        eq_(self.queues(f['addon']), [])
+
+    def test_matches_view_queues(self):
+        create_addon_file('Pending', '0.1',
+                          amo.STATUS_PUBLIC, amo.STATUS_UNREVIEWED)
+        create_addon_file('Nominated', '0.1',
+                          amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        create_addon_file('Prelim', '0.1',
+                          amo.STATUS_LITE, amo.STATUS_UNREVIEWED)
+        for name, view in (('pending', ViewPendingQueue),
+                           ('nominated', ViewFullReviewQueue),
+                           ('prelim', ViewPreliminaryQueue),
+                           ('fast_track', ViewFastTrackQueue)):
+            eq_(sorted(EditorQueue.waiting(name)
+                       .values_list('addon', flat=True)),
+                sorted(row.id for row in view.objects.all()))
+
+    def test_waiting_days(self):
+        f = create_addon_file('Nominated', '0.1',
+                              amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        f['version'].update(nomination=datetime.now() - timedelta(days=6))
+        eq_(EditorQueue.waiting('nominated', days_max=4).count(), 0)
+        eq_(EditorQueue.waiting('nominated', days_min=5,
+                                days_max=10).count(), 1)
+        eq_(EditorQueue.waiting('nominated', days_min=11).count(), 0)
+
+    def test_cron(self):
+        f = create_addon_file('Nominated', '0.1',
+                              amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        public = create_addon_file('Public', '0.1',
+                                   amo.STATUS_PUBLIC, amo.STATUS_PUBLIC)
+        # Pretend the signals missed a couple of changes.
+        EditorQueue.objects.all().delete()
+        EditorQueue.objects.create(addon=public['addon'], queue='pending')
+        cron.rebuild_editor_queue()
+        eq_(self.queues(f['addon']), ['nominated'])
+        eq_(self.queues(public['addon']), [])
+
+    def test_position(self):
+        old = create_addon_file('Old', '0.1',
+                                amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        new = create_addon_file('New', '0.1',
+                                amo.STATUS_NOMINATED, amo.STATUS_UNREVIEWED)
+        old['version'].update(nomination=datetime.now() - timedelta(days=2))
+        new['version'].update(nomination=datetime.now() - timedelta(days=1))
+        eq_(get_position(Addon.objects.get(pk=old['addon'].pk))['pos'], 1)
+        pos = get_position(Addon.objects.get(pk=new['addon'].pk))
+        eq_((pos['pos'], pos['total']), (2, 2))
+        assert pos['mins'] >= 60 * 24
+
+
 class TestPendingQueue(TestQueue):
     __test__ = True
     Queue = ViewPendingQueue
@@ -22,7 +22,8 @@ from abuse.models import AbuseReport
 from addons.models import Addon, AddonDependency, AddonUser
 from applications.models import Application
 from devhub.models import ActivityLog
-from editors.models import EditorSubscription, EventLog
+from editors import views
+from editors.models import EditorQueue, EditorSubscription, EventLog
 from files.models import Platform, File
 import reviews
 from reviews.models import Review, ReviewFlag
@@ -315,6 +316,8 @@ class TestHome(EditorTest):
     """Test the page at /editors."""
     def setUp(self):
         self.login_as_editor()
+        # Fixtures are loaded raw, so fill in the queue table by hand.
+        EditorQueue.refresh(Addon.objects.values_list('id', flat=True))
         self.user = UserProfile.objects.get(id=5497308)
         self.user.display_name = 'editor'
         self.user.save()
@@ -681,6 +684,11 @@ class TestQueueBasics(QueueTest):
 
 class TestPendingQueue(QueueTest):
 
+    def test_query_budget(self):
+        with self.assertQueryBudget(views.queue_pending._query_budget):
+            r = self.client.get(reverse('editors.queue_pending'))
+        eq_(r.status_code, 200)
+
     def test_results(self):
         r = self.client.get(reverse('editors.queue_pending'))
         eq_(r.status_code, 200)
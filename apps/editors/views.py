@@ -6,7 +6,7 @@ import time
 from django import http
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
 from django.shortcuts import redirect, get_object_or_404
 from django.utils.datastructures import SortedDict
 from django.views.decorators.cache import never_cache
@@ -20,15 +20,13 @@ from access import acl
 from addons.decorators import addon_view
 from addons.models import Addon, Version
 from amo.decorators import (login_required, json_view, post_required,
-                            permission_required)
+                            permission_required, query_budget)
 from amo.utils import paginate
 from amo.urlresolvers import reverse
-from devhub.models import ActivityLog
+from devhub.models import ActivityLog, EditorReviewCount
 from editors import forms
-from editors.models import (EditorSubscription, ViewPendingQueue,
-                            ViewFullReviewQueue, ViewPreliminaryQueue,
-                            EventLog, CannedResponse, PerformanceGraph,
-                            ViewFastTrackQueue)
+from editors.models import (EditorSubscription, EditorQueue, EventLog,
+                            CannedResponse)
 from editors.helpers import (ViewPendingQueueTable, ViewFullReviewQueueTable,
                              ViewPreliminaryQueueTable, WebappQueueTable,
                              ViewFastTrackQueueTable)
@@ -150,12 +148,13 @@ def performance(request, user_id=False):
 
 
 def _recent_editors(days=90):
+    """Editors with reviews in any month overlapping the last `days`."""
     since_date = datetime.now() - timedelta(days=days)
-    editors = (UserProfile.objects
-                          .filter(activitylog__action__in=amo.LOG_REVIEW_QUEUE,
-                                  activitylog__created__gt=since_date)
-                          .order_by('display_name')
-                          .distinct())
+    ids = (EditorReviewCount.objects
+           .filter(month__gte=date(since_date.year, since_date.month, 1))
+           .values_list('user', flat=True))
+    editors = (UserProfile.objects.filter(id__in=set(ids))
+                          .order_by('display_name'))
     return editors
 
 
@@ -192,28 +191,30 @@ def _performance_by_month(user_id, months=12, end_month=None, end_year=None):
     start_time = time.mktime((end_year, end_month + 1 - months,
                               1, 0, 0, 0, 0, 0, -1))
 
-    sql = (PerformanceGraph.objects
-          .filter_raw('log_activity.created >=',
-                      date.fromtimestamp(start_time).isoformat())
-          .filter_raw('log_activity.created <',
-                      date.fromtimestamp(end_time).isoformat())
-          )
+    # REQUEST_VERSION isn't a review.
+    rows = (EditorReviewCount.objects
+            .filter(month__gte=date.fromtimestamp(start_time),
+                    month__lt=date.fromtimestamp(end_time))
+            .exclude(action=amo.LOG.REQUEST_VERSION.id)
+            .values_list('month', 'user')
+            .annotate(total=Sum('count'))
+            .order_by('month'))
 
-    for row in sql.all():
-        label = row.approval_created.isoformat()[:7]
+    for month, row_user_id, total in rows:
+        label = month.isoformat()[:7]
 
         if not label in monthly_data:
-            xaxis = row.approval_created.strftime('%b %Y')
+            xaxis = month.strftime('%b %Y')
             monthly_data[label] = dict(teamcount=0, usercount=0,
                                        teamamt=0, label=xaxis)
 
         monthly_data[label]['teamamt'] = monthly_data[label]['teamamt'] + 1
         monthly_data_count = monthly_data[label]['teamcount']
-        monthly_data[label]['teamcount'] = monthly_data_count + row.total
+        monthly_data[label]['teamcount'] = monthly_data_count + total
 
-        if row.user_id == user_id:
+        if row_user_id == user_id:
             user_count = monthly_data[label]['usercount']
-            monthly_data[label]['usercount'] = user_count + row.total
+            monthly_data[label]['usercount'] = user_count + total
 
     # Calculate averages
     for i, vals in monthly_data.items():
@@ -289,24 +290,13 @@ def _queue(request, TableObj, tab, qs=None):
 
 
 def queue_counts(type=None, **kw):
-    def construct_query(query_type, days_min=None, days_max=None):
-        def apply_query(query, *args):
-            query = query.having(*args)
-            return query
+    def construct_query(queue, days_min=None, days_max=None):
+        return EditorQueue.waiting(queue, days_min, days_max).count
 
-        query = query_type.objects
-
-        if days_min:
-            query = apply_query(query, 'waiting_time_days >=', days_min)
-        if days_max:
-            query = apply_query(query, 'waiting_time_days <=', days_max)
-
-        return query.count
-
-    counts = {'pending': construct_query(ViewPendingQueue, **kw),
-              'nominated': construct_query(ViewFullReviewQueue, **kw),
-              'prelim': construct_query(ViewPreliminaryQueue, **kw),
-              'fast_track': construct_query(ViewFastTrackQueue, **kw),
+    counts = {'pending': construct_query('pending', **kw),
+              'nominated': construct_query('nominated', **kw),
+              'prelim': construct_query('prelim', **kw),
+              'fast_track': construct_query('fast_track', **kw),
               'moderated': Review.objects.filter(reviewflag__isnull=False,
                                                  editorreview=1).count,
               'apps': Webapp.objects.pending().count}
@@ -324,26 +314,31 @@ def queue(request):
     return redirect(reverse('editors.queue_pending'))
 
 
+@query_budget(40)
 @editor_required
 def queue_nominated(request):
     return _queue(request, ViewFullReviewQueueTable, 'nominated')
 
 
+@query_budget(40)
 @editor_required
 def queue_pending(request):
     return _queue(request, ViewPendingQueueTable, 'pending')
 
 
+@query_budget(40)
 @editor_required
 def queue_prelim(request):
     return _queue(request, ViewPreliminaryQueueTable, 'prelim')
 
 
+@query_budget(40)
 @editor_required
 def queue_fast_track(request):
     return _queue(request, ViewFastTrackQueueTable, 'fast_track')
 
 
+@query_budget(40)
 @editor_required
 def queue_moderated(request):
     rf = (Review.objects.filter(editorreview=1, reviewflag__isnull=False,
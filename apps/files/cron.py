@@ -11,6 +11,7 @@ import cronjobs
 import commonware.log
 
 from files.models import FileValidation
+from files.utils import ExtractionCache
 
 log = commonware.log.getLogger('z.cron')
 
@@ -18,24 +19,20 @@ log = commonware.log.getLogger('z.cron')
 @cronjobs.register
 def cleanup_extracted_file():
     log.info('Removing extracted files for file viewer.')
-    root = os.path.join(settings.TMP_PATH, 'file_viewer')
-    for path in os.listdir(root):
-        full = os.path.join(root, path)
-        age = time.time() - os.stat(full)[stat.ST_ATIME]
-        if (age) > (60 * 60):
-            log.debug('Removing extracted files: %s, %dsecs old.' % (full, age))
-            shutil.rmtree(full)
-            # Nuke out the file and diff caches when the file gets removed.
-            id = os.path.basename(path)
-            try:
-                int(id)
-            except ValueError:
-                continue
+    removed = ExtractionCache().evict(settings.FILE_VIEWER_CACHE_SIZE)
+    for id in removed:
+        log.debug('Removed extracted files: %s.' % id)
+        # Nuke out the file and diff caches when the file gets removed.
+        try:
+            int(id)
+        except ValueError:
+            continue
 
-            key = hashlib.md5()
-            key.update(str(id))
+        key = hashlib.md5()
+        key.update(str(id))
+        for prefix in ('file-viewer-files', 'file-viewer-zip'):
             cache.delete('%s:memoize:%s:%s' % (settings.CACHE_PREFIX,
-                                               'file-viewer', key.hexdigest()))
+                                               prefix, key.hexdigest()))
 
 
 @cronjobs.register
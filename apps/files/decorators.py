@@ -11,7 +11,7 @@ from django.utils.http import http_date
 import amo
 from amo.utils import Token
 from access.acl import check_addon_ownership, action_allowed
-from files.helpers import DiffHelper, FileViewer
+from files.helpers import DiffHelper, viewer_class
 from files.models import File
 
 
@@ -60,7 +60,7 @@ def file_view(func, **kwargs):
         result = allowed(request, file)
         if result is not True:
             return result
-        obj = FileViewer(file)
+        obj = viewer_class()(file)
         response = func(request, obj, *args, **kw)
         if obj.selected:
             response['ETag'] = '"%s"' % obj.selected.get('md5')
@@ -78,7 +78,7 @@ def compare_file_view(func, **kwargs):
             result = allowed(request, obj)
             if result is not True:
                 return result
-        obj = DiffHelper(one, two)
+        obj = DiffHelper(one, two, viewer=viewer_class())
         response = func(request, obj, *args, **kw)
         if obj.left.selected:
             response['ETag'] = '"%s"' % obj.left.selected.get('md5')
@@ -91,7 +91,7 @@ def compare_file_view(func, **kwargs):
 def file_view_token(func, **kwargs):
     @functools.wraps(func)
     def wrapper(request, file_id, key, *args, **kw):
-        viewer = FileViewer(get_object_or_404(File, pk=file_id))
+        viewer = viewer_class()(get_object_or_404(File, pk=file_id))
         token = request.GET.get('token')
         if not token:
             log.error('Denying access to %s, no token.' % viewer.file.id)
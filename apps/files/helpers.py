@@ -1,9 +1,12 @@
 import codecs
+import hashlib
 import mimetypes
 import os
-import shutil
 import stat
+import StringIO
+from zipfile import BadZipfile
 
+from django import forms
 from django.conf import settings
 from django.utils.datastructures import SortedDict
 from django.utils.encoding import smart_unicode
@@ -11,13 +14,14 @@ from django.template.defaultfilters import filesizeformat
 
 import jinja2
 import commonware.log
+import waffle
 from jingo import register, env
 from tower import ugettext as _
 
 import amo
 from amo.utils import memoize, Message
 from amo.urlresolvers import reverse
-from files.utils import extract_xpi, get_md5
+from files.utils import ExtractionCache, SafeUnzip, get_md5
 from validator.testcases.packagelayout import (blacklisted_extensions,
                                                blacklisted_magic_numbers)
 
@@ -64,8 +68,8 @@ class FileViewer:
     def __init__(self, file_obj):
         self.file = file_obj
         self.src = file_obj.file_path
-        self.dest = os.path.join(settings.TMP_PATH, 'file_viewer',
-                                 str(file_obj.pk))
+        self.store = ExtractionCache()
+        self.dest = os.path.join(self.store.root, str(file_obj.pk))
         self._files, self.selected = None, None
 
     def __str__(self):
@@ -80,28 +84,19 @@ class FileViewer:
         Will make all the directories and expand the files.
         Raises error on nasty files.
         """
-        try:
-            os.makedirs(os.path.dirname(self.dest))
-        except OSError, err:
-            pass
-
+        filename = None
         if self.is_search_engine() and self.src.endswith('.xml'):
-            try:
-                os.makedirs(self.dest)
-            except OSError, err:
-                pass
-            shutil.copyfile(self.src,
-                            os.path.join(self.dest, self.file.filename))
-        else:
-            try:
-                extract_xpi(self.src, self.dest, expand=True)
-            except Exception, err:
-                task_log.error('Error (%s) extracting %s' % (err, self.src))
-                raise
+            filename = self.file.filename
+        try:
+            written = self.store.extract(self.src, self.dest, filename)
+        except Exception, err:
+            task_log.error('Error (%s) extracting %s' % (err, self.src))
+            raise
+        task_log.debug('Extracted %s, %s new bytes written.' %
+                       (self.src, written))
 
     def cleanup(self):
-        if os.path.exists(self.dest):
-            shutil.rmtree(self.dest)
+        self.store.remove(self.dest)
 
     def is_search_engine(self):
         """Is our file for a search engine?"""
@@ -112,15 +107,20 @@ class FileViewer:
         return (os.path.exists(self.dest) and not
                 Message(self._extraction_cache_key()).get())
 
-    def _is_binary(self, mimetype, path):
-        """Uses the filename to see if the file can be shown in HTML or not."""
+    def _is_binary(self, mimetype, path, head=None):
+        """
+        Uses the filename to see if the file can be shown in HTML or not.
+        `head` is the start of the file, read from `path` if not given.
+        """
         # Re-use the blacklisted data from amo-validator to spot binaries.
         ext = os.path.splitext(path)[1][1:]
         if ext in blacklisted_extensions:
             return True
 
-        if os.path.exists(path) and not os.path.isdir(path):
-            bytes = tuple([ord(x) for x in open(path, 'r').read(4)])
+        if head is None and os.path.exists(path) and not os.path.isdir(path):
+            head = open(path, 'r').read(4)
+        if head is not None:
+            bytes = tuple([ord(x) for x in head[:4]])
             if [x for x in blacklisted_magic_numbers if bytes[0:len(x)] == x]:
                 return True
 
@@ -153,16 +153,20 @@ class FileViewer:
             self.selected['msg'] = msg
             return ''
 
-        with open(self.selected['full'], 'r') as opened:
-            cont = opened.read()
-            codec = 'utf-16' if cont.startswith(codecs.BOM_UTF16) else 'utf-8'
-            try:
-                return cont.decode(codec)
-            except UnicodeDecodeError:
-                cont = cont.decode(codec, 'ignore')
-                #L10n: {0} is the filename.
-                self.selected['msg'] = _('Problems decoding with: %s.') % codec
-                return cont
+        cont = self.read_raw(self.selected)
+        codec = 'utf-16' if cont.startswith(codecs.BOM_UTF16) else 'utf-8'
+        try:
+            return cont.decode(codec)
+        except UnicodeDecodeError:
+            cont = cont.decode(codec, 'ignore')
+            #L10n: {0} is the filename.
+            self.selected['msg'] = _('Problems decoding with: %s.') % codec
+            return cont
+
+    def read_raw(self, file):
+        """The contents of `file`, one of the values from get_files()."""
+        with open(file['full'], 'r') as opened:
+            return opened.read()
 
     def select(self, file):
         self.selected = self.get_files().get(file)
@@ -199,6 +203,11 @@ class FileViewer:
 
         if not self.is_extracted():
             return {}
+        # Mark the tree as recently used so evict() keeps it around.
+        try:
+            os.utime(self.dest + '.json', None)
+        except OSError:
+            pass
         # In case a cron job comes along and deletes the files
         # mid tree building.
         try:
@@ -243,7 +252,7 @@ class FileViewer:
                 return short
         return 'plain'
 
-    @memoize(prefix='file-viewer', time=60 * 60)
+    @memoize(prefix='file-viewer-files', time=60 * 60)
     def _get_files(self):
         all_files, res = [], SortedDict()
         # Not using os.path.walk so we get just the right order.
@@ -255,23 +264,30 @@ class FileViewer:
                 if os.path.isdir(full):
                     iterate(full)
         iterate(self.dest)
+        manifest = self.store.manifest(self.dest)
 
         for path in all_files:
             filename = smart_unicode(os.path.basename(path), errors='replace')
             short = smart_unicode(path[len(self.dest) + 1:], errors='replace')
             mime, encoding = mimetypes.guess_type(filename)
             directory = os.path.isdir(path)
+            size = os.stat(path)[stat.ST_SIZE]
+            # Only hash files that were changed or added after extraction.
+            md5 = manifest.get(short, {}).get('md5')
+            if not directory and manifest.get(short, {}).get('size') != size:
+                md5 = get_md5(path)
             res[short] = {'binary': self._is_binary(mime, path),
                           'depth': short.count(os.sep),
                           'directory': directory,
                           'filename': filename,
                           'full': path,
-                          'md5': get_md5(path) if not directory else '',
+                          'md5': md5 if not directory else '',
+                          'diff_key': md5 if not directory else '',
                           'mimetype': mime or 'application/octet-stream',
                           'syntax': self.get_syntax(filename),
                           'modified': os.stat(path)[stat.ST_MTIME],
                           'short': short,
-                          'size': os.stat(path)[stat.ST_SIZE],
+                          'size': size,
                           'truncated': self.truncate(filename),
                           'url': reverse('files.list',
                                          args=[self.file.id, 'file', short]),
@@ -282,11 +298,159 @@ class FileViewer:
         return res
 
 
+class ZipFileViewer(FileViewer):
+    """
+    A FileViewer that works straight off the archive. The tree is built from
+    the central directory (and those of any nested jars), nothing is written
+    to disk and entries are only read when they are selected. The entry CRC
+    and size stand in for the md5 when diffing.
+    """
+    expand = ExtractionCache.expand
+    max_depth = ExtractionCache.max_depth
+
+    def __init__(self, file_obj):
+        FileViewer.__init__(self, file_obj)
+        self._raw = (None, None)
+
+    def extract(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+    def is_extracted(self):
+        return os.path.exists(self.src)
+
+    def get_files(self):
+        try:
+            return FileViewer.get_files(self)
+        except (BadZipfile, forms.ValidationError), err:
+            task_log.error('Error (%s) reading %s' % (err, self.src))
+            return {}
+
+    def select(self, file):
+        FileViewer.select(self, file)
+        selected = self.selected
+        if (selected and not selected['directory'] and not selected['md5']
+            and selected['size'] <= settings.FILE_VIEWER_SIZE_LIMIT):
+            try:
+                selected['md5'] = hashlib.md5(self.read_raw(selected))
+                selected['md5'] = selected['md5'].hexdigest()
+            except (IOError, OSError, KeyError, BadZipfile):
+                selected['md5'] = ''
+
+    def _open(self, member):
+        """The SafeUnzip holding `member`, opening any jars on the way."""
+        zip = SafeUnzip(self.src)
+        zip.is_valid()
+        for part in member[:-1]:
+            zip = SafeUnzip(StringIO.StringIO(zip.zip.read(part)))
+            zip.is_valid()
+        return zip
+
+    def read_raw(self, file):
+        short, data = self._raw
+        if short != file['short']:
+            if file['member'] is None:
+                with open(self.src, 'r') as opened:
+                    data = opened.read()
+            else:
+                zip = self._open(file['member'])
+                data = zip.zip.read(file['member'][-1])
+            self._raw = (file['short'], data)
+        return data
+
+    def _entries(self, zip, prefix=(), depth=0):
+        """
+        Yields (member, info, head) for everything in `zip`, where member is
+        the path of names through any nested jars. Jars that are expanded
+        are yielded with no info, so they show up as directories.
+        """
+        for info in zip.info:
+            member = prefix + (info.filename,)
+            if info.filename.endswith('/'):
+                yield member, None, None
+                continue
+            if (depth < self.max_depth and
+                os.path.splitext(info.filename)[1] in self.expand):
+                inner = SafeUnzip(StringIO.StringIO(zip.zip.read(info)))
+                if inner.is_valid(fatal=False):
+                    yield member, None, None
+                    for entry in self._entries(inner, member, depth + 1):
+                        yield entry
+                    continue
+            yield member, info, zip.zip.open(info).read(4)
+
+    @memoize(prefix='file-viewer-zip', time=60 * 60)
+    def _get_files(self):
+        modified = os.stat(self.src)[stat.ST_MTIME]
+        if self.is_search_engine() and self.src.endswith('.xml'):
+            with open(self.src, 'r') as opened:
+                data = opened.read()
+            entries = {self.file.filename: (None, len(data),
+                                            hashlib.md5(data).hexdigest(),
+                                            data[:4])}
+        else:
+            zip = SafeUnzip(self.src)
+            zip.is_valid()
+            entries = {}
+            for member, info, head in self._entries(zip):
+                short = smart_unicode('/'.join(member).rstrip('/'),
+                                      errors='replace')
+                if info:
+                    entries[short] = (member, info.file_size,
+                                      '%08x:%s' % (info.CRC, info.file_size),
+                                      head)
+                else:
+                    entries.setdefault(short, None)
+                # Not every archive lists its directories.
+                parts = short.split('/')
+                for depth in range(1, len(parts)):
+                    entries.setdefault('/'.join(parts[:depth]), None)
+
+        res = SortedDict()
+        # The same order as the extracting viewer's walk of the tree.
+        for short in sorted(entries, key=lambda k: k.split('/')):
+            filename = short.split('/')[-1]
+            mime, encoding = mimetypes.guess_type(filename)
+            directory = entries[short] is None
+            member, size, diff_key, head = (entries[short] or
+                                            (None, 0, '', ''))
+            res[short] = {'binary': self._is_binary(mime, short, head),
+                          'depth': short.count('/'),
+                          'directory': directory,
+                          'filename': filename,
+                          'full': None,
+                          'md5': '',
+                          'diff_key': diff_key,
+                          'member': member,
+                          'mimetype': mime or 'application/octet-stream',
+                          'syntax': self.get_syntax(filename),
+                          'modified': modified,
+                          'short': short,
+                          'size': size,
+                          'truncated': self.truncate(filename),
+                          'url': reverse('files.list',
+                                         args=[self.file.id, 'file', short]),
+                          'url_serve': reverse('files.redirect',
+                                               args=[self.file.id, short]),
+                          'version': self.file.version.version}
+
+        return res
+
+
+def viewer_class():
+    """The FileViewer to use, ZipFileViewer when the switch is on."""
+    if waffle.switch_is_active('zip-file-viewer'):
+        return ZipFileViewer
+    return FileViewer
+
+
 class DiffHelper:
 
-    def __init__(self, left, right):
-        self.left = FileViewer(left)
-        self.right = FileViewer(right)
+    def __init__(self, left, right, viewer=FileViewer):
+        self.left = viewer(left)
+        self.right = viewer(right)
         self.key = None
 
     def __str__(self):
@@ -319,7 +483,7 @@ class DiffHelper:
         different = []
         for key, file in left_files.items():
             file['url'] = self.get_url(file['short'])
-            diff = file['md5'] != right_files.get(key, {}).get('md5')
+            diff = file['diff_key'] != right_files.get(key, {}).get('diff_key')
             file['diff'] = diff
             if diff:
                 different.append(file)
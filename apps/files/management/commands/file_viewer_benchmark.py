@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from files.models import File
+from files.utils import ExtractionCache, extract_xpi, get_md5
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, dirs, files in os.walk(path) for name in files)
+
+
+class Command(BaseCommand):
+    args = '<left file id> <right file id>'
+    help = ('Compare the time and bytes written to diff two files, by full '
+            'extraction and through the file viewer extraction cache.')
+
+    def handle(self, *args, **options):
+        if len(args) != 2:
+            raise CommandError('Usage: %s' % self.args)
+        sources = [File.objects.get(pk=pk).file_path for pk in args]
+        tmp = tempfile.mkdtemp()
+        try:
+            self.report('extract_xpi', *self.extract_xpi(sources, tmp))
+            self.report('cache', *self.cache(sources, tmp))
+        finally:
+            shutil.rmtree(tmp)
+
+    def report(self, name, seconds, written, changed):
+        print '%-12s %8.2fs %12s bytes written %6s files changed' % (
+            name, seconds, written, changed)
+
+    def extract_xpi(self, sources, tmp):
+        start = time.time()
+        dests = []
+        for source in sources:
+            dests.append(tempfile.mkdtemp(dir=tmp))
+            extract_xpi(source, dests[-1], expand=True)
+        left, right = dests
+        changed = 0
+        for root, dirs, files in os.walk(left):
+            for name in files:
+                path = os.path.join(root, name)
+                other = os.path.join(right, path[len(left) + 1:])
+                if (not os.path.exists(other) or
+                    get_md5(path) != get_md5(other)):
+                    changed += 1
+        return (time.time() - start, sum(tree_size(d) for d in dests),
+                changed)
+
+    def cache(self, sources, tmp):
+        start = time.time()
+        store = ExtractionCache(os.path.join(tmp, 'cache'))
+        written = 0
+        for i, source in enumerate(sources):
+            written += store.extract(source, os.path.join(store.root, str(i)))
+        left, right = [store.manifest(os.path.join(store.root, str(i)))
+                       for i in range(2)]
+        changed = sum(1 for k, v in left.items()
+                      if right.get(k, {}).get('sha256') != v['sha256'])
+        return time.time() - start, written, changed
@@ -9,6 +9,7 @@ import unicodedata
 import uuid
 import shutil
 import stat
+import tempfile
 import time
 import zipfile
 
@@ -32,7 +33,7 @@ from amo.urlresolvers import reverse
 from applications.models import Application, AppVersion
 from apps.amo.utils import memoize
 import devhub.signals
-from files.utils import RDF, SafeUnzip
+from files.utils import RDF, SafeUnzip, zip_index
 from versions.compare import version_int as vint
 
 log = commonware.log.getLogger('z.files')
@@ -405,15 +406,35 @@ class File(amo.models.OnChangeMixin, amo.models.ModelBase):
         """
         Writes the watermarked addon to the destination given
         the addons install.rdf data.
+
+        The other entries are copied over without being recompressed and the
+        file is moved into place once it's complete.
         """
         directory = os.path.dirname(dest)
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        shutil.copyfile(self.file_path, dest)
-        outzip = SafeUnzip(dest, mode='w')
-        outzip.is_valid()
-        outzip.zip.writestr('install.rdf', str(data))
+        try:
+            index = zip_index(self.file_path)
+        except zipfile.LargeZipFile:
+            shutil.copyfile(self.file_path, dest)
+            outzip = SafeUnzip(dest, mode='w')
+            outzip.is_valid()
+            outzip.zip.writestr('install.rdf', str(data))
+            return os.path.getsize(dest)
+
+        tmp = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+        try:
+            with tmp:
+                size = index.write(tmp, {'install.rdf': str(data)})
+            # NamedTemporaryFile is only readable by us; the web server
+            # serves these.
+            os.chmod(tmp.name, 0644)
+            os.rename(tmp.name, dest)
+        except Exception:
+            os.remove(tmp.name)
+            raise
+        return size
 
     def watermark(self, user):
         """
@@ -447,8 +468,12 @@ class File(amo.models.OnChangeMixin, amo.models.ModelBase):
             with statsd.timer('marketplace.watermark'):
                 log.info('Starting watermarking of: %s for %s' %
                          (self.pk, user.pk))
+                start = time.time()
                 data = self.watermark_install_rdf(user)
-                self.write_watermarked_addon(dest, data)
+                size = self.write_watermarked_addon(dest, data)
+                took = time.time() - start
+                log.info('Watermarked %s for %s: %s bytes in %.3fs' %
+                         (self.pk, user.pk, size, took))
 
         return dest
 
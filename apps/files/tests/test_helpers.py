@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import hashlib
 import os
 import mimetypes
 import shutil
+import tempfile
 import zipfile
 
 from django.conf import settings
@@ -13,9 +15,9 @@ from nose.tools import eq_
 
 import amo.tests
 from amo.urlresolvers import reverse
-from files.helpers import FileViewer, DiffHelper
+from files.helpers import FileViewer, DiffHelper, ZipFileViewer
 from files.models import File
-from files.utils import SafeUnzip
+from files.utils import ExtractionCache, SafeUnzip
 
 root = os.path.join(settings.ROOT, 'apps/files/fixtures/files')
 get_file = lambda x: '%s/%s' % (root, x)
@@ -180,12 +182,29 @@ class TestFileHelper(amo.tests.TestCase):
         eq_(res, '')
         assert self.viewer.selected['msg'].startswith('That file no')
 
-    @patch('files.helpers.get_md5')
-    def test_delete_mid_tree(self, get_md5):
-        get_md5.side_effect = IOError('ow')
+    @patch('files.helpers.FileViewer._is_binary')
+    def test_delete_mid_tree(self, _is_binary):
+        _is_binary.side_effect = IOError('ow')
         self.viewer.extract()
         eq_({}, self.viewer.get_files())
 
+    @patch('files.helpers.get_md5')
+    def test_md5_from_manifest(self, get_md5):
+        self.viewer.extract()
+        files = self.viewer.get_files()
+        assert not get_md5.called
+        eq_(files['install.js']['md5'],
+            hashlib.md5(open(files['install.js']['full']).read()).hexdigest())
+
+    def test_md5_changed_file(self):
+        self.viewer.extract()
+        path = os.path.join(self.viewer.dest, 'install.js')
+        os.remove(path)
+        open(path, 'w').write('foo')
+        cache.clear()
+        eq_(self.viewer.get_files()['install.js']['md5'],
+            hashlib.md5('foo').hexdigest())
+
 
 class TestSearchEngineHelper(amo.tests.TestCase):
     fixtures = ['base/addon_4594_a9']
@@ -315,6 +334,12 @@ class TestDiffHelper(amo.tests.TestCase):
         assert not self.helper.is_diffable()
         assert self.helper.left.selected['msg'].startswith('This file')
 
+    def test_extract_shares_files(self):
+        self.helper.extract()
+        left = os.path.join(self.helper.left.dest, 'install.js')
+        right = os.path.join(self.helper.right.dest, 'install.js')
+        eq_(os.stat(left).st_ino, os.stat(right).st_ino)
+
     def test_diffable_parent(self):
         self.helper.extract()
         self.change(self.helper.left.dest, 'asd',
@@ -328,9 +353,91 @@ class TestDiffHelper(amo.tests.TestCase):
         path = os.path.join(file, filename)
         data = open(path, 'r').read()
         data += text
+        # Extracted files are links into the shared store, don't write
+        # through them.
+        os.remove(path)
         open(path, 'w').write(data)
 
 
+class TestZipFileViewer(amo.tests.TestCase):
+    # Everything but the paths, sizes and hashes, which can't match.
+    keys = ['binary', 'depth', 'directory', 'filename', 'mimetype', 'short',
+            'syntax', 'truncated', 'url', 'url_serve']
+
+    def setUp(self):
+        cache.clear()
+        self.extracted = []
+
+    def tearDown(self):
+        for viewer in self.extracted:
+            viewer.cleanup()
+
+    def viewers(self, pk, name):
+        file_obj = make_file(pk, get_file(name))
+        extracted = FileViewer(file_obj)
+        extracted.extract()
+        self.extracted.append(extracted)
+        return extracted, ZipFileViewer(file_obj)
+
+    def check(self, name):
+        extracted, zipped = self.viewers(1, name)
+        expected, files = extracted.get_files(), zipped.get_files()
+        eq_(files.keys(), expected.keys())
+        for short, file in expected.items():
+            for key in self.keys:
+                eq_(files[short][key], file[key], '%s: %s' % (short, key))
+            if not file['directory']:
+                eq_(files[short]['size'], file['size'])
+                eq_(zipped.read_raw(files[short]), extracted.read_raw(file))
+
+    def test_files(self):
+        self.check('dictionary-test.xpi')
+
+    def test_nested(self):
+        self.check('recurse.xpi')
+
+    def test_is_extracted(self):
+        extracted, zipped = self.viewers(1, 'dictionary-test.xpi')
+        assert zipped.is_extracted()
+        zipped.extract()
+        assert not os.path.exists(zipped.dest)
+
+    def test_read_nested(self):
+        extracted, zipped = self.viewers(1, 'recurse.xpi')
+        for viewer in (extracted, zipped):
+            viewer.select('recurse/chrome/test.jar/test/test.text')
+        eq_(zipped.read_file(), extracted.read_file())
+
+    def test_select_md5(self):
+        extracted, zipped = self.viewers(1, 'dictionary-test.xpi')
+        eq_(zipped.get_files()['install.js']['md5'], '')
+        for viewer in (extracted, zipped):
+            viewer.select('install.js')
+        eq_(zipped.selected['md5'], extracted.selected['md5'])
+
+    @patch.object(settings, 'FILE_VIEWER_SIZE_LIMIT', 5)
+    def test_select_md5_too_big(self):
+        extracted, zipped = self.viewers(1, 'dictionary-test.xpi')
+        zipped.select('install.js')
+        eq_(zipped.selected['md5'], '')
+
+    def test_diff(self):
+        left = make_file(1, get_file('extension.xpi'))
+        right = make_file(2, get_file('extension-0.2.xpi'))
+        extracted = DiffHelper(left, right)
+        extracted.extract()
+        self.extracted.append(extracted)
+        zipped = DiffHelper(left, right, viewer=ZipFileViewer)
+        diff = lambda files: dict((k, v['diff']) for k, v in files.items())
+        eq_(diff(zipped.get_files()), diff(extracted.get_files()))
+        eq_(zipped.get_deleted_files().keys(),
+            extracted.get_deleted_files().keys())
+
+    def test_bad_zip(self):
+        zipped = ZipFileViewer(make_file(1, get_file('search.xml')))
+        eq_(zipped.get_files(), {})
+
+
 class TestSafeUnzipFile(amo.tests.TestCase, amo.tests.AMOPaths):
 
     #TODO(andym): get full coverage for existing SafeUnzip methods, most
@@ -368,3 +475,71 @@ class TestSafeUnzipFile(amo.tests.TestCase, amo.tests.AMOPaths):
         zip.is_valid()
         zip.info[2].filename = 'META-INF/foo.sf'
         assert not zip.is_signed()
+
+
+class TestExtractionCache(amo.tests.TestCase):
+
+    def setUp(self):
+        self.store = ExtractionCache(tempfile.mkdtemp())
+        self.left = os.path.join(self.store.root, '1')
+        self.right = os.path.join(self.store.root, '2')
+
+    def tearDown(self):
+        shutil.rmtree(self.store.root)
+
+    def blobs(self):
+        return sorted(os.path.basename(p) for p, st in self.store._blobs())
+
+    def test_extract(self):
+        written = self.store.extract(get_file('dictionary-test.xpi'),
+                                     self.left)
+        manifest = self.store.manifest(self.left)
+        eq_(written, sum(f['size'] for f in manifest.values()))
+        eq_(self.blobs(), sorted(f['sha256'] for f in manifest.values()))
+        path = os.path.join(self.left, 'install.js')
+        eq_(manifest['install.js']['md5'],
+            hashlib.md5(open(path).read()).hexdigest())
+
+    def test_extract_writes_once(self):
+        self.store.extract(get_file('dictionary-test.xpi'), self.left)
+        eq_(self.store.extract(get_file('dictionary-test.xpi'), self.right),
+            0)
+
+    def test_extract_nested(self):
+        self.store.extract(get_file('recurse.xpi'), self.left)
+        manifest = self.store.manifest(self.left)
+        assert 'recurse/chrome/test.jar/test/test.text' in manifest
+        assert 'recurse/notazip.jar' in manifest
+
+    def test_extract_file(self):
+        self.store.extract(get_file('search.xml'), self.left, 'a9.xml')
+        eq_(self.store.manifest(self.left).keys(), ['a9.xml'])
+
+    def test_remove(self):
+        self.store.extract(get_file('dictionary-test.xpi'), self.left)
+        self.store.remove(self.left)
+        assert not os.path.exists(self.left)
+        eq_(self.store.manifest(self.left), {})
+
+    def test_evict_under_limit(self):
+        self.store.extract(get_file('dictionary-test.xpi'), self.left)
+        eq_(self.store.evict(settings.FILE_VIEWER_CACHE_SIZE), [])
+        assert os.path.exists(self.left)
+
+    def test_evict_oldest(self):
+        self.store.extract(get_file('dictionary-test.xpi'), self.left)
+        self.store.extract(get_file('recurse.xpi'), self.right)
+        os.utime(self.left + '.json', (0, 0))
+        keep = self.store.manifest(self.right)
+        eq_(self.store.evict(sum(f['size'] for f in keep.values())), ['1'])
+        assert os.path.exists(self.right)
+        eq_(self.blobs(), sorted(set(f['sha256'] for f in keep.values())))
+
+    def test_evict_shared(self):
+        self.store.extract(get_file('dictionary-test.xpi'), self.left)
+        self.store.extract(get_file('dictionary-test.xpi'), self.right)
+        os.utime(self.left + '.json', (0, 0))
+        # The blobs are still linked from the other tree, so removing one
+        # tree doesn't free anything and both go.
+        eq_(self.store.evict(0), ['1', '2'])
+        eq_(self.blobs(), [])
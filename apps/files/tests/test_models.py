@@ -30,7 +30,7 @@ from applications.models import Application, AppVersion
 from files.cron import cleanup_watermarked_file
 from files.models import File, FileUpload, FileValidation, Platform
 from files.utils import parse_addon, parse_xpi, check_rdf, JetpackUpgrader
-from files.utils import SafeUnzip, RDF
+from files.utils import SafeUnzip, RDF, ZipIndex, zip_index
 from users.models import UserProfile
 from versions.models import Version
 
@@ -943,6 +943,44 @@ class TestWatermark(amo.tests.TestCase, amo.tests.AMOPaths):
         encoded = urllib.quote_plus(self.user.email)
         assert encoded in self.get_updateURL(self.get_rdf(self.dest))
 
+    def test_write_watermarked_readable(self):
+        data = self.file.watermark_install_rdf(self.user)
+        self.file.write_watermarked_addon(self.dest, data)
+        eq_(stat.S_IMODE(os.stat(self.dest).st_mode), 0644)
+
+    def raw_entries(self, filename):
+        # The compressed bytes of every entry, keyed by name.
+        index = ZipIndex(filename)
+        raw = {}
+        with open(filename, 'rb') as fp:
+            for name, start, end, record in index.entries:
+                fp.seek(start)
+                raw[name] = fp.read(end - start)
+        return raw
+
+    def test_write_watermarked_copies_entries(self):
+        data = self.file.watermark_install_rdf(self.user)
+        self.file.write_watermarked_addon(self.dest, data)
+        before = self.raw_entries(self.file.file_path)
+        after = self.raw_entries(self.dest)
+        eq_(sorted(before), sorted(after))
+        for name in before:
+            if name != 'install.rdf':
+                eq_(before[name], after[name])
+
+        zip = zipfile.ZipFile(self.dest)
+        eq_(zip.testzip(), None)
+        eq_(len([i for i in zip.infolist()
+                 if i.filename == 'install.rdf']), 1)
+
+    def test_zip_index_reused(self):
+        path = self.file.file_path
+        index = zip_index(path)
+        assert zip_index(path) is index
+        # A changed file gets a fresh index.
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert zip_index(path) is not index
+
     def test_watermark(self):
         tmp = self.file.watermark(self.user)
         encoded = urllib.quote_plus(self.user.email)
@@ -10,8 +10,11 @@ import re
 import shutil
 import stat
 import StringIO
+import struct
 import tempfile
+import time
 import zipfile
+import zlib
 from datetime import datetime
 from itertools import groupby
 from xml.dom import minidom
@@ -19,10 +22,12 @@ from zipfile import BadZipfile
 
 from django import forms
 from django.conf import settings
+from django.utils.encoding import smart_unicode
 from django.utils.http import urlencode
 from django.utils.translation import trans_real as translation
 
 import chardet
+import lru_cache
 import rdflib
 import redisutils
 from tower import ugettext as _
@@ -328,6 +333,312 @@ class SafeUnzip(object):
             self.extract_info_to_dest(info, dest)
 
 
+class ZipIndex(object):
+    """
+    The central directory of a zip file, read once.
+
+    Keeps the raw central directory record and the byte span (local header,
+    data and descriptor) of every entry, so entries can be copied into a new
+    archive byte for byte without being decompressed.
+    """
+    chunk_size = 2 ** 16
+
+    def __init__(self, source):
+        self.source = source
+        archive = zipfile.ZipFile(source)
+        try:
+            infos = archive.infolist()
+            start_dir = archive.start_dir
+        finally:
+            archive.close()
+
+        if (len(infos) >= zipfile.ZIP_FILECOUNT_LIMIT or
+            start_dir >= zipfile.ZIP64_LIMIT):
+            raise zipfile.LargeZipFile('Zip64 is not supported: %s' % source)
+
+        records = []
+        with open(source, 'rb') as fp:
+            fp.seek(start_dir)
+            for info in infos:
+                header = fp.read(zipfile.sizeCentralDir)
+                cd = struct.unpack(zipfile.structCentralDir, header)
+                if cd[zipfile._CD_SIGNATURE] != zipfile.stringCentralDir:
+                    raise BadZipfile('Bad central directory: %s' % source)
+                rest = (cd[zipfile._CD_FILENAME_LENGTH] +
+                        cd[zipfile._CD_EXTRA_FIELD_LENGTH] +
+                        cd[zipfile._CD_COMMENT_LENGTH])
+                records.append(header + fp.read(rest))
+
+        # An entry runs until the next one starts, or the central directory.
+        starts = sorted(i.header_offset for i in infos) + [start_dir]
+        ends = dict(zip(starts, starts[1:]))
+        self.entries = [(i.filename, i.header_offset, ends[i.header_offset],
+                         record) for i, record in zip(infos, records)]
+
+    def write(self, dest, replace):
+        """
+        Write the archive into the file object `dest`.
+
+        `replace` is a dict of {filename: data}; those entries are dropped
+        from the original and written fresh at the end. Everything else is
+        copied as is. Returns the number of bytes written.
+        """
+        offset, directory = 0, []
+        with open(self.source, 'rb') as src:
+            for name, start, end, record in self.entries:
+                if name in replace:
+                    continue
+                src.seek(start)
+                left = end - start
+                while left:
+                    chunk = src.read(min(left, self.chunk_size))
+                    if not chunk:
+                        raise BadZipfile('Truncated entry: %s' % name)
+                    dest.write(chunk)
+                    left -= len(chunk)
+                directory.append(self._move(record, offset))
+                offset += end - start
+
+        for name, data in sorted(replace.items()):
+            header, body, record = self._deflate(name, data, offset)
+            dest.write(header)
+            dest.write(body)
+            directory.append(record)
+            offset += len(header) + len(body)
+
+        if (offset >= zipfile.ZIP64_LIMIT or
+            len(directory) >= zipfile.ZIP_FILECOUNT_LIMIT):
+            raise zipfile.LargeZipFile('Zip64 is not supported: %s' %
+                                       self.source)
+        size = sum(len(r) for r in directory)
+        dest.write(''.join(directory))
+        dest.write(struct.pack(zipfile.structEndArchive,
+                               zipfile.stringEndArchive, 0, 0,
+                               len(directory), len(directory), size, offset,
+                               0))
+        return offset + size + zipfile.sizeEndCentDir
+
+    def _move(self, record, offset):
+        """Point a central directory record at its new local header."""
+        cd = list(struct.unpack(zipfile.structCentralDir,
+                                record[:zipfile.sizeCentralDir]))
+        cd[zipfile._CD_LOCAL_HEADER_OFFSET] = offset
+        return (struct.pack(zipfile.structCentralDir, *cd) +
+                record[zipfile.sizeCentralDir:])
+
+    def _deflate(self, name, data, offset):
+        """Returns the local header, data and central record for `data`."""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0644 << 16L
+        compress = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                                    zlib.DEFLATED, -15)
+        body = compress.compress(data) + compress.flush()
+        info.CRC = zlib.crc32(data) & 0xffffffff
+        info.file_size, info.compress_size = len(data), len(body)
+        info.header_offset = offset
+
+        filename, flag_bits = info._encodeFilenameFlags()
+        dt = info.date_time
+        dosdate = (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+        dostime = dt[3] << 11 | dt[4] << 5 | (dt[5] // 2)
+        record = struct.pack(zipfile.structCentralDir,
+                             zipfile.stringCentralDir, info.create_version,
+                             info.create_system, info.extract_version,
+                             info.reserved, flag_bits, info.compress_type,
+                             dostime, dosdate, info.CRC, info.compress_size,
+                             info.file_size, len(filename), 0, 0, 0,
+                             info.internal_attr, info.external_attr, offset)
+        return info.FileHeader(), body, record + filename
+
+
+@lru_cache.lru_cache(maxsize=100)
+def _zip_index(source, mtime, size):
+    return ZipIndex(source)
+
+
+def zip_index(source):
+    """A ZipIndex for `source`, reused until the file changes."""
+    st = os.stat(source)
+    return _zip_index(source, st.st_mtime, st.st_size)
+
+
+class ExtractionCache(object):
+    """
+    Content addressed storage for the file viewer.
+
+    Every file pulled out of an add-on is stored once, named after the
+    sha256 of its contents. An extracted add-on is a tree of hard links into
+    that store plus a manifest of {path: {'md5', 'sha256', 'size'}} next to
+    it, so a file shared by two versions is only written to disk once and
+    the manifests can be compared without reading anything back.
+    """
+    expand = ('.jar', '.xpi')
+    max_depth = 10
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(settings.TMP_PATH, 'file_viewer')
+        self.blobs = os.path.join(self.root, 'blobs')
+
+    def blob_path(self, key):
+        return os.path.join(self.blobs, key[:2], key)
+
+    def manifest(self, dest):
+        """The manifest for the tree at `dest`, {} if there isn't one."""
+        try:
+            with open(dest + '.json') as fp:
+                return json.load(fp)
+        except (IOError, ValueError):
+            return {}
+
+    def add(self, data):
+        """Stores `data`, returns the key and the number of bytes written."""
+        key = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(key)
+        if os.path.exists(path):
+            return key, 0
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.rename(tmp, path)
+        return key, len(data)
+
+    def extract(self, source, dest, filename=None):
+        """
+        Extracts the zip at `source` into `dest`, expanding any jars or xpis
+        inside it. If `filename` is given, `source` is stored as that single
+        file instead. Returns the number of bytes written to the store.
+        """
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        tree = tempfile.mkdtemp(dir=self.root, prefix='.tmp')
+        manifest, written = {}, 0
+        try:
+            if filename:
+                with open(source, 'rb') as fp:
+                    written = self._store(fp.read(), tree, filename,
+                                          manifest)
+            else:
+                zip = SafeUnzip(source)
+                zip.is_valid()
+                written = self._extract(zip, tree, '', manifest, 0)
+        except:
+            shutil.rmtree(tree)
+            raise
+
+        self.remove(dest)
+        os.rename(tree, dest)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix='.tmp')
+        with os.fdopen(fd, 'w') as fp:
+            json.dump(manifest, fp)
+        os.rename(tmp, dest + '.json')
+        return written
+
+    def _extract(self, zip, tree, prefix, manifest, depth):
+        written = 0
+        for info in zip.info:
+            name = os.path.join(prefix, info.filename)
+            if name.endswith('/'):
+                if not os.path.exists(os.path.join(tree, name)):
+                    os.makedirs(os.path.join(tree, name))
+                continue
+
+            data = zip.zip.read(info)
+            if len(data) != info.file_size:
+                log.error('Extraction error, uncompressed size: %s, %s not %s'
+                          % (zip.source, len(data), info.file_size))
+                raise forms.ValidationError(_('Invalid archive.'))
+
+            # Same as extract_xpi(expand=True): a valid jar or xpi becomes a
+            # directory of its contents, anything else is left as a file.
+            if (depth < self.max_depth and
+                os.path.splitext(name)[1] in self.expand):
+                inner = SafeUnzip(StringIO.StringIO(data))
+                if inner.is_valid(fatal=False):
+                    written += self._extract(inner, tree, name, manifest,
+                                             depth + 1)
+                    continue
+            written += self._store(data, tree, name, manifest)
+        return written
+
+    def _store(self, data, tree, name, manifest):
+        key, written = self.add(data)
+        path = os.path.join(tree, name)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        os.link(self.blob_path(key), path)
+        short = smart_unicode(name, errors='replace')
+        manifest[short] = {'md5': hashlib.md5(data).hexdigest(),
+                           'sha256': key, 'size': len(data)}
+        return written
+
+    def remove(self, dest):
+        """Removes a tree and its manifest; the blobs stay for evict()."""
+        if os.path.exists(dest):
+            shutil.rmtree(dest)
+        if os.path.exists(dest + '.json'):
+            os.remove(dest + '.json')
+
+    def evict(self, limit, age=60 * 60):
+        """
+        Removes the least recently used trees until the store holds no more
+        than `limit` bytes, then any blob no tree links to. Trees without a
+        manifest and temporary files are removed once they are older than
+        `age` seconds. Returns the names of the removed trees.
+        """
+        removed, trees, now = [], [], time.time()
+        if not os.path.exists(self.root):
+            return removed
+
+        for name in os.listdir(self.root):
+            full = os.path.join(self.root, name)
+            if full == self.blobs or not os.path.isdir(full):
+                continue
+            if os.path.exists(full + '.json'):
+                trees.append((os.stat(full + '.json')[stat.ST_MTIME], name))
+            elif now - os.stat(full)[stat.ST_MTIME] > age:
+                shutil.rmtree(full)
+                removed.append(name)
+
+        total = 0
+        for path, st in self._blobs():
+            # A link count of one means only the store has it.
+            if st.st_nlink == 1 and now - st.st_mtime > age:
+                os.remove(path)
+            else:
+                total += st.st_size
+
+        for used, name in sorted(trees):
+            if total <= limit:
+                break
+            full = os.path.join(self.root, name)
+            keys = set(f['sha256'] for f in self.manifest(full).values())
+            self.remove(full)
+            removed.append(name)
+            for key in keys:
+                try:
+                    st = os.stat(self.blob_path(key))
+                    if st.st_nlink == 1:
+                        os.remove(self.blob_path(key))
+                        total -= st.st_size
+                except OSError:
+                    pass
+        return removed
+
+    def _blobs(self):
+        if not os.path.exists(self.blobs):
+            return
+        for root, dirs, files in os.walk(self.blobs):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    yield path, os.stat(path)
+                except OSError:
+                    pass
+
+
 def extract_zip(source, remove=False, fatal=True):
     """Extracts the zip file. If remove is given, removes the source file."""
     tempdir = tempfile.mkdtemp()
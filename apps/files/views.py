@@ -156,5 +156,9 @@ def serve(request, viewer, key):
         log.error(u'Couldn\'t find %s in %s (%d entries) for file %s' %
                   (key, files.keys()[:10], len(files.keys()), viewer.file.id))
         raise http.Http404()
+    if obj['full'] is None:
+        # Straight out of the archive, see ZipFileViewer.
+        return http.HttpResponse(viewer.read_raw(obj),
+                                 content_type=obj['mimetype'])
     return HttpResponseSendFile(request, obj['full'],
                                 content_type=obj['mimetype'])
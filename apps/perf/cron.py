@@ -13,6 +13,15 @@ from . import tasks
 
 @cronjobs.register
 def update_perf():
+    baseline, results = _latest_results()
+    ts = [tasks.update_perf.subtask(args=[baseline, chunk])
+          for chunk in chunked(results, 100)]
+    TaskSet(ts).apply_async()
+    Performance.invalidate_baselines()
+
+
+def _latest_results():
+    """The latest baselines by os, and a list of (addon, rows) results."""
     # The baseline is where addon_id is null. Find the latest test run so we
     # can update from all the latest perf results.
     last_update = (Performance.objects.filter(addon=None)
@@ -25,7 +34,4 @@ def update_perf():
                in groupby(sorted(qs), key=lambda x: x[0])]
 
     baseline = dict((os, avg) for _, os, avg in qs.filter(addon=None))
-
-    ts = [tasks.update_perf.subtask(args=[baseline, chunk])
-          for chunk in chunked(results, 25)]
-    TaskSet(ts).apply_async()
+    return baseline, results
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from amo.utils import chunked
+from perf import tasks
+from perf.cron import _latest_results
+from perf.models import Performance
+
+
+class Command(BaseCommand):
+    help = ('Time a full perf import, run in-process: once to write '
+            'whatever changed, then again with nothing left to write.')
+
+    def handle(self, *args, **options):
+        baseline, results = _latest_results()
+        print 'Importing perf for %s add-ons.' % len(results)
+        for name in ('first run', 'unchanged'):
+            start = time.time()
+            for chunk in chunked(results, 100):
+                tasks.update_perf(baseline, chunk)
+            print '%-10s %8.2fs' % (name, time.time() - start)
+        Performance.invalidate_baselines()
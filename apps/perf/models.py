@@ -3,6 +3,8 @@ import logging
 from django.conf import settings
 from django.db import models
 
+import redisutils
+
 import amo.models
 
 
@@ -46,6 +48,9 @@ class Performance(amo.models.ModelBase):
     """Add-on performance numbers.  A bit denormalized."""
     # Cache storage for all platform perf numbers.
     ALL_PLATFORMS = 'perf:platforms'
+    # Bumped by every perf import so processes drop their baselines.
+    BASELINES_VERSION = 'perf:baselines:version'
+    _baselines = {}
 
     TEST_CHOICES = [('ts', 'Startup Time')]
 
@@ -77,6 +82,28 @@ class Performance(amo.models.ModelBase):
                         self.osversion.os, self.osversion.version))
             return self.average
 
+    @classmethod
+    def get_baselines(cls):
+        """
+        The latest baseline average for each (appversion, osversion, test).
+
+        Kept in-process until the next perf import bumps the version.
+        """
+        version = redisutils.connections['master'].get(cls.BASELINES_VERSION)
+        if version is None or cls._baselines.get('version') != version:
+            qs = (Performance.objects.no_cache().filter(addon=None)
+                  .order_by('created')
+                  .values_list('appversion', 'osversion', 'test', 'average'))
+            # Later runs overwrite earlier ones.
+            baselines = dict(((a, o, t), avg) for a, o, t, avg in qs)
+            cls._baselines = {'version': version, 'baselines': baselines}
+        return cls._baselines['baselines']
+
+    @classmethod
+    def invalidate_baselines(cls):
+        redisutils.connections['master'].incr(cls.BASELINES_VERSION)
+        cls._baselines = {}
+
     def startup_is_too_slow(self, baseline=None):
         """Returns True if this result's startup time is slower
         than the allowed threshold.
@@ -4,6 +4,7 @@ import logging
 import redisutils
 from celeryutils import task
 
+from amo.utils import bulk_update
 from addons.models import Addon
 from .models import Performance
 
@@ -21,20 +22,31 @@ def update_perf(baseline, perf, **kw):
         deltas = dict((os, (avg - baseline[os]) / float(baseline[os]) * 100)
                        for _, os, avg in rows)
         if any(d < 0 for d in deltas.values()):
-            slowness = None
-            all_deltas[addon] = None
+            all_deltas[addon] = None, None
         else:
             slowness = int(sum(deltas.values()) / len(deltas))
             d = dict((k, int(v)) for k, v in deltas.items())
             # Include the average slowness as key 0.
             d[0] = slowness
-            all_deltas[addon] = json.dumps(d, separators=(',', ':'))
-        Addon.objects.filter(pk=addon).update(ts_slowness=slowness)
+            all_deltas[addon] = slowness, json.dumps(d, separators=(',', ':'))
+    if not all_deltas:
+        return
+    ids = all_deltas.keys()
 
-    # Add all the calculated values to redis so we can show per-platform perf.
+    # Only write the per-platform perf that changed since the last run.
     redis = redisutils.connections['master']
-    redis.hmset(Performance.ALL_PLATFORMS, all_deltas)
+    stored = dict(zip(ids, redis.hmget(Performance.ALL_PLATFORMS, ids)))
+    pipe = redis.pipeline(transaction=False)
+    for addon, (_, val) in all_deltas.items():
+        if val is None and stored[addon] is not None:
+            pipe.hdel(Performance.ALL_PLATFORMS, addon)
+        elif val is not None and stored[addon] != val:
+            pipe.hset(Performance.ALL_PLATFORMS, addon, val)
+    pipe.execute()
 
-    for key, val in all_deltas.items():
-        if val is None:
-            redis.hdel(Performance.ALL_PLATFORMS, key)
+    current = dict(Addon.objects.no_cache().filter(id__in=ids)
+                   .values_list('id', 'ts_slowness'))
+    bulk_update(Addon, dict((addon, {'ts_slowness': slowness})
+                            for addon, (slowness, _) in all_deltas.items()
+                            if addon in current
+                            and current[addon] != slowness))
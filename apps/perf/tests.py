@@ -1,12 +1,14 @@
 from django.conf import settings
 
+import redisutils
 from mock import patch
 from nose.tools import eq_
 from pyquery import PyQuery as pq
 
 import amo.tests
 from amo.urlresolvers import reverse
-from perf.cron import update_perf
+from perf import tasks
+from perf.cron import _latest_results, update_perf
 from perf.models import Performance
 from addons.models import Addon
 
@@ -94,3 +96,106 @@ class TestModels(amo.tests.TestCase):
     def test_missing_baseline(self):
         Performance.objects.filter(addon=None).delete()
         eq_(self.result.get_baseline(), self.result.average)
+
+
+class FakeRedis(object):
+    """Just enough of a hash to count the commands we send."""
+
+    def __init__(self):
+        self.data, self.commands = {}, []
+
+    def hmget(self, key, fields):
+        self.commands.append('hmget')
+        return [self.data.get(str(f)) for f in fields]
+
+    def hset(self, key, field, value):
+        self.commands.append('hset')
+        self.data[str(field)] = value
+
+    def hdel(self, key, field):
+        self.commands.append('hdel')
+        self.data.pop(str(field), None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline(object):
+
+    def __init__(self, redis):
+        self.redis, self.queued = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args: self.queued.append((name, args))
+
+    def execute(self):
+        self.redis.commands.append('execute')
+        for name, args in self.queued:
+            getattr(self.redis, name)(*args)
+
+
+class TestUpdatePerf(amo.tests.TestCase):
+    fixtures = ['base/apps', 'base/addon_3615', 'base/addon_5299_gcal',
+                'perf/index']
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = patch.object(redisutils, 'connections',
+                               {'master': self.redis})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.baseline, self.results = _latest_results()
+
+    def update(self):
+        self.redis.commands = []
+        tasks.update_perf(self.baseline, self.results)
+        return self.redis.commands
+
+    def test_first_import(self):
+        eq_(self.update(), ['hmget', 'execute', 'hset', 'hset'])
+        eq_(sorted(self.redis.data), ['3615', '5299'])
+
+    def test_nothing_changed(self):
+        self.update()
+        eq_(self.update(), ['hmget', 'execute'])
+
+    def test_one_changed(self):
+        self.update()
+        self.redis.data['3615'] = '{}'
+        eq_(self.update(), ['hmget', 'execute', 'hset'])
+
+    def test_faster_than_baseline(self):
+        self.update()
+        self.baseline = dict((os, 1000) for os in self.baseline)
+        eq_(self.update(), ['hmget', 'execute', 'hdel', 'hdel'])
+        eq_(self.redis.data, {})
+        eq_(Addon.objects.no_cache().get(id=3615).ts_slowness, None)
+
+    def test_addon_writes(self):
+        self.update()
+        # Nothing changed, so only the read of the current values.
+        with self.assertNumQueries(1):
+            self.update()
+
+
+class TestBaselines(amo.tests.TestCase):
+    fixtures = ['base/apps', 'base/addon_3615', 'perf/index']
+
+    def setUp(self):
+        self.result = Addon.objects.get(pk=3615).performance.all()[0]
+        Performance.invalidate_baselines()
+
+    def key(self):
+        r = self.result
+        return r.appversion_id, r.osversion_id, r.test
+
+    def test_baselines(self):
+        eq_(Performance.get_baselines()[self.key()], 1.2)
+
+    def test_cached_until_invalidated(self):
+        Performance.get_baselines()
+        Performance.objects.filter(addon=None).update(average=2.0)
+        with self.assertNumQueries(0):
+            eq_(Performance.get_baselines()[self.key()], 1.2)
+        update_perf()
+        eq_(Performance.get_baselines()[self.key()], 2.0)
@@ -0,0 +1,20 @@
+import commonware.log
+from celery.task.sets import TaskSet
+
+import cronjobs
+from amo.utils import chunked
+from .models import Review
+from . import tasks
+
+log = commonware.log.getLogger('z.cron')
+
+
+@cronjobs.register
+def update_review_aggregates():
+    """Recompute the review totals and ratings of every reviewed add-on."""
+    ids = sorted(set(Review.objects.values_list('addon', flat=True)
+                     .order_by()))
+    log.info('Updating review aggregates for %s add-ons.' % len(ids))
+    ts = [tasks.bulk_review_aggregates.subtask(args=chunk)
+          for chunk in chunked(ids, 1000)]
+    TaskSet(ts).apply_async()
@@ -8,7 +8,7 @@ from quieter_formset.formset import BaseModelFormSet
 
 import amo
 import reviews
-from .models import ReviewFlag, Review
+from .models import ReviewFlag, Review, batch_aggregates
 
 
 class ReviewReplyForm(forms.Form):
@@ -39,6 +39,10 @@ class BaseReviewFlagFormSet(BaseModelFormSet):
         super(BaseReviewFlagFormSet, self).__init__(*args, **kwargs)
 
     def save(self):
+        with batch_aggregates():
+            self._save()
+
+    def _save(self):
         for form in self.forms:
             if form.cleaned_data:
                 action = int(form.cleaned_data['action'])
@@ -0,0 +1,47 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from amo.utils import chunked
+from reviews import tasks
+from reviews.models import Review
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--addons', action='store', type='int', default=50000,
+                    help='How many reviewed add-ons to recompute.'),
+    )
+    help = ('Compare recomputing review aggregates one add-on at a time '
+            'against the grouped bulk path. Database writes are rolled back; '
+            'the grouped ratings in redis are rewritten with the same '
+            'values.')
+
+    def handle(self, *args, **options):
+        ids = sorted(set(Review.objects.values_list('addon', flat=True)
+                         .order_by()))[:options['addons']]
+        print 'Recomputing %s add-ons.' % len(ids)
+
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            for name, func in (('per add-on', self.each),
+                               ('bulk', self.bulk)):
+                start = time.time()
+                func(ids)
+                print '%-12s %8.2fs' % (name, time.time() - start)
+        finally:
+            transaction.rollback()
+            transaction.leave_transaction_management()
+
+    def each(self, ids):
+        for id in ids:
+            tasks._addon_review_aggregates([id])
+            tasks.addon_bayesian_rating(id)
+            tasks.addon_grouped_rating(id)
+
+    def bulk(self, ids):
+        for chunk in chunked(ids, 1000):
+            tasks.bulk_review_aggregates(*chunk)
@@ -1,4 +1,6 @@
+import contextlib
 import json
+import threading
 from datetime import datetime, timedelta
 
 from django.db import models
@@ -14,6 +16,29 @@ from amo.urlresolvers import reverse
 from translations.fields import TranslatedField
 from users.models import UserProfile
 
+_locals = threading.local()
+
+
+@contextlib.contextmanager
+def batch_aggregates():
+    """
+    Within this context, deleting reviews queues one bulk_review_aggregates
+    for all the add-ons touched instead of a task per review.
+    """
+    if getattr(_locals, 'addons', None) is not None:
+        # Already batching further up.
+        yield
+        return
+    _locals.addons = set()
+    try:
+        yield
+        addons = _locals.addons
+    finally:
+        _locals.addons = None
+    if addons:
+        from . import tasks
+        tasks.bulk_review_aggregates.delay(*addons, using='default')
+
 
 class ReviewManager(amo.models.ManagerBase):
 
@@ -92,7 +117,12 @@ class Review(amo.models.ModelBase):
         # Do this immediately so is_latest is correct. Use default to avoid
         # slave lag.
         tasks.update_denorm(pair, using='default')
-        tasks.addon_review_aggregates.delay(instance.addon_id, using='default')
+        batched = getattr(_locals, 'addons', None)
+        if batched is not None:
+            batched.add(instance.addon_id)
+        else:
+            tasks.bulk_review_aggregates.delay(instance.addon_id,
+                                               using='default')
 
     @staticmethod
     def transformer(reviews):
@@ -164,8 +194,20 @@ class GroupedRating(object):
         q = (Review.objects.latest().filter(addon=addon).using(using)
              .values_list('rating').annotate(models.Count('rating')))
         counts = dict(q)
+        cls.redis().set(cls.key(addon), cls.dumps(counts))
+
+    @classmethod
+    def set_many(cls, counts):
+        """Store {addon: {rating: count}} `counts` in one round trip."""
+        pipe = cls.redis().pipeline(transaction=False)
+        for addon, c in counts.items():
+            pipe.set(cls.key(addon), cls.dumps(c))
+        pipe.execute()
+
+    @staticmethod
+    def dumps(counts):
         ratings = [(rating, counts.get(rating, 0)) for rating in range(1, 6)]
-        cls.redis().set(cls.key(addon), json.dumps(ratings))
+        return json.dumps(ratings)
 
 
 class Spam(object):
@@ -1,3 +1,4 @@
+import collections
 import logging
 
 from django.db.models import Count, Avg, F
@@ -5,6 +6,7 @@ from django.db.models import Count, Avg, F
 import caching.base as caching
 from celeryutils import task
 
+from amo.utils import bulk_update
 from addons.models import Addon
 from .models import Review, GroupedRating
 
@@ -20,19 +22,28 @@ def update_denorm(*pairs, **kw):
     log.info('[%s@%s] Updating review denorms.' %
              (len(pairs), update_denorm.rate_limit))
     using = kw.get('using')
-    for addon, user in pairs:
-        reviews = list(Review.objects.valid().no_cache().using(using)
-                       .filter(addon=addon, user=user).order_by('created'))
-        if not reviews:
-            continue
-
-        for idx, review in enumerate(reviews):
-            review.previous_count = idx
-            review.is_latest = False
-        reviews[-1].is_latest = True
-
-        for review in reviews:
-            review.save()
+    pairs = set(pairs)
+    addons, users = zip(*pairs) if pairs else ((), ())
+    reviews = collections.defaultdict(list)
+    qs = (Review.objects.valid().no_cache().using(using)
+          .filter(addon__in=set(addons), user__in=set(users))
+          .order_by('created'))
+    for review in qs:
+        reviews[review.addon_id, review.user_id].append(review)
+
+    changed, values = [], {}
+    for pair in pairs:
+        last = len(reviews[pair]) - 1
+        for idx, review in enumerate(reviews[pair]):
+            latest = idx == last
+            if (review.previous_count, review.is_latest) != (idx, latest):
+                changed.append(review)
+                values[review.id] = {'previous_count': idx,
+                                     'is_latest': latest}
+    # One statement for every review that moved, instead of a save() each.
+    bulk_update(Review, values)
+    if changed:
+        Review.objects.invalidate(*changed)
 
 
 @task
@@ -40,6 +51,14 @@ def addon_review_aggregates(*addons, **kw):
     log.info('[%s@%s] Updating total reviews.' %
              (len(addons), addon_review_aggregates.rate_limit))
     using = kw.get('using')
+    _addon_review_aggregates(addons, using)
+
+    # Delay bayesian calculations to avoid slave lag.
+    addon_bayesian_rating.apply_async(args=addons, countdown=5)
+    addon_grouped_rating.apply_async(args=addons, kwargs={'using': using})
+
+
+def _addon_review_aggregates(addons, using=None):
     stats = dict(Review.objects.latest().filter(addon__in=addons)
                  .using(using).values_list('addon').annotate(Count('addon')))
     for addon in addons:
@@ -54,18 +73,12 @@ def addon_review_aggregates(*addons, **kw):
         avg = stats.get(addon, 0)
         Addon.objects.filter(id=addon).update(average_rating=avg)
 
-    # Delay bayesian calculations to avoid slave lag.
-    addon_bayesian_rating.apply_async(args=addons, countdown=5)
-    addon_grouped_rating.apply_async(args=addons, kwargs={'using': using})
-
 
 @task
 def addon_bayesian_rating(*addons, **kw):
     log.info('[%s@%s] Updating bayesian ratings.' %
              (len(addons), addon_bayesian_rating.rate_limit))
-    f = lambda: Addon.objects.aggregate(rating=Avg('average_rating'),
-                                        reviews=Avg('total_reviews'))
-    avg = caching.cached(f, 'task.bayes.avg', 60 * 60 * 60)
+    avg = _rating_averages()
     mc = avg['reviews'] * avg['rating']
     for addon in Addon.uncached.filter(id__in=addons):
         q = Addon.objects.filter(id=addon.id)
@@ -77,6 +90,13 @@ def addon_bayesian_rating(*addons, **kw):
             q.update(bayesian_rating=0)
 
 
+def _rating_averages():
+    """The average rating and review count across all add-ons."""
+    f = lambda: Addon.objects.aggregate(rating=Avg('average_rating'),
+                                        reviews=Avg('total_reviews'))
+    return caching.cached(f, 'task.bayes.avg', 60 * 60 * 60)
+
+
 @task
 def addon_grouped_rating(*addons, **kw):
     """Roll up add-on ratings for the bar chart."""
@@ -86,3 +106,57 @@ def addon_grouped_rating(*addons, **kw):
     using = kw.get('using')
     for addon in addons:
         GroupedRating.set(addon, using=using)
+
+
+@task
+def bulk_review_aggregates(*addons, **kw):
+    """
+    Does what addon_review_aggregates, addon_bayesian_rating and
+    addon_grouped_rating do, for a chunk of add-ons at a time: one grouped
+    query for the reviews, one UPDATE for the add-ons and one MSET for the
+    grouped ratings.
+    """
+    log.info('[%s@%s] Updating review aggregates.' %
+             (len(addons), bulk_review_aggregates.rate_limit))
+    stats = review_aggregates(addons, using=kw.get('using'))
+    bulk_update(Addon, dict((addon, dict(total_reviews=s['total'],
+                                         average_rating=s['average'],
+                                         bayesian_rating=s['bayesian']))
+                            for addon, s in stats.items()))
+    GroupedRating.set_many(dict((addon, s['grouped'])
+                                for addon, s in stats.items()))
+
+
+def review_aggregates(addons, using=None):
+    """
+    Returns {addon: {total, average, bayesian, grouped}} for `addons`, worked
+    out from a single query grouped by add-on, rating and is_latest.
+    """
+    stats = dict((addon, {'total': 0, 'sum': 0, 'rated': 0, 'grouped': {}})
+                 for addon in addons)
+    rows = (Review.objects.valid().no_cache().using(using)
+            .filter(addon__in=addons)
+            .values_list('addon', 'rating', 'is_latest').annotate(Count('id'))
+            .order_by())
+    for addon, rating, is_latest, count in rows:
+        s = stats[addon]
+        if is_latest:
+            s['total'] += count
+            if rating is not None:
+                s['grouped'][rating] = s['grouped'].get(rating, 0) + count
+        if rating is not None:
+            s['sum'] += rating * count
+            s['rated'] += count
+
+    avg = _rating_averages()
+    reviews, rating = avg['reviews'] or 0, avg['rating'] or 0
+    for s in stats.values():
+        total, rated = s.pop('sum'), s.pop('rated')
+        # MySQL's AVG() gives 4 decimal places.
+        s['average'] = round(float(total) / rated, 4) if rated else 0
+        if s['total']:
+            s['bayesian'] = ((reviews * rating + s['total'] * s['average']) /
+                             (reviews + s['total']))
+        else:
+            s['bayesian'] = 0
+    return stats
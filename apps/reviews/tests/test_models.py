@@ -1,11 +1,14 @@
 from django.utils import translation
 
+import mock
 from nose.tools import eq_
 import test_utils
 
 import amo.tests
+from addons.models import Addon
 from reviews import tasks
-from reviews.models import Review, GroupedRating
+from reviews.models import Review, GroupedRating, batch_aggregates
+from users.models import UserProfile
 
 
 class TestReviewModel(amo.tests.TestCase):
@@ -48,3 +51,76 @@ class TestGroupedRating(amo.tests.TestCase):
         eq_(GroupedRating.get(1865), None)
         tasks.addon_grouped_rating(1865)
         eq_(GroupedRating.get(1865), [[1, 0], [2, 0], [3, 0], [4, 1], [5, 0]])
+
+
+class TestBulkAggregates(amo.tests.TestCase):
+    fixtures = ['base/apps', 'reviews/dev-reply.json']
+
+    def setUp(self):
+        self.addon = Addon.objects.get(id=1865)
+        self.users = [UserProfile.objects.get(id=id) for id in (5293223, 346)]
+        # A second review from the first user, plus one from the developer.
+        for user, rating in ((self.users[0], 2), (self.users[1], 5)):
+            Review.objects.create(addon=self.addon, user=user, rating=rating)
+
+    def aggregates(self):
+        addon = Addon.objects.no_cache().get(id=1865)
+        return (addon.total_reviews, addon.average_rating,
+                addon.bayesian_rating, GroupedRating.get(1865))
+
+    def reset(self):
+        Addon.objects.filter(id=1865).update(
+            total_reviews=0, average_rating=0, bayesian_rating=0)
+        GroupedRating.redis().delete(GroupedRating.key(1865))
+
+    def test_matches_per_addon(self):
+        tasks.addon_review_aggregates(1865)
+        total, average, bayesian, grouped = self.aggregates()
+        eq_((total, average), (2, 3.6667))
+        self.reset()
+
+        tasks.bulk_review_aggregates(1865)
+        eq_(self.aggregates()[0], total)
+        eq_(self.aggregates()[1], average)
+        assert abs(self.aggregates()[2] - bayesian) < 1e-9
+        eq_(self.aggregates()[3], grouped)
+
+    def test_no_reviews(self):
+        Review.objects.filter(addon=1865).delete()
+        self.reset()
+        stats = tasks.review_aggregates([1865, 3615])
+        eq_(stats[3615], {'total': 0, 'average': 0, 'bayesian': 0,
+                          'grouped': {}})
+        tasks.bulk_review_aggregates(1865)
+        eq_(self.aggregates(),
+            (0, 0, 0, [[1, 0], [2, 0], [3, 0], [4, 0], [5, 0]]))
+
+    @mock.patch('reviews.tasks.bulk_review_aggregates')
+    def test_delete_queues_bulk(self, bulk):
+        Review.objects.filter(addon=1865, user=self.users[1]).delete()
+        bulk.delay.assert_called_with(1865, using='default')
+
+    @mock.patch('reviews.tasks.bulk_review_aggregates')
+    def test_batch_aggregates(self, bulk):
+        with batch_aggregates():
+            for review in Review.objects.filter(addon=1865):
+                review.delete()
+            assert not bulk.delay.called
+        bulk.delay.assert_called_with(1865, using='default')
+        eq_(bulk.delay.call_count, 1)
+
+    def test_one_statement_each(self):
+        tasks._rating_averages()
+        # One query for the reviews and one UPDATE.
+        with self.assertNumQueries(2):
+            tasks.bulk_review_aggregates(1865)
+
+    def test_update_denorm(self):
+        Review.objects.update(is_latest=True, previous_count=0)
+        pairs = [(1865, user.id) for user in self.users]
+        with self.assertNumQueries(2):
+            tasks.update_denorm(*pairs)
+        reviews = Review.objects.no_cache().valid().filter(addon=1865)
+        eq_(sorted((r.user_id, r.previous_count, bool(r.is_latest))
+                   for r in reviews),
+            [(346, 0, True), (5293223, 0, False), (5293223, 1, True)])
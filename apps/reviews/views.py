@@ -17,7 +17,8 @@ from access import acl
 from addons.decorators import addon_view_factory, has_purchased
 from addons.models import Addon
 
-from .models import Review, ReviewFlag, GroupedRating, Spam
+from .models import (Review, ReviewFlag, GroupedRating, Spam,
+                     batch_aggregates)
 from . import forms
 
 log = commonware.log.getLogger('z.reviews')
@@ -236,7 +237,8 @@ def spam(request):
             log.info('SPAMMER: %s deleted %s' %
                      (request.amo_user.username, user.username))
             if not user.is_developer:
-                Review.objects.filter(user=user).delete()
+                with batch_aggregates():
+                    Review.objects.filter(user=user).delete()
                 user.anonymize()
             messages.success(request, 'Deleted that dirty spammer.')
 
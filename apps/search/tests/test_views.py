@@ -135,6 +135,11 @@ class TestESSearch(amo.tests.ESTestCase):
             addon.save()
         self.refresh()
 
+    def test_query_budget(self):
+        with self.assertQueryBudget(views.search._query_budget):
+            r = self.client.get(self.url)
+        eq_(r.status_code, 200)
+
     def test_get(self):
         r = self.client.get(self.url)
         eq_(r.status_code, 200)
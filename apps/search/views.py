@@ -15,7 +15,7 @@ import amo
 import bandwagon.views
 import browse.views
 from addons.models import Addon, Category
-from amo.decorators import json_view
+from amo.decorators import json_view, query_budget
 from amo.helpers import loc, locale_url, urlparams
 from amo.utils import MenuItem, sorted_groupby
 from versions.compare import dict_from_int, version_int, version_dict
@@ -550,6 +550,7 @@ def app_search(request, tag_name=None, template=None):
     return jingo.render(request, template, ctx)
 
 
+@query_budget(40)
 @mobile_template('search/{mobile/}results.html')
 @vary_on_headers('X-PJAX')
 def search(request, tag_name=None, template=None):
@@ -51,15 +51,16 @@ def update_global_totals(date=None):
         return
 
     today = date or datetime.date.today()
-    today_jobs = [dict(job=job, date=today) for job in
-                  tasks._get_daily_jobs(date)]
-
     max_update = date or UpdateCount.objects.aggregate(max=Max('date'))['max']
-    metrics_jobs = [dict(job=job, date=max_update) for job in
-                    tasks._get_metrics_jobs(date)]
 
-    ts = [tasks.update_global_totals.subtask(kwargs=kw)
-          for kw in today_jobs + metrics_jobs]
+    ts = [tasks.update_global_rollup.subtask(args=[today, today],
+                                             kwargs=dict(groups=['daily']))]
+    if max_update:
+        ts.append(tasks.update_global_rollup.subtask(
+            args=[max_update, max_update], kwargs=dict(groups=['metrics'])))
+    ts.extend(tasks.update_global_totals.subtask(kwargs=dict(job=job,
+                                                             date=today))
+              for job in tasks._get_snapshot_jobs(today))
     TaskSet(ts).apply_async()
 
 
@@ -0,0 +1,71 @@
+import datetime
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from stats import tasks
+
+HELP = """\
+Recompute the global statistics for a range of dates, in a handful of
+grouped queries.
+
+    `--date=2011-08-15:2011-08-22`
+
+With `--days=90` the range ends yesterday. `--benchmark` also runs the
+one-query-per-job path over the same range and prints both timings.
+Query counts are only collected with DEBUG = True.
+"""
+
+
+def parse(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--date',
+                    help='The date range to process, as '
+                         'YYYY-MM-DD:YYYY-MM-DD (inclusive).'),
+        make_option('--days', action='store', type='int', default=90,
+                    help='How many days to process if there is no --date.'),
+        make_option('--benchmark', action='store_true',
+                    help='Time the per-job updates as well.'),
+    )
+    help = HELP
+
+    def handle(self, *args, **kw):
+        if kw['date']:
+            try:
+                start, end = map(parse, kw['date'].split(':'))
+            except ValueError:
+                raise CommandError('Use --date=YYYY-MM-DD:YYYY-MM-DD.')
+        else:
+            end = datetime.date.today() - datetime.timedelta(days=1)
+            start = end - datetime.timedelta(days=kw['days'] - 1)
+
+        runs = [('grouped', self.rollup)]
+        if kw['benchmark']:
+            runs.insert(0, ('per job', self.per_job))
+        for name, func in runs:
+            queries = len(connection.queries)
+            t = time.time()
+            func(start, end)
+            print '%-8s %s to %s: %.2fs, %s queries' % (
+                name, start, end, time.time() - t,
+                len(connection.queries) - queries)
+
+    def rollup(self, start, end):
+        tasks.update_global_rollup(start, end)
+
+    def per_job(self, start, end):
+        for date in tasks._date_range(start, end):
+            for job in tasks._get_daily_jobs(date):
+                tasks.update_global_totals(job, date)
+            for job in tasks._get_metrics_jobs(date):
+                try:
+                    tasks.update_global_totals(job, date)
+                except Exception:
+                    # The collector job fails on days without a row.
+                    pass
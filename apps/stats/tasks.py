@@ -1,13 +1,15 @@
+import collections
 import datetime
 
 from django.db import connection, transaction
-from django.db.models import Sum, Max
+from django.db.models import Count, Sum, Max
 
 import commonware.log
 import elasticutils
 from celery.decorators import task
 
 import amo
+from amo.utils import chunked
 from addons.models import Addon
 from bandwagon.models import Collection, CollectionAddon
 from stats.models import Contribution
@@ -69,21 +71,43 @@ def update_global_totals(job, date, **kw):
 
     num = jobs[job]()
 
-    q = """REPLACE INTO
-                global_stats(`name`, `count`, `date`)
-            VALUES
-                (%s, %s, %s)"""
-    p = [job, num or 0, date]
+    _save_global_stats([(job, num or 0, date)])
 
-    try:
-        cursor = connection.cursor()
-        cursor.execute(q, p)
-        transaction.commit_unless_managed()
-    except Exception, e:
-        log.critical("Failed to update global stats: (%s): %s" % (p, e))
 
-    log.debug("Committed global stats details: (%s) has (%s) for (%s)"
-              % tuple(p))
+@task
+def update_global_rollup(start, end, groups=('daily', 'metrics'), **kw):
+    """Update every global statistic in `groups` from `start` to `end`."""
+    log.info("Updating global statistics totals (%s) from %s to %s" %
+             (', '.join(groups), start, end))
+    rollups = {'daily': _get_daily_rollup, 'metrics': _get_metrics_rollup}
+    rows = []
+    for group in groups:
+        for date, stats in sorted(rollups[group](start, end).items()):
+            rows.extend((job, num, date) for job, num in sorted(stats.items()))
+    _save_global_stats(rows)
+
+
+def _save_global_stats(rows):
+    """Write (name, count, date) `rows`, a few hundred per statement."""
+    for chunk in chunked(rows, 500):
+        q = """REPLACE INTO
+                    global_stats(`name`, `count`, `date`)
+                VALUES
+                    %s""" % ', '.join(['(%s, %s, %s)'] * len(chunk))
+        p = [value for row in chunk for value in row]
+
+        try:
+            cursor = connection.cursor()
+            cursor.execute(q, p)
+            transaction.commit_unless_managed()
+        except Exception, e:
+            log.critical("Failed to update global stats: (%s): %s" %
+                         (chunk, e))
+            continue
+
+        for row in chunk:
+            log.debug("Committed global stats details: (%s) has (%s) for "
+                      "(%s)" % row)
 
 
 def _get_daily_jobs(date=None):
@@ -137,11 +161,21 @@ def _get_daily_jobs(date=None):
                 sum=Sum('count'))['sum']),
     }
 
-    # If we're processing today's stats, we'll do some extras.  We don't do
-    # these for re-processed stats because they change over time (eg. add-ons
-    # move from sandbox -> public
-    if date == datetime.date.today():
-        stats.update({
+    stats.update(_get_snapshot_jobs(date))
+
+    return stats
+
+
+def _get_snapshot_jobs(date):
+    """Return a dictionary of the statistics queries only run for today.
+
+    We don't do these for re-processed stats because they change over time
+    (eg. add-ons move from sandbox -> public).
+    """
+    if date != datetime.date.today():
+        return {}
+
+    return {
         'addon_count_experimental': Addon.objects.filter(
                 created__lte=date, status=amo.STATUS_UNREVIEWED,
                 disabled_by_user=0).count,
@@ -162,9 +196,7 @@ def _get_daily_jobs(date=None):
                 created__lte=date, type=amo.COLLECTION_FEATURED).count,
         'collection_count_normal': Collection.objects.filter(
                 created__lte=date, type=amo.COLLECTION_NORMAL).count,
-            })
-
-    return stats
+    }
 
 
 def _get_metrics_jobs(date=None):
@@ -188,6 +220,113 @@ def _get_metrics_jobs(date=None):
     return stats
 
 
+def _date_range(start, end):
+    return [start + datetime.timedelta(days=i)
+            for i in range((end - start).days + 1)]
+
+
+def _created_counts(qs, start, end):
+    """
+    Count the rows of `qs` for every day from `start` to `end`.
+
+    Returns two {date: count} dicts: rows created that day, like
+    `DATE(created)=date`, and all rows with `created__lte=date`. MySQL compares
+    the latter against midnight, so a row counts towards the day after it was
+    created unless it landed on midnight exactly.
+    """
+    created = '%s.created' % qs.model._meta.db_table
+    one_day = datetime.timedelta(days=1)
+    qs = qs.no_cache()
+    rows = (qs.filter(created__gte=start, created__lt=end + one_day)
+            .extra(select={'day': 'DATE(%s)' % created,
+                           'cutoff': 'DATE(%s - INTERVAL 1 SECOND)' % created})
+            .values_list('day', 'cutoff').annotate(Count('id')).order_by())
+    new, added = collections.defaultdict(int), collections.defaultdict(int)
+    for day, cutoff, count in rows:
+        new[day] += count
+        added[cutoff + one_day] += count
+
+    total, totals = qs.filter(created__lte=start).count(), {}
+    for day in _date_range(start, end):
+        if day > start:
+            total += added[day]
+        totals[day] = total
+    return new, totals
+
+
+def _daily_sums(qs, start, end, cumulative=False):
+    """Sum `count` by date, or running totals of it if `cumulative`."""
+    sums = dict(qs.filter(date__range=(start, end)).values_list('date')
+                .annotate(Sum('count')).order_by())
+    if not cumulative:
+        return sums
+    total = qs.filter(date__lt=start).aggregate(sum=Sum('count'))['sum'] or 0
+    totals = {}
+    for day in _date_range(start, end):
+        total += sums.get(day) or 0
+        totals[day] = total
+    return totals
+
+
+def _get_daily_rollup(start, end):
+    """
+    Return {date: {job: count}} for the jobs in `_get_daily_jobs`, apart from
+    the snapshots of today, for each day from `start` to `end`.
+
+    Each table is read with one or two GROUP BY date queries, instead of a
+    query per job per day.
+    """
+    days = _date_range(start, end)
+    stats = dict((day, {}) for day in days)
+
+    def add(job, counts):
+        for day in days:
+            stats[day][job] = counts.get(day) or 0
+
+    add('addon_total_downloads',
+        _daily_sums(DownloadCount.objects, start, end, cumulative=True))
+    add('addon_downloads_new', _daily_sums(DownloadCount.objects, start, end))
+    add('collection_addon_downloads',
+        _daily_sums(AddonCollectionCount.objects, start, end,
+                    cumulative=True))
+
+    add('addon_count_new', _created_counts(Addon.objects, start, end)[0])
+    add('version_count_new', _created_counts(Version.objects, start, end)[0])
+
+    new, total = _created_counts(UserProfile.objects, start, end)
+    add('user_count_new', new)
+    add('user_count_total', total)
+
+    new, total = _created_counts(Review.objects.filter(editorreview=0),
+                                 start, end)
+    add('review_count_new', new)
+    add('review_count_total', total)
+
+    new, total = _created_counts(Collection.objects, start, end)
+    add('collection_count_new', new)
+    add('collection_count_total', total)
+    add('collection_count_autopublishers', _created_counts(
+        Collection.objects.filter(type=amo.COLLECTION_SYNCHRONIZED),
+        start, end)[1])
+
+    return stats
+
+
+def _get_metrics_rollup(start, end):
+    """Return {date: {job: count}} for the jobs in `_get_metrics_jobs`."""
+    pings = _daily_sums(UpdateCount.objects, start, end)
+    collector = dict(UpdateCount.objects.filter(addon=11950,
+                                                date__range=(start, end))
+                     .values_list('date', 'count'))
+    stats = {}
+    for day in _date_range(start, end):
+        stats[day] = {'addon_total_updatepings': pings.get(day) or 0}
+        # The single job fails when there's no row, so there's nothing saved.
+        if day in collector:
+            stats[day]['collector_updatepings'] = collector[day]
+    return stats
+
+
 @task
 def index_update_counts(ids):
     es = elasticutils.get_es()
@@ -1,14 +1,18 @@
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 from django.core.management import call_command
 
 import mock
 from nose.tools import eq_
 
+import amo
 import amo.tests
 from addons.models import Addon
+from bandwagon.models import Collection
+from reviews.models import Review
 from stats.models import DownloadCount, UpdateCount, GlobalStat, Contribution
 from stats import tasks, cron
+from users.models import UserProfile
 
 
 class TestGlobalStats(amo.tests.TestCase):
@@ -25,6 +29,63 @@ class TestGlobalStats(amo.tests.TestCase):
         eq_(len(GlobalStat.objects.no_cache().filter(date=date,
                                                  name=job)), 1)
 
+    def per_job(self, day):
+        jobs = tasks._get_daily_jobs(day)
+        jobs.update(tasks._get_metrics_jobs(day))
+        rv = {}
+        for job in jobs:
+            try:
+                rv[job] = jobs[job]() or 0
+            except UpdateCount.DoesNotExist:
+                pass
+        return rv
+
+    def test_rollup_matches_jobs(self):
+        addon = Addon.objects.all()[0]
+        UpdateCount.objects.create(addon_id=11950, date=date(2009, 6, 2),
+                                   count=7)
+        created = [datetime(2009, 6, 1, 12), datetime(2009, 6, 2),
+                   datetime(2009, 6, 3, 0, 0, 1), datetime(2009, 5, 20)]
+        for i, when in enumerate(created):
+            user = UserProfile.objects.create(username='u%s' % i,
+                                              email='u%s@a.com' % i)
+            review = Review.objects.create(addon=addon, user=user)
+            c = Collection.objects.create(
+                type=amo.COLLECTION_SYNCHRONIZED if i % 2 else
+                     amo.COLLECTION_NORMAL)
+            for model, pk in ((UserProfile, user.pk), (Review, review.pk),
+                              (Collection, c.pk)):
+                model.objects.filter(pk=pk).update(created=when)
+
+        start, end = date(2009, 5, 31), date(2009, 6, 8)
+        rollup = tasks._get_daily_rollup(start, end)
+        metrics = tasks._get_metrics_rollup(start, end)
+        for day in tasks._date_range(start, end):
+            rollup[day].update(metrics[day])
+            eq_(rollup[day], self.per_job(day))
+        eq_(rollup[date(2009, 6, 2)]['collector_updatepings'], 7)
+        assert 'collector_updatepings' not in rollup[date(2009, 6, 1)]
+
+    def test_update_global_rollup(self):
+        start, end = date(2009, 6, 1), date(2009, 6, 7)
+        tasks.update_global_rollup(start, end)
+        stats = GlobalStat.objects.no_cache().filter(
+            name='addon_total_downloads', date__range=(start, end))
+        eq_(dict(stats.values_list('date', 'count')),
+            {date(2009, 6, 1): 10, date(2009, 6, 2): 10, date(2009, 6, 3): 10,
+             date(2009, 6, 4): 10, date(2009, 6, 5): 10, date(2009, 6, 6): 10,
+             date(2009, 6, 7): 20})
+        eq_(GlobalStat.objects.no_cache().get(
+            name='addon_total_updatepings', date=start).count, 1000)
+
+    @mock.patch('stats.cron.TaskSet')
+    def test_cron_groups(self, taskset):
+        cron.update_global_totals(date(2009, 6, 1))
+        tasks_ = taskset.call_args[0][0]
+        eq_([t.args for t in tasks_],
+            [[date(2009, 6, 1), date(2009, 6, 1)]] * 2)
+        eq_([t.kwargs['groups'] for t in tasks_], [['daily'], ['metrics']])
+
 
 class TestTotalContributions(amo.tests.TestCase):
     fixtures = ['base/addon_3615']
@@ -1,14 +1,25 @@
+from optparse import make_option
+
 from django.core.management.base import BaseCommand
 
 from tags.models import Tag
-from tags.tasks import clean_tag
+from tags.tasks import clean_tag, dedupe_tags
 
 
 class Command(BaseCommand):
     # https://bugzilla.mozilla.org/show_bug.cgi?id=612811
     help = 'Migration to clean up old tags per 612811'
+    option_list = BaseCommand.option_list + (
+        make_option('--per-tag', action='store_true', default=False,
+                    help='Queue a clean_tag task for each tag instead of '
+                         'merging them all here.'),
+    )
 
     def handle(self, *args, **kw):
+        if not kw['per_tag']:
+            dedupe_tags()
+            return
+
         pks = list(Tag.objects.values_list('pk', flat=True).order_by('pk'))
 
         print "Found: %s tags to clean and adding to celery." % len(pks)
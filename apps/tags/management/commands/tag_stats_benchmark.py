@@ -0,0 +1,94 @@
+import random
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from addons.models import Addon
+from amo.utils import chunked
+from tags.models import AddonTag, Tag, update_tag_stat_signal
+from tags.tasks import clean_tag, dedupe_tags
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--tags', action='store', type='int', default=100000,
+                    help='How many tags to make.'),
+    )
+    help = ('Compare the per-tag and set-based tag stats and cleanup on fake '
+            'tags.  Everything is rolled back at the end.')
+
+    def handle(self, *args, **options):
+        n = options['tags']
+        addons = list(Addon.objects.values_list('id', flat=True)[:100])
+        if not addons:
+            print 'We need some add-ons to tag.'
+            return
+
+        # clean_tag queues a stats task for every tag it moves.
+        signals = [(models.signals.post_save, 'update_tag_stat'),
+                   (models.signals.post_delete, 'delete_tag_stat')]
+        for signal, uid in signals:
+            signal.disconnect(sender=AddonTag, dispatch_uid=uid)
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            self.make_tags(n, addons)
+            pks = list(Tag.objects.filter(tag_text__icontains='zzbench')
+                       .values_list('id', flat=True))
+            print '%s tags, %s add-on tags.' % (
+                len(pks), AddonTag.objects.filter(tag__in=pks).count())
+
+            def per_tag_stats():
+                for tag in Tag.objects.no_cache().filter(pk__in=pks):
+                    tag.update_stat()
+
+            def set_stats():
+                for chunk in chunked(pks, 1000):
+                    Tag.update_stats(chunk)
+
+            def per_tag_clean():
+                for pk in pks:
+                    clean_tag(pk)
+
+            self.timeit('stats', per_tag_stats)
+            self.timeit('set stats', set_stats)
+            sid = transaction.savepoint()
+            self.timeit('clean', per_tag_clean)
+            transaction.savepoint_rollback(sid)
+            self.timeit('dedupe', dedupe_tags)
+        finally:
+            transaction.rollback()
+            transaction.leave_transaction_management()
+            for signal, uid in signals:
+                signal.connect(update_tag_stat_signal, sender=AddonTag,
+                               dispatch_uid=uid)
+
+    def timeit(self, name, f):
+        start = time.time()
+        f()
+        print '%-10s %8.2fs' % (name, time.time() - start)
+
+    def make_tags(self, n, addons):
+        cursor = connection.cursor()
+        texts = []
+        for i in xrange(n):
+            texts.append('zzbench-%s' % i)
+            if not i % 10:
+                texts.extend([' ZZBench-%s' % i, 'ZZBENCH-%s!' % i])
+        for chunk in chunked(texts, 1000):
+            cursor.executemany(
+                'INSERT INTO tags (tag_text, blacklisted, restricted, '
+                'created, modified) VALUES (%s, 0, 0, NOW(), NOW())',
+                [(text,) for text in chunk])
+
+        tags = Tag.objects.filter(tag_text__icontains='zzbench')
+        rows = []
+        for pk in tags.values_list('id', flat=True):
+            k = min(random.randint(1, 3), len(addons))
+            rows.extend((addon, pk) for addon in random.sample(addons, k))
+        for chunk in chunked(rows, 1000):
+            cursor.executemany(
+                'INSERT INTO users_tags_addons (addon_id, tag_id, created, '
+                'modified) VALUES (%s, %s, NOW(), NOW())', chunk)
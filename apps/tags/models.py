@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.core.urlresolvers import NoReverseMatch
 
 import amo.models
@@ -70,6 +70,37 @@ class Tag(amo.models.ModelBase):
         tagstat.num_addons = self.addons.count()
         tagstat.save()
 
+    @classmethod
+    def update_stats(cls, pks):
+        """
+        update_stat() for all of `pks`: one grouped count upserted into
+        tag_stat, and one delete for the blacklisted tags.
+        """
+        pks = list(pks)
+        if not pks:
+            return
+        stale = list(TagStat.objects.no_cache().filter(tag__in=pks))
+        ids = ', '.join(['%s'] * len(pks))
+        cursor = connection.cursor()
+        cursor.execute("""
+            DELETE tag_stat FROM tag_stat
+            INNER JOIN tags ON tags.id = tag_stat.tag_id
+            WHERE tags.blacklisted AND tags.id IN (%s)""" % ids, pks)
+        cursor.execute("""
+            INSERT INTO tag_stat (tag_id, num_addons, created, modified)
+            SELECT tags.id, COUNT(users_tags_addons.id), NOW(), NOW()
+            FROM tags
+            LEFT JOIN users_tags_addons
+                ON users_tags_addons.tag_id = tags.id
+            WHERE NOT tags.blacklisted AND tags.id IN (%s)
+            GROUP BY tags.id
+            ON DUPLICATE KEY UPDATE num_addons = VALUES(num_addons),
+                                    modified = VALUES(modified)""" % ids,
+            pks)
+        transaction.commit_unless_managed()
+        if stale:
+            TagStat.objects.invalidate(*stale)
+
 
 class TagStat(amo.models.ModelBase):
     tag = models.OneToOneField(Tag, primary_key=True)
@@ -1,7 +1,11 @@
+from collections import defaultdict
+
+from django.db import connection
+
 from celeryutils import task
 import commonware.log
 
-from amo.utils import slugify
+from amo.utils import bulk_update, chunked, slugify
 from tags.models import AddonTag, Tag
 
 
@@ -48,12 +52,100 @@ def clean_tag(pk, **kw):
         tag.update(tag_text=new, blacklisted=blacklisted)
 
 
+# Each runs with the (old_id, new_id) pairs of a batch as {merge}.
+MERGE_SQL = [
+    # Add-ons that already have the tag we're keeping.
+    ("""DELETE old FROM users_tags_addons old
+        INNER JOIN {merge} m ON old.tag_id = m.old_id
+        INNER JOIN users_tags_addons keep
+            ON keep.tag_id = m.new_id AND keep.addon_id = old.addon_id""",
+     1),
+    # Add-ons with more than one of the tags going away keep the first.
+    ("""DELETE old FROM users_tags_addons old
+        INNER JOIN {merge} m ON old.tag_id = m.old_id
+        INNER JOIN {merge} m2 ON m2.new_id = m.new_id
+        INNER JOIN users_tags_addons keep
+            ON keep.tag_id = m2.old_id AND keep.addon_id = old.addon_id
+            AND keep.id < old.id""", 2),
+    ("""UPDATE users_tags_addons a
+        INNER JOIN {merge} m ON a.tag_id = m.old_id
+        SET a.tag_id = m.new_id""", 1),
+    ("""DELETE tag_stat FROM tag_stat
+        INNER JOIN {merge} m ON tag_stat.tag_id = m.old_id""", 1),
+    ("""DELETE tags FROM tags
+        INNER JOIN {merge} m ON tags.id = m.old_id""", 1),
+]
+
+
+def _merge_tags(pairs):
+    """Move everything from each old tag to the new one and delete it."""
+    rows = (['SELECT %s AS old_id, %s AS new_id'] +
+            ['SELECT %s, %s'] * (len(pairs) - 1))
+    merge = '(%s)' % ' UNION ALL '.join(rows)
+    params = [pk for pair in pairs for pk in pair]
+    cursor = connection.cursor()
+    for sql, joins in MERGE_SQL:
+        cursor.execute(sql.format(merge=merge), params * joins)
+
+
+@task
+def dedupe_tags(batch=500, **kw):
+    """
+    clean_tag for every tag at once.  Tags with the same slug are merged
+    into the oldest, which gets the slug as its text and is blacklisted if
+    any of them were.
+    """
+    rows = list(Tag.objects.no_cache()
+                .values_list('id', 'tag_text', 'blacklisted'))
+    slugs = dict((pk, slugify(text, spaces=True, lower=True))
+                 for pk, text, _ in rows)
+    targets = set(slugs[pk] for pk, text, _ in rows if slugs[pk] != text)
+    groups = defaultdict(list)
+    for pk, text, blacklisted in rows:
+        # clean_tag merges tags that already have the new text, whatever
+        # their own slug is.
+        groups[text if text in targets else slugs[pk]].append(
+            (pk, text, blacklisted))
+
+    merges, values = [], {}
+    for new, tags in groups.items():
+        tags.sort()
+        if len(tags) == 1 and tags[0][1] == new:
+            continue
+        keep = tags[0][0]
+        merges.extend((pk, keep) for pk, _, _ in tags[1:])
+        values[keep] = {'tag_text': new,
+                        'blacklisted': any(b for _, _, b in tags)}
+    task_log.info('Merging %s tags into %s.' % (len(merges), len(values)))
+    if not values:
+        return
+
+    changed = values.keys() + [pk for pk, _ in merges]
+    stale = []
+    for chunk in chunked(changed, 1000):
+        stale.extend(Tag.objects.no_cache().filter(pk__in=chunk))
+    # Batches end between groups, so the keep.id < old.id check sees every
+    # tag being merged into the same one.
+    pairs = []
+    merges.sort(key=lambda pair: pair[1])
+    for pair in merges:
+        if len(pairs) >= batch and pairs[-1][1] != pair[1]:
+            _merge_tags(pairs)
+            pairs = []
+        pairs.append(pair)
+    if pairs:
+        _merge_tags(pairs)
+    bulk_update(Tag, values)
+    Tag.objects.invalidate(*stale)
+    for chunk in chunked(sorted(values), 1000):
+        Tag.update_stats(chunk)
+
+
 @task(rate_limit='10/m')
 def update_all_tag_stats(pks, **kw):
     task_log.info("[%s@%s] Calculating stats for tags starting with %s" %
                   (len(pks), update_all_tag_stats.rate_limit, pks[0]))
-    for tag in Tag.objects.filter(pk__in=pks):
-        tag.update_stat()
+    Tag.update_stats(pks)
 
 
 @task(rate_limit='1000/m')
@@ -3,7 +3,7 @@ from nose.tools import eq_
 import amo.tests
 from addons.models import Addon
 from tags.models import AddonTag, Tag, TagStat
-from tags.tasks import clean_tag
+from tags.tasks import clean_tag, dedupe_tags
 
 
 class TestTagManager(amo.tests.TestCase):
@@ -110,6 +110,59 @@ class TestManagement(amo.tests.TestCase):
         clean_tag(self.old.pk)
         assert Tag.objects.get(tag_text='sun').blacklisted
 
+    def make_garbage(self):
+        for tag in ['sun', 'beach', 'sky', 'sea']:
+            for garbage in [tag.upper(), '  %s' % tag, '. %s!  ' % tag]:
+                garbage = Tag.objects.create(tag_text=garbage,
+                                             blacklisted=tag == 'sky')
+                for addon in (self.addon, self.another):
+                    AddonTag.objects.create(tag=garbage, addon=addon)
+
+    def snapshot(self):
+        tags = sorted(Tag.objects.no_cache()
+                      .values_list('tag_text', 'blacklisted'))
+        addon_tags = sorted(AddonTag.objects.no_cache()
+                            .values_list('addon', 'tag__tag_text'))
+        stats = sorted(TagStat.objects.no_cache()
+                       .values_list('tag__tag_text', 'num_addons'))
+        return tags, addon_tags, stats
+
+    def test_dedupe(self):
+        self.make_garbage()
+        dedupe_tags()
+        eq_(self.addon.tags.count(), 6)
+        eq_(self.another.tags.count(), 4)
+        assert Tag.objects.get(tag_text='sky').blacklisted
+        assert not Tag.objects.get(tag_text='sea').blacklisted
+        eq_(TagStat.objects.get(tag__tag_text='sun').num_addons, 2)
+
+    def test_dedupe_matches_clean_tag(self):
+        self.make_garbage()
+        before = [(t.tag_text, t.blacklisted,
+                   list(t.addon_tags.values_list('addon', flat=True)))
+                  for t in Tag.objects.no_cache().order_by('pk')]
+        for tag in Tag.objects.no_cache().order_by('pk'):
+            clean_tag(tag.pk)
+        expected = self.snapshot()
+
+        AddonTag.objects.all().delete()
+        TagStat.objects.all().delete()
+        Tag.objects.all().delete()
+        for text, blacklisted, addons in before:
+            tag = Tag.objects.create(tag_text=text, blacklisted=blacklisted)
+            for addon in addons:
+                AddonTag.objects.create(tag=tag, addon_id=addon)
+        dedupe_tags()
+        tags, addon_tags, stats = self.snapshot()
+        eq_((tags, addon_tags), expected[:2])
+        # clean_tag only counts the tags it moved add-ons to.
+        assert set(expected[2]) <= set(stats)
+
+    def test_dedupe_no_changes(self):
+        expected = self.snapshot()
+        dedupe_tags()
+        eq_(self.snapshot(), expected)
+
 
 class TestCount(amo.tests.TestCase):
     fixtures = ['base/addon_3615',
@@ -160,6 +213,24 @@ class TestCount(amo.tests.TestCase):
         addontag.delete()
         eq_(TagStat.objects.all()[0].num_addons, 0)
 
+    def test_update_stats(self):
+        AddonTag.objects.create(addon_id=5369, tag_id=self.tag.pk)
+        Tag.objects.create(tag_text='empty')
+        tags = list(Tag.objects.no_cache().all())
+        for tag in tags:
+            tag.update_stat()
+        expected = sorted(TagStat.objects.no_cache()
+                          .values_list('tag', 'num_addons'))
+
+        TagStat.objects.all().delete()
+        # A stale count for a tag that's been blacklisted since.
+        TagStat.objects.create(tag=Tag.objects.get(tag_text='swear word'),
+                               num_addons=1)
+        TagStat.objects.create(tag=self.tag, num_addons=10)
+        Tag.update_stats([t.pk for t in tags])
+        eq_(sorted(TagStat.objects.no_cache()
+                   .values_list('tag', 'num_addons')), expected)
+
     def test_delete_tag(self):
         self.tag.update_stat()
         eq_(TagStat.objects.count(), 1)
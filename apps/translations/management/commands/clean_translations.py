@@ -0,0 +1,44 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q, get_models
+
+from amo.utils import bulk_update
+from translations.fields import LinkifiedField, PurifiedField
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--size', action='store', type='int', default=1000,
+                    help='How many translations to clean per query.'),
+    )
+    help = ('Store the cleaned HTML for purified and linkified translations '
+            'that have not been cleaned yet.')
+
+    def handle(self, *args, **options):
+        for model in get_models():
+            for field in model._meta.fields:
+                if isinstance(field, (PurifiedField, LinkifiedField)):
+                    count = self.backfill(model, field, options['size'])
+                    print '%s.%s: %s cleaned' % (model._meta.db_table,
+                                                 field.name, count)
+
+    def backfill(self, model, field, size):
+        cls = field.rel.to
+        ids = model._base_manager.values_list(field.attname, flat=True)
+        qs = (cls.objects.no_cache()
+              .filter(id__in=ids, localized_string__isnull=False)
+              .filter(Q(localized_string_clean__isnull=True) |
+                      Q(localized_string_clean=''))
+              .order_by('autoid'))
+        last, count = 0, 0
+        while True:
+            chunk = list(qs.filter(autoid__gt=last)[:size])
+            if not chunk:
+                return count
+            cls.clean_many(chunk)
+            bulk_update(cls, dict((t.autoid, {'localized_string_clean':
+                                              t.localized_string_clean})
+                                  for t in chunk))
+            last = chunk[-1].autoid
+            count += len(chunk)
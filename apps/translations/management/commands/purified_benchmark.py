@@ -0,0 +1,69 @@
+import random
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from translations.models import PurifiedTranslation
+
+WORDS = ('add-on browser tab window toolbar bookmark download search theme '
+         'privacy password sync menu button page site video image').split()
+SNIPPETS = (u'<b>%s</b>', u'<i>%s</i>', u'see http://example.com/%s',
+            u'<a href="http://example.com/%s">link</a>', u'%s\n\n%s',
+            u'<script>%s</script>', u'<ul><li>%s</li></ul>')
+
+
+def description(seed):
+    r = random.Random(seed)
+    parts = []
+    for i in range(r.randint(5, 30)):
+        snippet = r.choice(SNIPPETS)
+        words = [' '.join(r.sample(WORDS, 5)) for _ in
+                 range(snippet.count('%s'))]
+        parts.append(snippet % tuple(words))
+    return u' '.join(parts) + u' #%s' % seed
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--count', action='store', type='int', default=1500,
+                    help='How many descriptions to render.'),
+    )
+    help = ('Compare rendering purified descriptions through bleach, from '
+            'memcache, from the in-process cache and from backfilled '
+            'rows.')
+
+    def handle(self, *args, **options):
+        strings = [description(i) for i in range(options['count'])]
+        cache = PurifiedTranslation.clean_cache
+
+        def trans():
+            return [PurifiedTranslation(localized_string=s) for s in strings]
+
+        def bleach(ts):
+            for t in ts:
+                t.localized_string_clean = t.clean_string(t.localized_string)
+
+        def memcache(ts):
+            cache.clear()
+            PurifiedTranslation.clean_many(ts)
+
+        def local(ts):
+            PurifiedTranslation.clean_many(ts)
+
+        def backfilled(ts):
+            for t in ts:
+                unicode(t)
+
+        # Fill memcache for the warm runs.
+        PurifiedTranslation.clean_many(trans())
+        done = trans()
+        bleach(done)
+        print 'Rendering %s descriptions.' % len(strings)
+        for name, func, ts in (('bleach', bleach, trans()),
+                               ('memcache', memcache, trans()),
+                               ('in-process', local, trans()),
+                               ('backfilled', backfilled, done)):
+            start = time.time()
+            func(ts)
+            print '%-12s %8.2fs' % (name, time.time() - start)
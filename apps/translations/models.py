@@ -1,3 +1,8 @@
+import hashlib
+import itertools
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models, connection
 from django.utils import encoding
 
@@ -100,9 +105,46 @@ class Translation(amo.models.ModelBase):
         return trans
 
 
+class CleanCache(object):
+    """
+    A small in-process LRU in front of memcache for cleaned strings.
+
+    Cleaned output only depends on the source string and the cleaning rules,
+    so it's keyed by a hash of both and never needs invalidating.
+    """
+
+    def __init__(self, maxsize=2000):
+        self.maxsize = maxsize
+        self.tick = itertools.count()
+        self.data = {}
+
+    def get(self, key):
+        try:
+            value, _ = self.data[key]
+        except KeyError:
+            return None
+        self.data[key] = value, self.tick.next()
+        return value
+
+    def set(self, key, value):
+        self.data[key] = value, self.tick.next()
+        if len(self.data) > self.maxsize:
+            # Drop the least recently used tenth in one go so we don't sort on
+            # every insert.
+            items = sorted(self.data.items(), key=lambda x: x[1][1])
+            self.data = dict(items[len(items) - self.maxsize * 9 / 10:])
+
+    def clear(self):
+        self.data.clear()
+
+
 class PurifiedTranslation(Translation):
     """Run the string through bleach to get a safe, linkified version."""
 
+    # Bump this when the cleaning rules change to ignore the cached output.
+    clean_version = 1
+    clean_cache = CleanCache()
+
     class Meta:
         proxy = True
 
@@ -115,12 +157,68 @@ class PurifiedTranslation(Translation):
         return unicode(self)
 
     def clean(self):
-        from amo.utils import clean_nl
         super(PurifiedTranslation, self).clean()
-        cleaned = bleach.clean(self.localized_string)
+        self.clean_many([self], force=True)
+
+    @classmethod
+    def clean_string(cls, s):
+        from amo.utils import clean_nl
+        cleaned = bleach.clean(s)
         linkified = bleach.linkify(cleaned, nofollow=True,
                 filter_url=urlresolvers.get_outgoing_url)
-        self.localized_string_clean = clean_nl(linkified).strip()
+        return clean_nl(linkified).strip()
+
+    @classmethod
+    def clean_key(cls, s):
+        # Outgoing links depend on the redirect settings, so they're part of
+        # the key along with the cleaning rules.
+        parts = (cls.__name__, cls.clean_version,
+                 getattr(bleach, '__version__', ''), settings.REDIRECT_URL,
+                 settings.REDIRECT_SECRET_KEY, s)
+        key = u'\0'.join(map(encoding.smart_unicode, parts))
+        return 'purified:%s' % hashlib.sha1(key.encode('utf8')).hexdigest()
+
+    @classmethod
+    def clean_many(cls, translations, force=False):
+        """
+        Fill in localized_string_clean for all of `translations`.
+
+        Cleaned strings come from the in-process cache, then memcache in one
+        get_many, and only the rest go through bleach. Translations that are
+        already clean are skipped unless `force` is True.
+        """
+        todo = {}
+        for trans in translations:
+            if trans.localized_string_clean and not force:
+                continue
+            if not trans.localized_string:
+                trans.localized_string_clean = u''
+                continue
+            key = cls.clean_key(trans.localized_string)
+            todo.setdefault(key, []).append(trans)
+
+        found = {}
+        for key in todo:
+            value = cls.clean_cache.get(key)
+            if value is not None:
+                found[key] = value
+        missing = [k for k in todo if k not in found]
+        if missing:
+            cached = cache.get_many(missing)
+            found.update(cached)
+            new = {}
+            for key in missing:
+                if key not in cached:
+                    source = todo[key][0].localized_string
+                    new[key] = found[key] = cls.clean_string(source)
+            if new:
+                cache.set_many(new)
+            for key in missing:
+                cls.clean_cache.set(key, found[key])
+
+        for key, items in todo.items():
+            for trans in items:
+                trans.localized_string_clean = found[key]
 
     def __truncate__(self, length, killwords, end):
         return utils.truncate(unicode(self), length, killwords, end)
@@ -133,11 +231,13 @@ class LinkifiedTranslation(PurifiedTranslation):
         proxy = True
 
     def clean(self):
-        linkified = bleach.linkify(self.localized_string,
-                filter_url=urlresolvers.get_outgoing_url)
-        clean = bleach.clean(linkified, tags=['a'],
-                             attributes={'a': ['href', 'rel']})
-        self.localized_string_clean = clean
+        self.clean_many([self], force=True)
+
+    @classmethod
+    def clean_string(cls, s):
+        linkified = bleach.linkify(s, filter_url=urlresolvers.get_outgoing_url)
+        return bleach.clean(linkified, tags=['a'],
+                            attributes={'a': ['href', 'rel']})
 
 
 class TranslationSequence(models.Model):
@@ -1,16 +1,18 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
 from django import test
+from django.core.cache import cache
 from django.utils import translation
 from django.utils.functional import lazy
 
 import jinja2
+import mock
 from nose.tools import eq_
 from test_utils import ExtraAppTestCase, trans_eq
 
 from testapp.models import TranslatedModel, UntranslatedModel, FancyModel
 from translations.models import (Translation, PurifiedTranslation,
-                                 TranslationSequence)
+                                 LinkifiedTranslation, TranslationSequence)
 from translations import widgets
 from translations.query import order_by_translation
 
@@ -322,6 +324,15 @@ class TranslationTestCase(ExtraAppTestCase):
             '.html</a> .')
         eq_(m.linkified.localized_string, s)
 
+    def test_transformer_cleans(self):
+        m = FancyModel.objects.get(id=1)
+        eq_(m.purified.localized_string_clean,
+            '<i>x</i> '
+            '<a href="http://yyy.com" rel="nofollow">http://yyy.com</a>')
+        eq_(m.linkified.localized_string_clean,
+            '&lt;i&gt;x&lt;/i&gt; '
+            '<a href="http://yyy.com" rel="nofollow">http://yyy.com</a>')
+
     def test_require_locale(self):
         obj = TranslatedModel.objects.get(id=1)
         eq_(unicode(obj.no_locale), 'blammo')
@@ -336,6 +347,58 @@ class TranslationTestCase(ExtraAppTestCase):
         eq_(obj.no_locale.locale, 'fr')
 
 
+class TestCleanCache(test.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        PurifiedTranslation.clean_cache.clear()
+
+    def trans(self, *strings):
+        return [PurifiedTranslation(localized_string=s) for s in strings]
+
+    def test_clean_many(self):
+        ts = self.trans('<b>x</b>', '<b>x</b>', '<script>y</script>', None)
+        PurifiedTranslation.clean_many(ts)
+        eq_([t.localized_string_clean for t in ts],
+            ['<b>x</b>', '<b>x</b>', '&lt;script&gt;y&lt;/script&gt;', ''])
+
+    @mock.patch.object(PurifiedTranslation, 'clean_string')
+    def test_clean_once(self, clean_string):
+        clean_string.return_value = 'clean'
+        PurifiedTranslation.clean_many(self.trans('a', 'a', 'b'))
+        eq_(clean_string.call_count, 2)
+
+        # The in-process cache answers next time.
+        PurifiedTranslation.clean_many(self.trans('a', 'b'))
+        eq_(clean_string.call_count, 2)
+
+        # Then memcache.
+        PurifiedTranslation.clean_cache.clear()
+        ts = self.trans('a', 'b')
+        PurifiedTranslation.clean_many(ts)
+        eq_(clean_string.call_count, 2)
+        eq_([t.localized_string_clean for t in ts], ['clean', 'clean'])
+
+    def test_skip_clean(self):
+        t = PurifiedTranslation(localized_string='<b>x</b>',
+                                localized_string_clean='done')
+        PurifiedTranslation.clean_many([t])
+        eq_(t.localized_string_clean, 'done')
+        PurifiedTranslation.clean_many([t], force=True)
+        eq_(t.localized_string_clean, '<b>x</b>')
+
+    def test_key(self):
+        key = PurifiedTranslation.clean_key('x')
+        assert key != LinkifiedTranslation.clean_key('x')
+        assert key != PurifiedTranslation.clean_key('y')
+        old = settings.REDIRECT_URL
+        settings.REDIRECT_URL = 'http://example.com/'
+        try:
+            assert key != PurifiedTranslation.clean_key('x')
+        finally:
+            settings.REDIRECT_URL = old
+
+
 def test_translation_bool():
     t = lambda s: Translation(localized_string=s)
 
@@ -2,9 +2,8 @@ from django.conf import settings
 from django.db import connections, models
 from django.utils import translation
 
-import multidb
-
-from translations.models import Translation
+from amo.routers import get_slave
+from translations.models import Translation, PurifiedTranslation
 from translations.fields import TranslatedField
 
 isnull = """IF(!ISNULL({t1}.localized_string), {t1}.{col}, {t2}.{col})
@@ -67,7 +66,7 @@ def get_trans(items):
     if not items:
         return
 
-    connection = connections[multidb.get_slave()]
+    connection = connections[get_slave()]
     cursor = connection.cursor()
 
     model = items[0].__class__
@@ -85,3 +84,9 @@ def get_trans(items):
             t = Translation(*row[start:start+step])
             if t.id is not None and t.localized_string is not None:
                 setattr(item, field.name, t)
+
+    # Clean the purified and linkified strings for the whole page at once.
+    for field in model._meta.translated_fields:
+        if issubclass(field.rel.to, PurifiedTranslation):
+            trans = filter(None, (getattr(item, field.name) for item in items))
+            field.rel.to.clean_many(trans)
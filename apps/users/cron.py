@@ -1,11 +1,11 @@
 from django.db import connections
 
 import commonware.log
-import multidb
 from celery.task.sets import TaskSet
 
 import cronjobs
 from amo import VALID_STATUSES
+from amo.routers import get_slave
 from amo.utils import chunked
 from .models import UserProfile
 from .tasks import update_user_ratings_task
@@ -17,7 +17,7 @@ task_log = commonware.log.getLogger('z.task')
 def update_user_ratings():
     """Update add-on author's ratings."""
 
-    cursor = connections[multidb.get_slave()].cursor()
+    cursor = connections[get_slave()].cursor()
     # We build this query ahead of time because the cursor complains about data
     # truncation if it does the parameters.  Also, this query is surprisingly
     # quick, <1sec for 6100 rows returned
@@ -0,0 +1,83 @@
+import random
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from amo.utils import chunked
+from users.models import UserProfile
+from users.tasks import update_user_ratings_task
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--authors', action='store', type='int', default=100000,
+                    help='How many fake authors to rate.'),
+        make_option('--changed', action='store', type='float', default=.1,
+                    help='The share of ratings that move.'),
+    )
+    help = ('Compare writing every author rating with writing only the ones '
+            'that changed.  Everything is rolled back at the end.')
+
+    def handle(self, *args, **options):
+        transaction.enter_transaction_management()
+        transaction.managed(True)
+        try:
+            data = self.make_authors(options['authors'], options['changed'])
+            print '%s authors.' % len(data)
+
+            def per_user():
+                for pk, rating in data:
+                    rating = "%.2f" % round(rating, 2)
+                    UserProfile.objects.filter(pk=pk).update(
+                        averagerating=rating)
+                return len(data)
+
+            def bulk():
+                return sum(update_user_ratings_task(chunk)
+                           for chunk in chunked(data, 1000))
+
+            sid = transaction.savepoint()
+            self.timeit('per user', per_user)
+            transaction.savepoint_rollback(sid)
+            self.timeit('bulk', bulk)
+            self.timeit('unchanged', bulk)
+        finally:
+            transaction.rollback()
+            transaction.leave_transaction_management()
+
+    def timeit(self, name, f):
+        start = time.time()
+        rows = f()
+        print '%-10s %8.2fs %8s rows' % (name, time.time() - start, rows)
+
+    def make_authors(self, n, changed):
+        """Insert `n` users with ratings and return [(pk, new rating)]."""
+        fields = [f for f in UserProfile._meta.local_fields
+                  if not f.rel and not isinstance(f, models.AutoField)]
+        columns = ', '.join(connection.ops.quote_name(f.column)
+                            for f in fields)
+        sql = 'INSERT INTO users (%s) VALUES (%s)' % (
+            columns, ', '.join(['%s'] * len(fields)))
+        cursor = connection.cursor()
+        for chunk in chunked(xrange(n), 1000):
+            rows = []
+            for i in chunk:
+                user = UserProfile(username='zzbench-%s' % i,
+                                   email='zzbench-%s@example.com' % i,
+                                   averagerating='%.2f' % (i % 500 / 100.))
+                rows.append([f.get_db_prep_save(f.pre_save(user, True),
+                                                connection=connection)
+                             for f in fields])
+            cursor.executemany(sql, rows)
+
+        data = []
+        for pk, rating in (UserProfile.objects
+                           .filter(username__startswith='zzbench-')
+                           .values_list('id', 'averagerating')):
+            rating = float(rating)
+            if random.random() < changed:
+                rating = random.randint(100, 500) / 100.
+            data.append((pk, rating))
+        return data
@@ -7,7 +7,7 @@ import elasticutils
 from celeryutils import task
 
 from amo.decorators import set_modified_on
-from amo.utils import resize_image
+from amo.utils import bulk_update, resize_image
 
 from .models import UserProfile
 from . import search
@@ -63,6 +63,13 @@ def unindex_users(ids, **kw):
 def update_user_ratings_task(data, **kw):
     task_log.info("[%s@%s] Updating add-on author's ratings." %
                    (len(data), update_user_ratings_task.rate_limit))
-    for pk, rating in data:
-        rating = "%.2f" % round(rating, 2)
-        UserProfile.objects.filter(pk=pk).update(averagerating=rating)
+    ratings = dict((pk, "%.2f" % round(rating, 2)) for pk, rating in data)
+    # Most authors' ratings don't move from day to day, so we only write
+    # and invalidate the ones that did.
+    changed = [u for u in UserProfile.objects.no_cache().filter(pk__in=ratings)
+               if u.averagerating != ratings[u.pk]]
+    bulk_update(UserProfile, dict((u.pk, {'averagerating': ratings[u.pk]})
+                                  for u in changed))
+    if changed:
+        UserProfile.objects.invalidate(*changed)
+    return len(changed)
@@ -5,11 +5,14 @@ import tempfile
 
 from django.conf import settings
 
+import mock
 from nose.tools import eq_
 from PIL import Image
 
+import amo.tests
 from amo.tests.test_helpers import get_image_path
-from users.tasks import delete_photo, resize_photo
+from users.models import UserProfile
+from users.tasks import delete_photo, resize_photo, update_user_ratings_task
 
 
 def test_delete_photo():
@@ -59,3 +62,43 @@ def test_resize_photo_poorly():
     # assert nothing happenned
     src_image = Image.open(src.name)
     eq_(src_image.size, (82, 31))
+
+
+class TestUpdateUserRatings(amo.tests.TestCase):
+    fixtures = ['base/user_2519', 'base/user_4043307']
+
+    def setUp(self):
+        UserProfile.objects.filter(pk=2519).update(averagerating='3.50')
+        UserProfile.objects.filter(pk=4043307).update(averagerating=None)
+        self.data = [(2519, 3.5), (4043307, 4.125), (999, 1.0)]
+
+    def ratings(self):
+        return dict(UserProfile.objects.no_cache()
+                    .values_list('id', 'averagerating'))
+
+    def test_matches_per_user(self):
+        # What the task used to do.
+        for pk, rating in self.data:
+            rating = "%.2f" % round(rating, 2)
+            UserProfile.objects.filter(pk=pk).update(averagerating=rating)
+        expected = self.ratings()
+        self.setUp()
+
+        update_user_ratings_task(self.data)
+        eq_(self.ratings(), expected)
+        eq_(expected[4043307], '4.13')
+
+    @mock.patch('users.tasks.bulk_update')
+    def test_only_changes(self, bulk_update):
+        eq_(update_user_ratings_task(self.data), 1)
+        bulk_update.assert_called_with(
+            UserProfile, {4043307: {'averagerating': '4.13'}})
+
+    def test_nothing_changed(self):
+        update_user_ratings_task(self.data)
+        eq_(update_user_ratings_task(self.data), 0)
+
+    def test_invalidates(self):
+        eq_(UserProfile.objects.get(pk=4043307).averagerating, None)
+        update_user_ratings_task(self.data)
+        eq_(UserProfile.objects.get(pk=4043307).averagerating, '4.13')
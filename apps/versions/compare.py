@@ -13,6 +13,11 @@ version_re = re.compile(r"""(?P<major>\d+)         # major (x in x.y)
                             (?P<pre_ver>\d)?       # pre release version""",
                         re.VERBOSE)
 
+# We only see a few thousand distinct version strings, so remember them.
+VERSION_CACHE_SIZE = 10000
+_version_dicts = {}
+_version_ints = {}
+
 
 def dict_from_int(version_int):
     """Converts a version integer into a dictionary with major/minor/...
@@ -39,6 +44,17 @@ def num(vint):
 
 def version_dict(version):
     """Turn a version string into a dict with major/minor/... info."""
+    try:
+        d = _version_dicts[version]
+    except KeyError:
+        if len(_version_dicts) >= VERSION_CACHE_SIZE:
+            _version_dicts.clear()
+        d = _version_dicts[version] = _version_dict(version)
+    # Hand out a copy so callers can't change what's cached.
+    return dict(d)
+
+
+def _version_dict(version):
     match = version_re.match(version or '')
     letters = 'alpha pre'.split()
     numbers = 'major minor1 minor2 minor3 alpha_ver pre_ver'.split()
@@ -57,17 +73,56 @@ def version_dict(version):
     return d
 
 
+# version_re without the names, so version_int can unpack match.groups().
+version_int_re = re.compile(r'(\d+)\.?(\d+|\*)?\.?(\d+|\*)?\.?(\d+|\*)?'
+                            r'([a|b]?)(\d*)(pre)?(\d)?')
+
+
+def _shift(acc, value, width):
+    """
+    Append `value` to `acc` as a zero-padded field of `width` digits.
+
+    Values that don't fit push the rest of the digits over, the same way
+    "%02d" would in a formatted string.
+    """
+    limit = 10 ** width
+    while value >= limit:
+        limit *= 10
+    return acc * limit + value
+
+
+def _version_int(version):
+    match = version_int_re.match(version)
+    if not match:
+        return 200100
+    major, minor1, minor2, minor3, alpha, alpha_ver, pre, pre_ver = (
+        match.groups())
+    rv = int(major)
+    for minor in (minor1, minor2, minor3):
+        rv = _shift(rv, 99 if minor == '*' else int(minor or 0), 2)
+    rv = rv * 10 + {'a': 0, 'b': 1}.get(alpha, 2)
+    rv = _shift(rv, int(alpha_ver or 0), 2)
+    rv = rv * 10 + (0 if pre else 1)
+    return rv * 100 + int(pre_ver or 0)
+
+
 def version_int(version):
-    d = version_dict(smart_str(version))
-    for key in ['alpha_ver', 'major', 'minor1', 'minor2', 'minor3',
-                'pre_ver']:
-        if not d[key]:
-            d[key] = 0
-    atrans = {'a': 0, 'b': 1}
-    d['alpha'] = atrans.get(d['alpha'], 2)
-    d['pre'] = 0 if d['pre'] else 1
-
-    v = "%d%02d%02d%02d%d%02d%d%02d" % (d['major'], d['minor1'],
-            d['minor2'], d['minor3'], d['alpha'], d['alpha_ver'], d['pre'],
-            d['pre_ver'])
-    return int(v)
+    try:
+        return _version_ints[version]
+    except KeyError:
+        if len(_version_ints) >= VERSION_CACHE_SIZE:
+            _version_ints.clear()
+        rv = _version_ints[version] = _version_int(smart_str(version))
+        return rv
+
+
+def version_int_many(versions):
+    """version_int for each of `versions`, as a list."""
+    get = _version_ints.get
+    rv = []
+    for version in versions:
+        vint = get(version)
+        if vint is None:
+            vint = version_int(version)
+        rv.append(vint)
+    return rv
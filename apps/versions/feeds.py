@@ -1,19 +1,21 @@
-from django.contrib.syndication.views import Feed
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
 from jingo.helpers import datetime
 
 from tower import ugettext as _
 
 import amo
+from amo.feeds import CachedFeed
 from amo.urlresolvers import reverse
 from amo.helpers import absolutify, url
 
 from addons.models import Addon
 
 
-class VersionsRss(Feed):
+class VersionsRss(CachedFeed):
 
     addon = None
+    feed_kind = 'addon'
 
     def get_object(self, request, addon_id):
         """Get the Addon for which we are about to output
@@ -22,6 +24,15 @@ class VersionsRss(Feed):
         self.addon = get_object_or_404(qs.id_or_slug(addon_id) & qs.valid())
         return self.addon
 
+    def feed_stamp(self, addon):
+        d = (addon.versions.filter(files__status__in=amo.VALID_STATUSES)
+             .aggregate(modified=Max('modified'),
+                        files=Max('files__modified'),
+                        count=Count('id', distinct=True)))
+        modified = max(filter(None, (addon.modified, d['modified'],
+                                     d['files'])))
+        return modified, d['count']
+
     def title(self, addon):
         """Title for the feed"""
         return _(u'%s Version History' % addon.name)
@@ -0,0 +1,51 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+from django.test.client import Client
+
+import amo
+from addons.models import Addon
+from amo.feeds import invalidate_feed
+from amo.urlresolvers import reverse
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--addons', action='store', type='int', default=50,
+                    help='How many version feeds to poll.'),
+        make_option('--polls', action='store', type='int', default=20,
+                    help='How many times to poll each feed.'),
+    )
+    help = ('Replay feed reader polls of version feeds: rendering every '
+            'time, serving from the cache, and answering with 304s.')
+
+    def handle(self, *args, **options):
+        ids = list(Addon.objects.filter(status=amo.STATUS_PUBLIC)
+                   .exclude(type=amo.ADDON_PERSONA)
+                   .order_by('-average_daily_users')
+                   .values_list('id', flat=True)[:options['addons']])
+        urls = ['/en-US/firefox' + reverse('addons.versions.rss', args=[id],
+                                           add_prefix=False) for id in ids]
+        client = Client()
+        etags = dict((u, client.get(u)['ETag']) for u in urls)
+        print '%s polls of %s feeds.' % (options['polls'], len(urls))
+
+        def not_modified(id, url):
+            client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+
+        def cached(id, url):
+            client.get(url)
+
+        def render(id, url):
+            invalidate_feed('addon', id)
+            client.get(url)
+
+        # Rendering goes last since it throws away the ETags.
+        for name, func in (('304', not_modified), ('cached', cached),
+                           ('render', render)):
+            start = time.time()
+            for _ in xrange(options['polls']):
+                for id, url in zip(ids, urls):
+                    func(id, url)
+            print '%-8s %8.2fs' % (name, time.time() - start)
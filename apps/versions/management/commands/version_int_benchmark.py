@@ -0,0 +1,38 @@
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from versions import compare
+from versions.models import Version
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--versions', action='store', type='int', default=200000,
+                    help='How many version strings to parse.'),
+    )
+    help = ('Report version_int calls per second for the parser, the '
+            'cached path and version_int_many, over real version strings.')
+
+    def handle(self, *args, **options):
+        versions = list(Version.objects.values_list('version', flat=True)
+                        .order_by('-id')[:options['versions']])
+        print 'Parsing %s versions (%s distinct).' % (len(versions),
+                                                      len(set(versions)))
+
+        def uncached(versions):
+            for v in versions:
+                compare._version_int(compare.smart_str(v))
+
+        def cached(versions):
+            for v in versions:
+                compare.version_int(v)
+
+        for name, func in (('uncached', uncached),
+                           ('cached', cached),
+                           ('many', compare.version_int_many)):
+            start = time.time()
+            func(versions)
+            took = time.time() - start
+            print '%-10s %12.0f calls/s' % (name, len(versions) / took)
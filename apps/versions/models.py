@@ -13,6 +13,7 @@ import path
 import amo
 import amo.models
 import amo.utils
+from amo.feeds import invalidate_feed
 from amo.urlresolvers import reverse
 from applications.models import Application, AppVersion
 from files import utils
@@ -361,6 +362,12 @@ def update_incompatible_versions(sender, instance, **kw):
     tasks.update_incompatible_appversions.delay([instance.id])
 
 
+def invalidate_versions_feed(sender, instance, **kw):
+    if kw.get('raw'):
+        return
+    invalidate_feed('addon', instance.addon_id)
+
+
 version_uploaded = django.dispatch.Signal()
 models.signals.post_save.connect(update_status, sender=Version,
                                  dispatch_uid='version_update_status')
@@ -372,6 +379,10 @@ models.signals.post_save.connect(update_incompatible_versions, sender=Version,
                                  dispatch_uid='version_update_incompat')
 models.signals.post_delete.connect(update_incompatible_versions, sender=Version,
                                    dispatch_uid='version_update_incompat')
+models.signals.post_save.connect(invalidate_versions_feed, sender=Version,
+                                 dispatch_uid='version_feed_save')
+models.signals.post_delete.connect(invalidate_versions_feed, sender=Version,
+                                   dispatch_uid='version_feed_delete')
 
 
 class LicenseManager(amo.models.ManagerBase):
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import hashlib
 import os
+import random
 
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
 
 import mock
 from nose.tools import eq_
@@ -11,6 +13,7 @@ from pyquery import PyQuery
 
 import amo
 import amo.tests
+from amo.feeds import _invalidated_key
 from amo.urlresolvers import reverse
 from addons.models import Addon
 from addons.tests.test_views import TestMobile
@@ -21,7 +24,8 @@ from files.tests.test_models import UploadTest
 from users.models import UserProfile
 from versions import views
 from versions.models import Version, ApplicationsVersions
-from versions.compare import version_int, dict_from_int, version_dict
+from versions.compare import (version_int, version_int_many, dict_from_int,
+                              version_dict, _version_int)
 
 
 def test_version_int():
@@ -56,6 +60,52 @@ def test_version_int_unicode():
     eq_(version_int(u'\u2322 ugh stephend'), 200100)
 
 
+def formatted_version_int(version):
+    """The original version_int, which formats then parses the integer."""
+    d = version_dict(version)
+    for key in ['alpha_ver', 'major', 'minor1', 'minor2', 'minor3',
+                'pre_ver']:
+        if not d[key]:
+            d[key] = 0
+    d['alpha'] = {'a': 0, 'b': 1}.get(d['alpha'], 2)
+    d['pre'] = 0 if d['pre'] else 1
+    return int('%d%02d%02d%02d%d%02d%d%02d' % (
+        d['major'], d['minor1'], d['minor2'], d['minor3'], d['alpha'],
+        d['alpha_ver'], d['pre'], d['pre_ver']))
+
+
+def random_version(r):
+    if r.random() < .5:
+        # Junk made of the characters the regex cares about.
+        return ''.join(r.choice('0123456789.*ab|pre x-')
+                       for _ in range(r.randint(0, 15)))
+    parts = [r.choice(['0', '1', '9', '10', '99', '100', '2011', '*'])
+             for _ in range(r.randint(1, 5))]
+    return '.'.join(parts) + r.choice(['', 'a', 'b', 'a1', 'b12', 'pre',
+                                       'pre1', 'b2pre3', 'a123', 'pre12'])
+
+
+def test_version_int_matches_formatted():
+    r = random.Random(42)
+    for _ in range(20000):
+        version = random_version(r)
+        eq_(_version_int(version), formatted_version_int(version),
+            'Mismatch for %r' % version)
+        eq_(version_int(version), formatted_version_int(version))
+
+
+def test_version_dict_copy():
+    d = version_dict('3.6')
+    d['major'] = 4
+    eq_(version_dict('3.6')['major'], 3)
+
+
+def test_version_int_many():
+    versions = ['3.6', u'4.0b1', '3.6', None, '']
+    eq_(version_int_many(versions), map(version_int, versions))
+    eq_(version_int_many(iter(versions)), map(version_int, versions))
+
+
 def test_dict_from_int():
     d = dict_from_int(3050000001002)
     eq_(d['major'], 3)
@@ -370,6 +420,53 @@ class TestFeeds(amo.tests.TestCase):
         item_pubdate = doc('rss channel item pubDate')[0]
         assert item_pubdate.text == 'Thu, 21 May 2009 05:37:15 -0700'
 
+    def get_feed(self, **headers):
+        url = reverse('addons.versions.rss', args=['a11730'])
+        return self.client.get(url, follow=True, **headers)
+
+    def test_conditional_get(self):
+        r = self.get_feed()
+        eq_(r.status_code, 200)
+        eq_(self.get_feed(HTTP_IF_NONE_MATCH=r['ETag']).status_code, 304)
+        eq_(self.get_feed(HTTP_IF_MODIFIED_SINCE=r['Last-Modified'])
+            .status_code, 304)
+        eq_(self.get_feed(HTTP_IF_NONE_MATCH='"xxx"').status_code, 200)
+
+    def test_cached(self):
+        r = self.get_feed()
+        with mock.patch('versions.feeds.VersionsRss.get_feed') as get_feed:
+            eq_(self.get_feed().content, r.content)
+            assert not get_feed.called
+
+    def test_invalidated(self):
+        r = self.get_feed()
+        # update() doesn't touch modified, so the signal has to do it.
+        version = Version.objects.get(addon=11730, version='20090521')
+        version.update(version='9.9.9')
+        new = self.get_feed(HTTP_IF_NONE_MATCH=r['ETag'])
+        eq_(new.status_code, 200)
+        assert new['ETag'] != r['ETag']
+        assert '9.9.9' in new.content
+
+    def test_nothing_cached(self):
+        # Nothing invalidated, or memcache was flushed.
+        cache.clear()
+        r = self.get_feed()
+        eq_(r.status_code, 200)
+        assert r['Last-Modified']
+
+    def test_deleted_if_modified_since(self):
+        # Pretend it was last invalidated long ago.
+        cache.set(_invalidated_key('addon', 11730), datetime(2010, 1, 1))
+        r = self.get_feed()
+        # Deleting the older version doesn't change the latest modified.
+        Version.objects.get(addon=11730, version='20080521').delete()
+        new = self.get_feed(HTTP_IF_MODIFIED_SINCE=r['Last-Modified'])
+        eq_(new.status_code, 200)
+        assert '20080521' not in new.content
+        eq_(self.get_feed(HTTP_IF_MODIFIED_SINCE=new['Last-Modified'])
+            .status_code, 304)
+
 
 class TestDownloadsBase(amo.tests.TestCase):
     fixtures = ['base/apps', 'base/addon_5299_gcal', 'base/admin']
@@ -0,0 +1,53 @@
+import hashlib
+import time
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from amo.utils import pool_imap
+from devhub.tasks import run_validator
+from zadmin.tasks import _validate_file
+
+
+def sha256(path):
+    hash = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(2 ** 20), ''):
+            hash.update(chunk)
+    return hash.hexdigest()
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--copies', action='store', type='int', default=5,
+                    help='How many times each xpi appears in the job.'),
+        make_option('--processes', action='store', type='int', default=None,
+                    help='Number of validator processes.'),
+    )
+    args = '<xpi> [<xpi> ...]'
+    help = ('Time a synthetic bulk validation job of duplicated xpis, one '
+            'validation per file against one per unique file in a pool.')
+
+    def handle(self, *paths, **options):
+        if not paths:
+            raise CommandError('Usage: %s' % self.args)
+        files = [p for p in paths for i in range(options['copies'])]
+        kw = {'test_all_tiers': True}
+
+        start = time.time()
+        for path in files:
+            run_validator(path, **kw)
+        each = time.time() - start
+
+        start = time.time()
+        unique = dict((sha256(path), path) for path in files).values()
+        list(pool_imap(_validate_file,
+                       [(i, p, kw) for i, p in enumerate(unique)],
+                       options['processes'], maxtasksperchild=10))
+        deduped = time.time() - start
+
+        print 'Files in job:            %s' % len(files)
+        print 'One validation per file: %.2fs, %s validations' % (
+            each, len(files))
+        print 'Unique files in a pool:  %.2fs, %s validations (%s saved)' % (
+            deduped, len(unique), len(files) - len(unique))
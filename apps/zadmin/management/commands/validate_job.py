@@ -0,0 +1,27 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from zadmin.tasks import validate_job_locally
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--processes', action='store', type='int', default=None,
+                    help='Number of validator processes, defaults to the '
+                         'number of CPUs.'),
+        make_option('--maxtasksperchild', action='store', type='int',
+                    default=10,
+                    help='Files each process validates before it is '
+                         'replaced.'),
+    )
+    args = '<job id>'
+    help = ('Run the pending results of a bulk validation job through a '
+            'local pool of validators instead of celery.')
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Usage: %s' % self.args)
+        count = validate_job_locally(int(args[0]), options['processes'],
+                                     options['maxtasksperchild'])
+        print 'Validated %s unique files.' % count
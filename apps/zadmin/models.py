@@ -245,7 +245,8 @@ class ValidationJobTally(object):
         for msg_key in self.kv.smembers('validation.job_id:%s' % self.job_id):
             yield ValidationMsgTally(self.job_id, msg_key)
 
-    def save_message(self, msg):
+    def save_message(self, msg, count=1):
+        """Counts `msg` against `count` more add-ons."""
         msg_key = '.'.join(msg['id'])
         self.kv.sadd('validation.job_id:%s' % self.job_id,
                      msg_key)
@@ -264,7 +265,7 @@ class ValidationJobTally(object):
         self.kv.set('validation.msg_key:%s:type' % msg_key,
                     effective_type)
         self.kv.incr('validation.job_id:%s.msg_key:%s:addons_affected'
-                     % (self.job_id, msg_key))
+                     % (self.job_id, msg_key), count)
 
 
 class ValidationMsgTally(object):
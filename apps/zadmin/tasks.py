@@ -8,20 +8,19 @@ import textwrap
 import traceback
 
 from django.conf import settings
-from django.core.exceptions import ObjectDoesNotExist
 from django.db import connection
 from django.template import Context, Template
 
 from celeryutils import task
 
-from addons.models import Addon
 import amo
 from amo import set_user
 from amo.decorators import write
 from amo.helpers import absolutify
 from amo.urlresolvers import reverse
-from amo.utils import send_mail
+from amo.utils import pool_imap, send_mail
 from devhub.tasks import run_validator
+from files.models import File
 from users.utils import get_task_user
 from versions.models import Version
 from zadmin.models import ValidationResult, ValidationJob, ValidationJobTally
@@ -54,61 +53,150 @@ def tally_job_results(job_id, **kw):
                       recipient_list=[job.finish_email])
 
 
+def _validator_kw(target):
+    """The validator arguments for a job targeting AppVersion `target`."""
+    # Set min/max so the validator only tests for compatibility with
+    # the target version. Note that previously we explicitly checked
+    # for compatibility with older versions. See bug 675306 for
+    # the old behavior.
+    guid = target.application.guid
+    return dict(for_appversions={guid: [target.version]},
+                test_all_tiers=True,
+                overrides={'targetapp_minVersion': {guid: target.version},
+                           'targetapp_maxVersion': {guid: target.version}})
+
+
+def _same_hash(res):
+    """The other results in the job for a file with the same hash."""
+    qs = (ValidationResult.objects.filter(validation_job=res.validation_job_id)
+                                  .exclude(pk=res.pk))
+    if not res.file.hash:
+        return qs.none()
+    return qs.filter(file__hash=res.file.hash)
+
+
+def _save_validation(res, validation, task_error=None):
+    """
+    Saves the validation (or the traceback in `task_error`) on `res` and on
+    every pending result in the job for a file with the same hash, so each
+    unique file only goes through the validator once.
+    """
+    results = [res] + list(_same_hash(res).filter(completed__isnull=True))
+    for r in results:
+        r.completed = datetime.now()
+        if task_error:
+            r.task_error = task_error
+        else:
+            r.apply_validation(validation)
+        r.save()
+
+    if not task_error:
+        log.info('[1@None] File %s errors=%s, copied to %s results'
+                 % (res.file, res.errors, len(results) - 1))
+        tally_validation_results.delay(res.validation_job_id, validation,
+                                       count=len(results))
+    tally_job_results(res.validation_job_id)
+
+
 @task(rate_limit='6/s')
 @write
 def bulk_validate_file(result_id, **kw):
     res = ValidationResult.objects.get(pk=result_id)
+    if res.completed:
+        # Already filled in by a result for the same file.
+        return
     task_error = None
     validation = None
     file_base = os.path.basename(res.file.file_path)
+    done = (_same_hash(res).filter(completed__isnull=False,
+                                   task_error__isnull=True)
+                           .values_list('validation', flat=True)[:1])
     try:
-        log.info('[1@None] Validating file %s (%s) for result_id %s'
-                 % (res.file, file_base, res.id))
-        target = res.validation_job.target_version
-        ver = {target.application.guid: [target.version]}
-        # Set min/max so the validator only tests for compatibility with
-        # the target version. Note that previously we explicitly checked
-        # for compatibility with older versions. See bug 675306 for
-        # the old behavior.
-        overrides = {'targetapp_minVersion':
-                                {target.application.guid: target.version},
-                     'targetapp_maxVersion':
-                                {target.application.guid: target.version}}
-        validation = run_validator(res.file.file_path, for_appversions=ver,
-                                   test_all_tiers=True, overrides=overrides)
+        if done:
+            log.info('[1@None] Reusing validation of %s (%s) for result_id '
+                     '%s' % (res.file, file_base, res.id))
+            validation = done[0]
+        else:
+            log.info('[1@None] Validating file %s (%s) for result_id %s'
+                     % (res.file, file_base, res.id))
+            target = res.validation_job.target_version
+            validation = run_validator(res.file.file_path,
+                                       **_validator_kw(target))
     except:
         task_error = sys.exc_info()
         log.error(u"bulk_validate_file exception on file %s (%s): %s: %s"
                   % (res.file, file_base,
                      task_error[0], task_error[1]), exc_info=False)
 
-    res.completed = datetime.now()
-    if task_error:
-        res.task_error = ''.join(traceback.format_exception(*task_error))
-    else:
-        res.apply_validation(validation)
-        log.info('[1@None] File %s (%s) errors=%s'
-                 % (res.file, file_base, res.errors))
-        tally_validation_results.delay(res.validation_job.id, validation)
-    res.save()
-    tally_job_results(res.validation_job.id)
+    _save_validation(res, validation, task_error and
+                     ''.join(traceback.format_exception(*task_error)))
 
     if task_error:
         etype, val, tb = task_error
         raise etype, val, tb
 
 
+def _validate_file(args):
+    """Runs the validator in a pool worker, see validate_job_locally."""
+    result_id, path, kw = args
+    try:
+        return result_id, run_validator(path, **kw), None
+    except Exception:
+        return result_id, None, traceback.format_exc()
+
+
+def validate_job_locally(job_pk, processes=None, maxtasksperchild=10):
+    """
+    Validates the pending results of a job in a local pool of processes
+    instead of through celery, once for each unique file hash. Workers are
+    replaced every `maxtasksperchild` files to keep the validator's memory
+    use bounded. Returns the number of files that went through the
+    validator.
+    """
+    job = ValidationJob.objects.get(pk=job_pk)
+    kw = _validator_kw(job.target_version)
+    unique = {}
+    for res in (job.result_set.filter(completed__isnull=True)
+                              .select_related('file')):
+        unique.setdefault(res.file.hash or res.file_id, res)
+    args = [(res.pk, res.file.file_path, kw) for res in unique.values()]
+    for result_id, validation, task_error in pool_imap(
+            _validate_file, args, processes, maxtasksperchild):
+        _save_validation(ValidationResult.objects.get(pk=result_id),
+                         validation, task_error)
+    return len(args)
+
+
 @task
-def tally_validation_results(job_id, validation_str, **kw):
+def tally_validation_results(job_id, validation_str, count=1, **kw):
     """Saves a tally of how many addons received each validation message.
+
+    `count` is the number of results that share this validation.
     """
     validation = json.loads(validation_str)
-    log.info('[@%s] tally_validation_results (job %s, %s messages)'
-             % (tally_validation_results.rate_limit, job_id,
-                len(validation['messages'])))
+    log.info('[@%s] tally_validation_results (job %s, %s messages, %s '
+             'results)' % (tally_validation_results.rate_limit, job_id,
+                           len(validation['messages']), count))
     v = ValidationJobTally(job_id)
     for msg in validation['messages']:
-        v.save_message(msg)
+        v.save_message(msg, count)
+
+
+def _pick_files(rows):
+    """
+    The files to validate for one add-on, out of (version, file, status,
+    hash) rows for the versions that could be bumped. Validate the newest
+    public version (or the newest preliminary one if there is none) and any
+    pending files in newer versions.
+    """
+    prelim_app = list(amo.STATUS_UNDER_REVIEW) + [amo.STATUS_BETA]
+
+    def latest(statuses):
+        return max([v for v, f, s, h in rows if s in statuses] or [0])
+
+    base = latest([amo.STATUS_PUBLIC]) or latest(amo.LITE_STATUSES)
+    return sorted(set((f, h) for v, f, s, h in rows
+                      if v == base or (v > base and s in prelim_app)))
 
 
 @task
@@ -121,59 +209,53 @@ def add_validation_jobs(pks, job_pk, **kw):
     job = ValidationJob.objects.get(pk=job_pk)
     curr_ver = job.curr_max_version.version_int
     target_ver = job.target_version.version_int
-    prelim_app = list(amo.STATUS_UNDER_REVIEW) + [amo.STATUS_BETA]
-    for addon in Addon.objects.filter(pk__in=pks):
-        ids = []
-        base = addon.versions.filter(apps__application=job.application.id,
-                                     apps__max__version_int__gte=curr_ver,
-                                     apps__max__version_int__lt=target_ver)
-
-        already_compat = addon.versions.filter(
-                                    files__status=amo.STATUS_PUBLIC,
-                                    apps__max__version_int__gte=target_ver)
-        if already_compat.count():
+
+    already_compat = collections.defaultdict(set)
+    for addon, version in (Version.objects.filter(
+                                addon__in=pks,
+                                files__status=amo.STATUS_PUBLIC,
+                                apps__max__version_int__gte=target_ver)
+                           .values_list('addon', 'id')):
+        already_compat[addon].add(version)
+
+    files = collections.defaultdict(list)
+    for row in (File.objects.filter(
+                        version__addon__in=pks,
+                        version__apps__application=job.application.id,
+                        version__apps__max__version_int__gte=curr_ver,
+                        version__apps__max__version_int__lt=target_ver)
+                .values_list('version__addon', 'version', 'id', 'status',
+                             'hash')):
+        files[row[0]].append(row[1:])
+
+    results = []
+    for addon in sorted(files):
+        if already_compat[addon]:
             log.info('Addon %s already has a public version %r which is '
                      'compatible with target version of app %s %s (or newer)'
-                     % (addon.pk, [v.pk for v in already_compat.all()],
+                     % (addon, sorted(already_compat[addon]),
                         job.application.id, job.target_version))
             continue
 
-        try:
-            public = (base.filter(files__status=amo.STATUS_PUBLIC)
-                          .latest('id'))
-        except ObjectDoesNotExist:
-            public = None
-
-        if public:
-            ids.extend([f.id for f in public.files.all()])
-            ids.extend(base.filter(files__status__in=prelim_app,
-                                   id__gt=public.id)
-                           .values_list('files__id', flat=True))
-
-        else:
-            try:
-                prelim = (base.filter(files__status__in=amo.LITE_STATUSES)
-                              .latest('id'))
-            except ObjectDoesNotExist:
-                prelim = None
-
-            if prelim:
-                ids.extend([f.id for f in prelim.files.all()])
-                ids.extend(base.filter(files__status__in=prelim_app,
-                                       id__gt=prelim.id)
-                               .values_list('files__id', flat=True))
-
-            else:
-                ids.extend(base.filter(files__status__in=prelim_app)
-                               .values_list('files__id', flat=True))
-
-        ids = set(ids)  # Just in case.
+        ids = _pick_files(files[addon])
         log.info('Adding %s files for validation for '
-                 'addon: %s for job: %s' % (len(ids), addon.pk, job_pk))
-        for id in set(ids):
+                 'addon: %s for job: %s' % (len(ids), addon, job_pk))
+        for id, hash in ids:
             result = ValidationResult.objects.create(validation_job_id=job_pk,
                                                      file_id=id)
-            bulk_validate_file.delay(result.pk)
+            results.append((result.pk, hash))
+
+    # Only one result per file hash needs validating, the rest get a copy.
+    # Everything is created first so none of the copies are missed.
+    seen, validating = set(), 0
+    for pk, hash in results:
+        if hash and hash in seen:
+            continue
+        seen.add(hash)
+        validating += 1
+        bulk_validate_file.delay(pk)
+    log.info('Validating %s of %s files for job %s'
+             % (validating, len(results), job_pk))
 
 
 def get_context(addon, version, job, results, fileob=None):
@@ -719,6 +719,84 @@ class TestBulkValidationTask(BulkValidationTest):
         assert run_validator.called
         eq_(run_validator.call_args[1]['test_all_tiers'], True)
 
+    def create_same_hash(self, job):
+        results = []
+        for i in range(3):
+            f = self.create_file()
+            f.update(hash='sha256:abc')
+            results.append(self.create_result(job, f, completed=None))
+        return results
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_validate_same_hash_once(self, run_validator):
+        run_validator.return_value = json.dumps(no_op_validation)
+        job = self.create_job()
+        results = self.create_same_hash(job)
+        tasks.bulk_validate_file(results[0].id)
+        eq_(run_validator.call_count, 1)
+        for res in ValidationResult.objects.filter(validation_job=job):
+            assert res.completed
+            eq_(res.validation, json.dumps(no_op_validation))
+        # The copies don't go through the validator again.
+        tasks.bulk_validate_file(results[1].id)
+        eq_(run_validator.call_count, 1)
+        eq_(ValidationJob.objects.get(pk=job.pk).completed is not None, True)
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_reuse_completed_same_hash(self, run_validator):
+        job = self.create_job()
+        done = self.create_result(job, self.create_file(),
+                                  validation=json.dumps(no_op_validation))
+        done.file.update(hash='sha256:abc')
+        res = self.create_same_hash(job)[0]
+        tasks.bulk_validate_file(res.id)
+        assert not run_validator.called
+        eq_(ValidationResult.objects.get(pk=res.pk).validation,
+            done.validation)
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_error_same_hash(self, run_validator):
+        run_validator.side_effect = ValueError('oops')
+        job = self.create_job()
+        results = self.create_same_hash(job)
+        with self.assertRaises(ValueError):
+            tasks.bulk_validate_file(results[0].id)
+        for res in ValidationResult.objects.filter(validation_job=job):
+            assert 'oops' in res.task_error
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_no_hash_not_shared(self, run_validator):
+        run_validator.return_value = json.dumps(no_op_validation)
+        job = self.create_job()
+        one, two = [self.create_result(job, self.create_file(),
+                                       completed=None) for i in range(2)]
+        tasks.bulk_validate_file(one.id)
+        eq_(ValidationResult.objects.get(pk=two.pk).completed, None)
+
+    @mock.patch('zadmin.tasks.bulk_validate_file')
+    def test_add_jobs_once_per_hash(self, bulk_validate_file):
+        for f in self.version.all_files:
+            f.update(hash='sha256:abc')
+        self.create_file().update(hash='sha256:abc')
+        job = self.create_job()
+        tasks.add_validation_jobs([self.addon.pk], job.pk)
+        eq_(job.result_set.count(), File.objects.filter(
+                                        version=self.version).count())
+        eq_(bulk_validate_file.delay.call_count, 1)
+
+    # Run the "pool" in process.
+    @mock.patch('zadmin.tasks.pool_imap',
+                lambda func, args, *a, **kw: map(func, args))
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_validate_job_locally(self, run_validator):
+        run_validator.return_value = json.dumps(no_op_validation)
+        job = self.create_job()
+        self.create_same_hash(job)
+        self.create_result(job, self.create_file(), completed=None)
+        eq_(tasks.validate_job_locally(job.pk), 2)
+        eq_(run_validator.call_count, 2)
+        eq_(job.result_set.filter(completed__isnull=True).count(), 0)
+
     @mock.patch('zadmin.tasks.run_validator')
     def test_merge_with_compat_summary(self, run_validator):
         data = {
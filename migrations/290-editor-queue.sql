@@ -0,0 +1,19 @@
+-- Fill it in with ./manage.py editor_queue once this has run.
+CREATE TABLE `editor_queue` (
+    `id` int(11) UNSIGNED AUTO_INCREMENT NOT NULL PRIMARY KEY,
+    `created` datetime NOT NULL,
+    `modified` datetime NOT NULL,
+    `addon_id` int(11) UNSIGNED NOT NULL,
+    `queue` varchar(20) NOT NULL,
+    `waiting_since` datetime,
+    `admin_review` bool NOT NULL,
+    `binary` bool NOT NULL,
+    `is_jetpack` bool NOT NULL,
+    `is_restartless` bool NOT NULL,
+    `is_premium` bool NOT NULL,
+    UNIQUE (`addon_id`, `queue`)
+) ENGINE=InnoDB CHARACTER SET utf8 COLLATE utf8_general_ci;
+
+ALTER TABLE `editor_queue` ADD FOREIGN KEY (`addon_id`) REFERENCES `addons` (`id`) ON DELETE CASCADE;
+
+CREATE INDEX `editor_queue_waiting` ON `editor_queue` (`queue`, `waiting_since`);
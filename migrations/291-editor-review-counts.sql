@@ -0,0 +1,13 @@
+-- Fill it in with ./manage.py editor_review_counts once this has run.
+CREATE TABLE `log_activity_review_count` (
+    `id` int(11) UNSIGNED AUTO_INCREMENT NOT NULL PRIMARY KEY,
+    `user_id` int(11) UNSIGNED NOT NULL,
+    `month` date NOT NULL,
+    `action` smallint NOT NULL,
+    `count` int(11) UNSIGNED NOT NULL DEFAULT 0,
+    UNIQUE (`user_id`, `month`, `action`)
+) ENGINE=InnoDB CHARACTER SET utf8 COLLATE utf8_general_ci;
+
+ALTER TABLE `log_activity_review_count` ADD FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
+
+CREATE INDEX `log_activity_review_count_month` ON `log_activity_review_count` (`month`);
@@ -0,0 +1 @@
+INSERT INTO waffle_switch (name, active) VALUES ('zip-file-viewer', 0);
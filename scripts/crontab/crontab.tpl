@@ -13,10 +13,11 @@ HOME=/tmp
 */30 * * * * {{ z_cron }} cleanup_watermarked_file
 
 #once per hour
+0 * * * * {{ z_cron }} rebuild_editor_queue
 5 * * * * {{ z_cron }} update_collections_subscribers
 10 * * * * {{ z_cron }} update_blog_posts
 15 * * * * {{ remora }}; php -f update-search-views.php
-20 * * * * {{ z_cron }} addon_last_updated
+20 * * * * {{ z_cron }} addon_last_updated_incremental
 25 * * * * {{ z_cron }} update_collections_votes
 # 30 * * * * {{ remora }}; php -f maintenance.php l10n_stats
 # 35 * * * * {{ remora }}; php -f maintenance.php l10n_rss
@@ -43,6 +44,7 @@ HOME=/tmp
 
 #once per day
 30 1 * * * {{ z_cron }} update_user_ratings
+35 1 * * * {{ z_cron }} update_review_aggregates
 40 1 * * * {{ z_cron }} update_weekly_downloads
 50 1 * * * {{ z_cron }} gc
 30 3 * * * {{ django }} cleanup
@@ -54,6 +56,7 @@ HOME=/tmp
 30 9 * * * {{ remora }}; {{ python }} maintenance.py share_count_totals
 30 10 * * * {{ z_cron }} recs
 30 20 * * * {{ z_cron }} update_perf
+50 20 * * * {{ z_cron }} addon_last_updated
 30 22 * * * {{ z_cron }} deliver_hotness
 40 23 * * * {{ z_cron }} update_compat_info_for_fx4
 45 23 * * * {{ django }} dump_apps
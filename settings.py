@@ -77,11 +77,19 @@ SERVICES_DATABASE = {
     'HOST': '',
 }
 
-DATABASE_ROUTERS = ('multidb.PinningMasterSlaveRouter',)
+DATABASE_ROUTERS = ('amo.routers.LagAwareRouter',)
 
 # Put the aliases for your slave databases in this list.
 SLAVE_DATABASES = []
 
+# Reads skip slaves more than REPLICA_MAX_LAG seconds behind the master.  A
+# thread in each process checks every REPLICA_LAG_INTERVAL seconds with
+# REPLICA_LAG_PROBE, giving up on connecting after REPLICA_PROBE_TIMEOUT.
+REPLICA_MAX_LAG = 30
+REPLICA_LAG_INTERVAL = 10
+REPLICA_LAG_PROBE = 'amo.routers.SlaveStatusProbe'
+REPLICA_PROBE_TIMEOUT = 2
+
 # Local time zone for this installation. Choices can be found here:
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 # although not all choices may be available on all operating systems.
@@ -282,6 +290,8 @@ MIDDLEWARE_CLASSES = (
     'mobility.middleware.XMobileMiddleware',
     # Disabled until ready:
     # 'amo.middleware.LazyPjaxMiddleware',
+    # Opt in to report views that run more queries than their query_budget:
+    # 'amo.middleware.QueryBudgetMiddleware',
     'amo.middleware.RemoveSlashMiddleware',
 
     # Munging REMOTE_ADDR must come before ThreadRequest.
@@ -1193,6 +1203,8 @@ RESPONSYS_ID = ''
 
 # The maximum file size that is shown inside the file viewer.
 FILE_VIEWER_SIZE_LIMIT = 1048576
+# How many bytes of extracted files the file viewer keeps on disk.
+FILE_VIEWER_CACHE_SIZE = 5 * 1024 * 1024 * 1024
 # The maximum file size that you can have inside a zip file.
 FILE_UNZIP_SIZE_LIMIT = 104857600
 